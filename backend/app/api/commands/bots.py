@@ -1,14 +1,15 @@
 from datetime import datetime
+from typing import Literal
 
 from aiohttp import payload
 from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.bots.base import BaseBot
+from app.bots.base import BaseBot, BotStatus
 from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
-from app.infrastructure.adapters.database import get_db
-from app.repositories.bot_repository import BotRepository
+from app.infrastructure.adapters.database import get_async_db
+from app.repositories.bot_repository import AsyncBotRepository
 
 from app.bots.bot_manager import BotManager
 from app.services.logging import bot_logger
@@ -16,8 +17,8 @@ from app.services.logging import bot_logger
 router = APIRouter()
 
 # Create a singleton dependency for the BotRepository
-def bot_repository_singleton(db: Session = Depends(get_db)) -> BotRepository:
-    return BotRepository(db)
+def bot_repository_singleton(db: AsyncSession = Depends(get_async_db)) -> AsyncBotRepository:
+    return AsyncBotRepository(db)
 
 class StrategyParams(BaseModel):
     symbol: str = Field(default="BTC/USDT", description="Trading pair symbol")
@@ -25,9 +26,10 @@ class StrategyParams(BaseModel):
     timeframe: str = Field(default="1h", description="Candlestick timeframe")
     short_window: int = Field(default=20, ge=1, description="Short moving average window")
     long_window: int = Field(default=50, ge=1, description="Long moving average window")
-    check_interval: int = Field(default=900, description="Interval in seconds between strategy ticks")
+    check_interval: int = Field(default=900, description="Seconds between two stop-loss / take-profit checks of an open position, between candle closes")
     stop_loss_pct: float = Field(default=0.02, gt=0, le=1, description="Stop loss percentage (0–1)")
     take_profit_pct: float = Field(default=0.04, gt=0, le=1, description="Take profit percentage (0–1)")
+    indicator_mode: Literal["pandas", "incremental", "shared"] = Field(default="pandas", description="Recompute indicators on every tick (pandas), update them in O(1) per candle (incremental) or share them between the bots of a market (shared)")
 
 def get_bot_manager(request: Request):
     return request.app.state.bot_manager
@@ -35,7 +37,7 @@ def get_bot_manager(request: Request):
 @router.post("/bots")
 async def create_bots( strategy_params: StrategyParams,
                        request: Request,
-                       bot_repository: BotRepository = Depends(bot_repository_singleton)):
+                       bot_repository: AsyncBotRepository = Depends(bot_repository_singleton)):
     """
     Create a bot, write it in the DB, register it to a pool of bots and run it
     """
@@ -58,8 +60,8 @@ async def create_bots( strategy_params: StrategyParams,
     # Create a bot
     bot = BaseBot(bot_id=bot_id, strategy=strategy, check_interval=strategy_params.check_interval)
 
-    # Save to DB (sync operation)
-    db_bot = bot_repository.create_bot(bot)
+    # Save to DB
+    db_bot = await bot_repository.create_bot(bot)
 
     # Register and Start it (async)
     bot_manager.register_bot(bot)
@@ -83,4 +85,16 @@ async def restart_bot(bot_id: str, bot_manager: BotManager = Depends(get_bot_man
         raise HTTPException(status_code=400, detail=str(e))
 
     all_running_bots = bot_manager.list_running_bots()
-    return next((b for b in all_running_bots if b["bot_id"] == bot_id), None)
\ No newline at end of file
+    return next((b for b in all_running_bots if b["bot_id"] == bot_id), None)
+
+@router.post("/bots/{bot_id}/stop")
+async def stop_bot(bot_id: str, bot_manager: BotManager = Depends(get_bot_manager)):
+    """
+    Stop a running bot (its current tick, if any, is left to finish)
+    """
+    try:
+        await bot_manager.stop_bot(bot_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"bot_id": bot_id, "status": BotStatus.STOPPED}
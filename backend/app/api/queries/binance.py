@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Request
 from app.infrastructure.adapters.binance_adapter import BinanceAdapter
 from app.config import applicationSettings
 
@@ -7,18 +7,22 @@ router = APIRouter()
 SUPPORTED_CURRENCIES = ["USD", "EUR", "GBP", "JPY"]
 
 
-@router.get("/binance/btc/{currency}/price")
-async def get_price(currency: str = Path(..., title="Fiat Currency", description="Fiat currency to compare BTC against",
-                                   enum=SUPPORTED_CURRENCIES)):
-    """
-    Get last BTC price
-    """
-    binance_adapter = BinanceAdapter(
+def get_binance_adapter(request: Request) -> BinanceAdapter:
+    # Shared adapter from the app lifespan: no new HTTP session / markets download per request
+    return request.app.state.adapters.get(
         api_key=applicationSettings.binance_keys.api_key,
         secret=applicationSettings.binance_keys.secret,
         sandbox=True
     )
 
+
+@router.get("/binance/btc/{currency}/price")
+async def get_price(currency: str = Path(..., title="Fiat Currency", description="Fiat currency to compare BTC against",
+                                   enum=SUPPORTED_CURRENCIES),
+                    binance_adapter: BinanceAdapter = Depends(get_binance_adapter)):
+    """
+    Get last BTC price (cached for a second)
+    """
     currency = currency.upper()
     supported_currencies = {
         "USD": "BTC/USDT",
@@ -34,16 +38,9 @@ async def get_price(currency: str = Path(..., title="Fiat Currency", description
     return {"symbol": supported_currencies[currency], "price": price}
 
 @router.get("/binance/ohlcv")
-async def get_ohlcv():
+async def get_ohlcv(binance_adapter: BinanceAdapter = Depends(get_binance_adapter)):
     """
     Get OHLCV candels in USDT: [timestamp, open, high, low, close, volume]
     """
-    binance_adapter = BinanceAdapter(
-        api_key=applicationSettings.binance_keys.api_key,
-        secret=applicationSettings.binance_keys.secret,
-        sandbox=True
-    )
-
-    ohlcv = await binance_adapter.get_ohlcv(symbol="BTC/USDT")
+    ohlcv = await binance_adapter.fetch_ohlcv(symbol="BTC/USDT")
     return {"symbol": "BTC/USDT", "ohlcv": ohlcv}
-
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, FastAPI, Request
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bots.bot_manager import BotManager
-from app.infrastructure.adapters.database import get_db
-from app.repositories.bot_repository import BotRepository
-from typing import List, Dict, Any
+from app.infrastructure.adapters.database import get_async_db
+from app.repositories.bot_log_repository import AsyncBotLogRepository, decode_cursor, encode_cursor
+from app.repositories.bot_repository import AsyncBotRepository
+from typing import List, Dict, Any, Optional
 
 router = APIRouter()
 
@@ -14,20 +17,31 @@ class RunningBot(BaseModel):
     status: str
     strategy: str
     params: Dict[str, Any]
+    latency: Dict[str, Dict[str, float]] = {}  # span -> count, mean/p50/p95/p99/max in ms
+
+class BotLogEntry(BaseModel):
+    id: int
+    level: str
+    message: str
+    created_at: datetime
 
-# Create a singleton dependency for the OrderRepository
-def bot_repository_singleton(db: Session = Depends(get_db)) -> BotRepository:
-    return BotRepository(db)
+class BotLogPage(BaseModel):
+    logs: List[BotLogEntry]
+    next_cursor: Optional[str] = None  # pass it as `cursor` to get the next (older) page
+
+# Create a singleton dependency for the BotRepository
+def bot_repository_singleton(db: AsyncSession = Depends(get_async_db)) -> AsyncBotRepository:
+    return AsyncBotRepository(db)
 
 def get_bot_manager(request: Request):
     return request.app.state.bot_manager
 
 @router.get("/bots")
-def get_bots(bot_repository: BotRepository = Depends(bot_repository_singleton)):
+async def get_bots(bot_repository: AsyncBotRepository = Depends(bot_repository_singleton)):
     """
     Returns all bots from DB
     """
-    return bot_repository.get_all_bots()
+    return await bot_repository.get_all_bots()
 
 @router.get("/bots/running", response_model=List[RunningBot])
 def get_running_bots(bot_manager: BotManager = Depends(get_bot_manager)):
@@ -37,9 +51,33 @@ def get_running_bots(bot_manager: BotManager = Depends(get_bot_manager)):
     return bot_manager.list_running_bots()
 
 
+@router.get("/bots/{bot_id}/logs", response_model=BotLogPage)
+async def get_bot_logs(bot_id: str,
+                       start: Optional[datetime] = Query(None, description="Logs from this time (included)"),
+                       end: Optional[datetime] = Query(None, description="Logs before this time (excluded)"),
+                       level: Optional[str] = Query(None, description="Only this level (INFO, WARNING, ERROR)"),
+                       limit: int = Query(100, ge=1, le=1000),
+                       cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+                       db: AsyncSession = Depends(get_async_db)):
+    """
+    Logs of a bot, newest first, one page at a time
+    """
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+    logs = await AsyncBotLogRepository(db).get_logs(bot_id, start=start, end=end, level=level,
+                                                    limit=limit, cursor=page_cursor)
+    return BotLogPage(
+        logs=[BotLogEntry(id=log.id, level=log.level, message=log.message, created_at=log.created_at) for log in logs],
+        next_cursor=encode_cursor(logs[-1]) if len(logs) == limit else None,
+    )
+
+
 @router.get("/bots/{bot_id}")
-def get_bots(bot_id: str, bot_repository: BotRepository = Depends(bot_repository_singleton)):
+async def get_bots(bot_id: str, bot_repository: AsyncBotRepository = Depends(bot_repository_singleton)):
     """
     Returns bots from DB
     """
-    return bot_repository.get_bot_by_id(bot_id)
\ No newline at end of file
+    return await bot_repository.get_bot_by_id(bot_id)
\ No newline at end of file
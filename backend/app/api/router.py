@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from . import commands, queries
 from app.api.queries import binance
 from app.api.queries import bots
+from app.api.queries import metrics
 from app.api.commands import bots
 
 router = APIRouter()
@@ -12,4 +13,5 @@ router = APIRouter()
 router.include_router(queries.bots.router, tags=["queries"])
 router.include_router(commands.bots.router, tags=["commands"])
 router.include_router(queries.binance.router, tags=["queries"])
+router.include_router(queries.metrics.router, tags=["system"])
 #router.include_router(adapters.router, prefix="/system", tags=["system"])
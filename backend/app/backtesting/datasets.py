@@ -0,0 +1,64 @@
+"""
+Loading of Binance monthly kline CSVs (http://data.binance.vision) for backtests,
+optionally through the columnar CandleStore so each CSV is only parsed once.
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from app.infrastructure.adapters.candle_store import BINANCE_KLINE_COLUMNS, CandleStore, load_candles
+
+# Columns the strategies and the replay exchanges actually use
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def month_csv_path(data_dir: Path, symbol: str, timeframe: str, year: int, month: int) -> Path:
+    """Binance file naming: BTCUSDT-1h-2024-03.csv"""
+    return Path(data_dir) / f"{symbol}-{timeframe}-{year}-{month:02d}.csv"
+
+
+def load_year(data_dir: Path, symbol: str, timeframe: str, year: int,
+              store: Optional[CandleStore] = None) -> Tuple[pd.DataFrame, List[int]]:
+    """
+    Concatenate all available monthly CSV files for the given symbol/timeframe/year.
+    Returns (dataframe, list_of_loaded_months).
+    Missing months are silently skipped.
+
+    With a store, months are read from it instead (the CSVs not ingested yet are ingested
+    first): stored columns only, timestamps in ms.
+    """
+    frames = []
+    loaded_months = []
+    for month in range(1, 13):
+        path = month_csv_path(data_dir, symbol, timeframe, year, month)
+        if store is not None:
+            if path.exists():
+                store.ingest_csv(path, symbol, timeframe, year, month)  # no-op when already up to date
+            if store.has_month(symbol, timeframe, year, month):
+                frames.append(pd.DataFrame(store.load_month(symbol, timeframe, year, month)))
+                loaded_months.append(month)
+        elif path.exists():
+            frames.append(load_candles(path))
+            loaded_months.append(month)
+    if not frames:
+        return pd.DataFrame(), []
+    return pd.concat(frames, ignore_index=True), loaded_months
+
+
+def iter_month_frames(data_dir: Path, symbol: str, timeframe: str, years: Sequence[int],
+                      store: Optional[CandleStore] = None) -> Iterator[pd.DataFrame]:
+    """
+    Same months as load_year over several years, yielded one at a time instead of concatenated:
+    feed them to a StreamingHistoricalExchange to replay years of 1m candles with flat memory.
+    """
+    for year in years:
+        for month in range(1, 13):
+            path = month_csv_path(data_dir, symbol, timeframe, year, month)
+            if store is not None:
+                if path.exists():
+                    store.ingest_csv(path, symbol, timeframe, year, month)
+                if store.has_month(symbol, timeframe, year, month):
+                    yield pd.DataFrame(store.load_month(symbol, timeframe, year, month), copy=False)
+            elif path.exists():
+                yield load_candles(path)
@@ -0,0 +1,199 @@
+"""
+Portfolio replay: many strategies on many markets, one clock, one capital.
+
+Every market (symbol, timeframe) is replayed by its own HistoricalExchange. The markets
+are merged with a heap of their next candle close times: each step reveals the one
+candle that closes next, whatever its timeframe, and only the strategies of that
+market are evaluated. Nothing is re-aligned or concatenated: memory is the markets'
+own replays plus one heap entry per market. With StreamingHistoricalExchange markets
+(CandleStore.streaming_exchange) each market holds one month plus a `tail` of
+candles, so memory stays flat whatever the length of the backtest; in-memory
+HistoricalExchange markets hold their whole range.
+
+Example:
+    exchange = PortfolioExchange({
+        ("BTC/USDT", "1h"): store.streaming_exchange("BTCUSDT", "1h", tail=250, start="2021", end="2025"),
+        ("ETH/USDT", "4h"): store.streaming_exchange("ETHUSDT", "4h", tail=250, start="2021", end="2025"),
+    })
+    result = await PortfolioBacktester(exchange, capital=10000).run([
+        MovingAverageCrossoverStrategy(symbol="BTC/USDT", timeframe="1h"),
+        MovingAverageCrossoverStrategy(symbol="ETH/USDT", timeframe="4h", short_window=9, long_window=21),
+    ])
+"""
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.bots.scheduler import timeframe_seconds
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.models.order import Order
+
+MarketKey = Tuple[str, str]  # (symbol, timeframe)
+
+
+def _timestamp_ms(value: float) -> int:
+    # Binance spot kline files switched from ms to µs in 2025
+    value = int(value)
+    return value // 1000 if value > 10**14 else value
+
+
+class PortfolioExchange(MarketDataProviderInterface):
+    """
+    Market data of several markets replayed on one clock.
+    tick() advances the market whose next candle closes first; get_history / get_arrays /
+    get_price are routed by symbol (and timeframe) to that market's replay.
+    """
+
+    def __init__(self, markets: Dict[MarketKey, HistoricalExchange]):
+        self.markets = markets
+        self._timeframes: Dict[str, List[str]] = {}
+        for symbol, timeframe in markets:
+            self._timeframes.setdefault(symbol, []).append(timeframe)
+
+        self._heap: List[Tuple[int, int, MarketKey]] = []
+        for order, (key, exchange) in enumerate(markets.items()):
+            self._push(order, key, exchange)
+
+        self.now: Optional[int] = None  # close time (ms) of the last revealed candle
+        self.current: Optional[MarketKey] = None  # market of the last revealed candle
+
+    def _push(self, order: int, key: MarketKey, exchange: HistoricalExchange):
+        next_timestamp = exchange.next_timestamp()
+        if next_timestamp is not None:
+            open_time = _timestamp_ms(next_timestamp)
+            close_time = open_time + timeframe_seconds(key[1]) * 1000
+            # order: markets closing at the same time are always revealed in the same order
+            heapq.heappush(self._heap, (close_time, order, key))
+
+    @property
+    def exits_at_level(self) -> bool:
+        # Like the market being replayed: SL/TP at their level on replayed candles, at the price on simulated fills
+        if self.current is None:
+            return True
+        return self.markets[self.current].exits_at_level
+
+    def tick(self) -> bool:
+        if not self._heap:
+            return False
+        close_time, order, key = heapq.heappop(self._heap)
+        exchange = self.markets[key]
+        exchange.tick()
+        self._push(order, key, exchange)
+
+        self.now = close_time
+        self.current = key
+        return True
+
+    def _market(self, symbol: str, timeframe: Optional[str] = None) -> HistoricalExchange:
+        if timeframe is None:
+            # Price of a symbol: from its shortest timeframe (the most recent close)
+            timeframes = self._timeframes.get(symbol)
+            if not timeframes:
+                raise ValueError(f"No market data for {symbol}")
+            timeframe = min(timeframes, key=timeframe_seconds)
+        if (symbol, timeframe) not in self.markets:
+            raise ValueError(f"No market data for {symbol} {timeframe}")
+        return self.markets[(symbol, timeframe)]
+
+    async def get_history(self, symbol: str, timeframe: str, limit=None) -> pd.DataFrame:
+        return await self._market(symbol, timeframe).get_history(symbol, timeframe, limit)
+
+    async def get_arrays(self, symbol: str, timeframe: str, limit=None) -> Dict[str, np.ndarray]:
+        return await self._market(symbol, timeframe).get_arrays(symbol, timeframe, limit)
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        market = self._market(symbol)
+        if market.cursor == 0:
+            return None
+        return market.get_price(symbol)
+
+
+@dataclass
+class PortfolioTrade:
+    time: int  # candle close time (ms)
+    strategy: int  # index of the strategy in the list given to run()
+    order: Order
+    cash_after: float
+
+
+@dataclass
+class PortfolioResult:
+    initial_capital: float
+    cash: float
+    equity: float
+    max_drawdown: float  # fraction of the equity peak
+    trades: List[PortfolioTrade] = field(default_factory=list)
+    positions: Dict[int, float] = field(default_factory=dict)  # strategy -> amount still held
+
+    @property
+    def pnl(self) -> float:
+        return self.equity - self.initial_capital
+
+
+class PortfolioBacktester:
+    """
+    Steps strategies through a PortfolioExchange with a shared capital.
+
+    On each candle close, the strategies of that market are asked for a signal with the
+    cash still available as capital (position sizes come out of the shared cash), and
+    their orders are filled at the order price. Equity (cash + open positions at the last
+    price of their symbol) and drawdown are tracked on the fly, no curve is stored.
+    """
+
+    def __init__(self, exchange: PortfolioExchange, capital: float = 1000.0):
+        self.exchange = exchange
+        self.initial_capital = capital
+
+    async def run(self, strategies: List) -> PortfolioResult:
+        by_market: Dict[MarketKey, List[int]] = {}
+        for index, strategy in enumerate(strategies):
+            by_market.setdefault((strategy.symbol, strategy.timeframe), []).append(index)
+
+        cash = self.initial_capital
+        positions: Dict[int, float] = {}
+        trades: List[PortfolioTrade] = []
+        peak = self.initial_capital
+        max_drawdown = 0.0
+
+        while self.exchange.tick():
+            for index in by_market.get(self.exchange.current, ()):
+                strategy = strategies[index]
+                order = await strategy.generate_signals(self.exchange, capital=cash)
+                if not order:
+                    continue
+
+                value = float(order.amount) * float(order.price)
+                if order.side == "BUY":
+                    cash -= value
+                    positions[index] = positions.get(index, 0.0) + float(order.amount)
+                else:
+                    cash += value
+                    positions[index] = positions.get(index, 0.0) - float(order.amount)
+                    if abs(positions[index]) < 1e-12:
+                        del positions[index]
+                trades.append(PortfolioTrade(time=self.exchange.now, strategy=index, order=order, cash_after=cash))
+
+            equity = self._equity(cash, positions, strategies)
+            peak = max(peak, equity)
+            max_drawdown = max(max_drawdown, (peak - equity) / peak if peak > 0 else 0.0)
+
+        return PortfolioResult(
+            initial_capital=self.initial_capital,
+            cash=cash,
+            equity=self._equity(cash, positions, strategies),
+            max_drawdown=max_drawdown,
+            trades=trades,
+            positions=positions,
+        )
+
+    def _equity(self, cash: float, positions: Dict[int, float], strategies: List) -> float:
+        equity = cash
+        for index, amount in positions.items():
+            price = self.exchange.get_price(strategies[index].symbol)
+            if price is not None:
+                equity += amount * price
+        return equity
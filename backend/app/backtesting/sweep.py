@@ -0,0 +1,262 @@
+"""
+Parallel parameter sweep of MovingAverageCrossoverStrategy over historical datasets.
+
+Every (dataset, config) pair is an independent vectorized backtest, so the grid is fanned
+out over a process pool. Each dataset is copied once into shared memory: workers attach
+to it by name instead of receiving a pickled DataFrame with every task.
+
+CLI example (from backend/):
+    python -m app.backtesting.sweep --data-dir tests/data --symbol BTCUSDT --timeframe 1h \
+        --years 2024 2025 --short 9 20 --long 21 50 --sl 0.01 0.02 --tp 0.04 0.06
+"""
+import argparse
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.backtesting.datasets import OHLCV_COLUMNS, load_year
+from app.bots.indicator_cache import IndicatorCache
+from app.infrastructure.adapters.candle_store import CandleStore
+
+# Number of configs sent to a worker in one task: amortizes the IPC round-trip
+# when the grid has thousands of cheap vectorized backtests
+DEFAULT_CHUNK_SIZE = 16
+
+
+@dataclass(frozen=True)
+class SharedDataset:
+    """Where a worker finds a dataset: shared memory block of shape (columns, rows)"""
+    label: str
+    shm_name: str
+    columns: tuple
+    rows: int
+
+
+def build_grid(timeframes: Sequence[str], short_windows: Sequence[int], long_windows: Sequence[int],
+               stop_loss_pcts: Sequence[float], take_profit_pcts: Sequence[float]) -> List[Dict]:
+    """
+    Cartesian product of the parameters, as StrategyParams-like dicts.
+    Combinations where the short window is not shorter than the long one are skipped.
+    """
+    grid = []
+    for timeframe, short_window, long_window, stop_loss_pct, take_profit_pct in itertools.product(
+            timeframes, short_windows, long_windows, stop_loss_pcts, take_profit_pcts):
+        if short_window >= long_window:
+            continue
+        grid.append({
+            "name": f"{timeframe} {short_window}/{long_window} SL {stop_loss_pct*100:.1f}% TP {take_profit_pct*100:.1f}%",
+            "timeframe": timeframe,
+            "short_window": short_window,
+            "long_window": long_window,
+            "stop_loss_pct": stop_loss_pct,
+            "take_profit_pct": take_profit_pct,
+        })
+    return grid
+
+
+def backtest_config(candles: pd.DataFrame, config: Dict, capital: float = 1000.0,
+                    indicators: Optional[IndicatorCache] = None, fingerprint=None) -> Dict:
+    """
+    Run one vectorized backtest and summarize it.
+    A position still open at the end is closed at the last close so it counts in the P&L.
+    indicators / fingerprint: moving averages shared with the other configs run on the same dataset
+    """
+    from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+
+    strategy = MovingAverageCrossoverStrategy(
+        timeframe=config["timeframe"],
+        short_window=config["short_window"],
+        long_window=config["long_window"],
+        stop_loss_pct=config["stop_loss_pct"],
+        take_profit_pct=config["take_profit_pct"],
+    )
+    orders = strategy.backtest(candles, capital=capital, indicators=indicators, fingerprint=fingerprint)
+
+    buys = [o for o in orders if o.side == "BUY"]
+    sells = [o for o in orders if o.side == "SELL"]
+    exit_prices = [float(o.price) for o in sells]
+    if len(buys) > len(sells):
+        exit_prices.append(float(candles["close"].iloc[-1]))
+
+    pnl = 0.0
+    for buy, exit_price in zip(buys, exit_prices):
+        pnl += (exit_price - float(buy.price)) * float(buy.amount)
+
+    return {
+        "config": config["name"],
+        "timeframe": config["timeframe"],
+        "short_window": config["short_window"],
+        "long_window": config["long_window"],
+        "stop_loss_pct": config["stop_loss_pct"],
+        "take_profit_pct": config["take_profit_pct"],
+        "buys": len(buys),
+        "sells": len(sells),
+        "completed": min(len(buys), len(sells)),
+        "pnl": pnl,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+_worker_datasets: Dict[str, pd.DataFrame] = {}
+_worker_shared_memory: List[shared_memory.SharedMemory] = []  # keep the segments mapped
+# Moving averages of the worker's datasets, keyed by dataset label: a window is computed
+# once per worker, whatever the number of configs using it
+_worker_indicators = IndicatorCache()
+
+
+def _init_worker(datasets: Sequence[SharedDataset]):
+    # One log line per trade on thousands of backtests is only noise (and disk I/O)
+    logging.disable(logging.INFO)
+
+    for dataset in datasets:
+        # Workers share the parent's resource tracker: the segment stays registered once,
+        # and is unlinked by the parent when the sweep ends
+        shm = shared_memory.SharedMemory(name=dataset.shm_name)
+        _worker_shared_memory.append(shm)
+
+        block = np.ndarray((len(dataset.columns), dataset.rows), dtype=np.float64, buffer=shm.buf)
+        block.flags.writeable = False
+        _worker_datasets[dataset.label] = pd.DataFrame(block.T, columns=list(dataset.columns), copy=False)
+
+
+def _run_chunk(label: str, configs: List[Dict], capital: float) -> List[Dict]:
+    candles = _worker_datasets[label]
+    results = []
+    for config in configs:
+        result = backtest_config(candles, config, capital, indicators=_worker_indicators, fingerprint=label)
+        result["dataset"] = label
+        results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+def _share_dataset(label: str, candles: pd.DataFrame) -> tuple[SharedDataset, shared_memory.SharedMemory]:
+    columns = [c for c in OHLCV_COLUMNS if c in candles.columns]
+    block = candles[columns].to_numpy(dtype=np.float64).T
+
+    shm = shared_memory.SharedMemory(create=True, size=max(block.nbytes, 1))
+    np.ndarray(block.shape, dtype=np.float64, buffer=shm.buf)[:] = block
+
+    return SharedDataset(label=label, shm_name=shm.name, columns=tuple(columns), rows=block.shape[1]), shm
+
+
+def iter_sweep(datasets: Dict[str, pd.DataFrame], grid: Iterable[Dict], timeframes: Optional[Dict[str, str]] = None,
+               processes: Optional[int] = None, capital: float = 1000.0,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Backtest every config of the grid on every dataset, in parallel.
+    Yields one result dict per (dataset, config) as soon as it is available (completion order).
+
+    datasets: label -> candles DataFrame
+    timeframes: label -> timeframe of the dataset; when given, a config only runs on datasets of its timeframe
+    processes: pool size, defaults to the number of CPUs
+    """
+    grid = list(grid)
+    shared = []
+    segments = []
+    try:
+        for label, candles in datasets.items():
+            dataset, shm = _share_dataset(label, candles)
+            shared.append(dataset)
+            segments.append(shm)
+
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(shared,)) as pool:
+            futures = []
+            for label in datasets:
+                configs = [c for c in grid if not timeframes or c["timeframe"] == timeframes[label]]
+                for i in range(0, len(configs), chunk_size):
+                    futures.append(pool.submit(_run_chunk, label, configs[i:i + chunk_size], capital))
+
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+
+def run_sweep(datasets: Dict[str, pd.DataFrame], grid: Iterable[Dict], timeframes: Optional[Dict[str, str]] = None,
+              processes: Optional[int] = None, capital: float = 1000.0) -> List[Dict]:
+    """Same as iter_sweep, but waits for all results and ranks them by P&L (best first)"""
+    results = list(iter_sweep(datasets, grid, timeframes, processes, capital))
+    return sorted(results, key=lambda r: -r["pnl"])
+
+
+def format_result(result: Dict) -> str:
+    sl_tp = f"{result['stop_loss_pct']*100:.1f}%/{result['take_profit_pct']*100:.1f}%"
+    return (
+        f"  {result['dataset']:<28} {result['config']:<32} {sl_tp:<12} "
+        f"{result['buys']:<6} {result['sells']:<6} {result['completed']:<6} "
+        f"{result['pnl']:>+10.2f} USDT"
+    )
+
+
+def format_table(results: List[Dict]) -> str:
+    """Ranked comparison table (results are expected sorted)"""
+    lines = [
+        f"  {'Dataset':<28} {'Config':<32} {'SL/TP':<12} {'Buys':<6} {'Sells':<6} {'Done':<6} {'P&L':>10}",
+        f"  {'-'*28} {'-'*32} {'-'*12} {'-'*6} {'-'*6} {'-'*6} {'-'*10}",
+    ]
+    lines += [format_result(r) for r in results]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep of the MA crossover strategy")
+    parser.add_argument("--data-dir", type=Path, default=Path("tests/data"), help="Directory of Binance monthly kline CSVs")
+    parser.add_argument("--store", type=Path, default=None, help="Read candles through a CandleStore at this path")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--timeframe", nargs="+", default=["1h"])
+    parser.add_argument("--years", nargs="+", type=int, required=True)
+    parser.add_argument("--short", nargs="+", type=int, default=[9, 20])
+    parser.add_argument("--long", nargs="+", type=int, default=[21, 50])
+    parser.add_argument("--sl", nargs="+", type=float, default=[0.02])
+    parser.add_argument("--tp", nargs="+", type=float, default=[0.04])
+    parser.add_argument("--capital", type=float, default=1000.0)
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--top", type=int, default=20, help="Rows of the final ranked table")
+    args = parser.parse_args(argv)
+
+    store = CandleStore(args.store) if args.store else None
+    datasets = {}
+    timeframes = {}
+    for timeframe in args.timeframe:
+        for year in args.years:
+            candles, loaded_months = load_year(args.data_dir, args.symbol, timeframe, year, store)
+            if candles.empty:
+                continue
+            label = f"{args.symbol} {timeframe} {year} ({len(loaded_months)}/12)"
+            datasets[label] = candles
+            timeframes[label] = timeframe
+
+    if not datasets:
+        parser.error(f"No CSV found in {args.data_dir} for {args.symbol} {args.timeframe} {args.years}")
+
+    grid = build_grid(args.timeframe, args.short, args.long, args.sl, args.tp)
+    print(f"Sweeping {len(grid)} configs over {len(datasets)} datasets")
+
+    results = []
+    for result in iter_sweep(datasets, grid, timeframes, args.processes, args.capital):
+        results.append(result)
+        print(format_result(result))
+
+    results.sort(key=lambda r: -r["pnl"])
+    print(f"\n{'='*110}\n  Top {min(args.top, len(results))} by P&L\n{'='*110}")
+    print(format_table(results[:args.top]))
+
+
+if __name__ == "__main__":
+    main()
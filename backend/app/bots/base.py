@@ -1,5 +1,7 @@
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
 from app.repositories.order_repository import OrderRepository
 from app.services.logging import bot_logger
+from app.services.metrics import current_bot_id, metrics
 from enum import Enum
 import asyncio
 
@@ -15,21 +17,47 @@ class BaseBot:
         self.strategy = strategy
         self.capital = capital
         # Todo here maybe some other customisable params
-        self.check_interval = check_interval  # seconds, by default, checks every 15 minutes (900 seconds).
+        # seconds, by default, checks every 15 minutes (900 seconds): the SL/TP of an open position
+        # between two candle closes (BotScheduler), every tick in run()
+        self.check_interval = check_interval
         self.status = BotStatus.CREATED
         self._task: asyncio.Task | None = None
 
     async def tick(self, exchange, order_service):
         """
         Execute a single strategy evaluation cycle.
+        Timed in the "tick" span; the spans below it (strategy, orders, exchange) are attributed to this bot.
         """
+        token = current_bot_id.set(self.bot_id)
+        try:
+            with metrics.span("tick"):
+                return await self._tick(exchange, order_service)
+        finally:
+            current_bot_id.reset(token)
+
+    async def check_exits(self, exchange, order_service):
+        """SL/TP check of the open position between two candle closes: only sells (strategy.check_exit)"""
+        token = current_bot_id.set(self.bot_id)
+        try:
+            with metrics.span("check_exits"):
+                order_signal = await self.strategy.check_exit(exchange)
+                if not order_signal:
+                    return None
+                return await self._send(order_signal, order_service)
+        finally:
+            current_bot_id.reset(token)
+
+    async def _tick(self, exchange, order_service):
         # Generate signal/order from strategy
-        order_signal = await self.strategy.generate_signals(exchange, self.capital)
+        with metrics.span("generate_signals"):
+            order_signal = await self.strategy.generate_signals(exchange, self.capital)
 
         if not order_signal:
             bot_logger.info("No signal generated", extra={"bot_id": self.bot_id})
             return None
+        return await self._send(order_signal, order_service)
 
+    async def _send(self, order_signal, order_service):
         # Log the generated signal
         bot_logger.info(
             f"Signal detected: {order_signal.side} "
@@ -56,7 +84,7 @@ class BaseBot:
         while self.status == BotStatus.RUNNING:
             try:
                 await self.tick(exchange, order_service)
-                await asyncio.sleep(self.check_interval)
+                await self._wait_next_tick(exchange)
             except Exception as e:
                 bot_logger.error(f"Error in bot loop: {e}", extra={"bot_id": self.bot_id})
                 await asyncio.sleep(self.check_interval)
@@ -64,6 +92,18 @@ class BaseBot:
         bot_logger.info(f"Bot {self.bot_id} stopped", extra={"bot_id": self.bot_id})
 
 
+    async def _wait_next_tick(self, exchange):
+        """
+        Streamed market data: wake up as soon as a candle closes (at the latest after check_interval).
+        Polled market data: sleep check_interval.
+        """
+        if isinstance(exchange, MarketDataProviderInterface) and exchange.pushes_candle_closes:
+            await exchange.wait_for_candle_close(
+                self.strategy.symbol, self.strategy.timeframe, timeout=self.check_interval
+            )
+        else:
+            await asyncio.sleep(self.check_interval)
+
     # async def start(self, exchange, order_service=None):
     #     self.status = BotStatus.RUNNING
     #     self._task = asyncio.create_task(self.run(exchange, order_service))
@@ -1,11 +1,13 @@
 from app.bots.base import BaseBot
+from app.bots.strategies.bollinger_strategy import BollingerBandsStrategy
 from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
-#from app.bots.strategies.rsi_strategy import RSIStrategy
+from app.bots.strategies.rsi_strategy import RSIStrategy
 from app.models.bot import Bot
 
 STRATEGY_REGISTRY = {
   "MovingAverageCrossoverStrategy": MovingAverageCrossoverStrategy,
- # "RSIStrategy": RSIStrategy,
+  "RSIStrategy": RSIStrategy,
+  "BollingerBandsStrategy": BollingerBandsStrategy,
 }
 
 def build_bot_from_orm(db_bot: Bot) -> BaseBot:
@@ -13,4 +15,4 @@ def build_bot_from_orm(db_bot: Bot) -> BaseBot:
   if not strategy_class:
       raise ValueError(f"Unknown strategy: {db_bot.strategy}")
   strategy = strategy_class(**db_bot.params)
-  return BaseBot(bot_id=db_bot.id, strategy=strategy)
\ No newline at end of file
+  return BaseBot(bot_id=db_bot.id, strategy=strategy)
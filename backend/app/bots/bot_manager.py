@@ -1,49 +1,153 @@
 import asyncio
-from typing import Dict
+from typing import Dict, List
 from app.bots.base import BaseBot, BotStatus
 from app.bots.bot_factory import build_bot_from_orm
-from app.infrastructure.adapters.database import SessionLocal
-from app.repositories.bot_repository import BotRepository
+from app.bots.scheduler import BotScheduler, history_limit
+from app.infrastructure.adapters.database import AsyncSessionLocal
+from app.repositories.bot_repository import AsyncBotRepository
 from app.services.logging import bot_logger
+from app.services.metrics import metrics
 
 class BotManager:
     """
     Manages multiple BaseBot instances.
+    Running bots are ticked by the scheduler, grouped by market, on every candle close.
     """
 
-    def __init__(self, exchange, order_service):
+    def __init__(self, exchange, order_service, max_concurrency: int = 50, state_store=None,
+                 session_factory=AsyncSessionLocal):
         self.exchange = exchange
         self.order_service = order_service
+        self.state_store = state_store  # BotStateStore: open positions survive restarts
+        self.session_factory = session_factory
         self._bots: Dict[str, BaseBot] = {}
+        self.scheduler = BotScheduler(exchange, order_service, max_concurrency=max_concurrency,
+                                      state_store=state_store)
 
     def register_bot(self, bot: BaseBot):
         if bot.bot_id in self._bots:
             raise ValueError(f"Bot {bot.bot_id} already registered")
         self._bots[bot.bot_id] = bot
+        if self.state_store is not None:
+            self.state_store.mark_saved(bot)
         bot_logger.info("Bot registered", extra={"bot_id": bot.bot_id})
 
     async def start_bot(self, bot_id: str):
         bot = self._get_bot(bot_id)
         bot.status = BotStatus.RUNNING
-        bot._task = asyncio.create_task(bot.run(self.exchange, self.order_service))
+        self.scheduler.add(bot)
+        bot_logger.info("Bot started", extra={"bot_id": bot.bot_id})
 
 
-    # async def stop_bot(self, bot_id: str):
-    #     bot = self._get_bot(bot_id)
-    #     await bot.stop()
+    async def stop_bot(self, bot_id: str, timeout: float = 10.0):
+        """
+        Stop a bot for good: no new tick, its running tick (if any) is left to finish,
+        its state is snapshotted and it is marked stopped in the DB (not restored at startup).
+        """
+        bot = self._get_bot(bot_id)
+        bot.status = BotStatus.STOPPED
+        self.scheduler.remove(bot_id)
+        if not await self.scheduler.wait_tick(bot_id, timeout):
+            bot_logger.error(f"Tick still running after {timeout}s, bot stopped anyway", extra={"bot_id": bot_id})
+
+        if self.state_store is not None:
+            self.state_store.record(bot)
+            await self.state_store.flush()
+            self.state_store.forget(bot_id)
+        async with self.session_factory() as db:
+            await AsyncBotRepository(db).update_status(bot_id, "S")
+
+        del self._bots[bot_id]
+        # Its latency series would otherwise be exported (/metrics) until the process restarts
+        metrics.discard_bot(bot_id)
+        bot_logger.info("Bot stopped", extra={"bot_id": bot_id})
+
+    async def shutdown(self, timeout: float = 10.0):
+        """
+        Process shutdown: the bots stop ticking, the running ticks are drained concurrently
+        (cancelled after timeout) and every bot's state is snapshotted.
+        The bots stay "running" in the DB: they are restored by the next start.
+        Pending order / log / state writes are flushed by their own close() (see lifespan).
+        """
+        cancelled = await self.scheduler.shutdown(timeout)
+        for bot in self._bots.values():
+            bot.status = BotStatus.STOPPED
+            if self.state_store is not None:
+                self.state_store.record(bot)
+        bot_logger.info(f"Bot manager shut down: {len(self._bots)} bots, {cancelled} ticks cancelled")
 
     async def restart_db_bot(self, bot_id: str):
 
         # Todo Check if bot is already running (but already check by register_bot)
 
-        with SessionLocal() as db: # the session is always closed when the with block exits
-            bot = BotRepository(db).get_bot_by_id(bot_id)
+        async with self.session_factory() as db: # the session is always closed when the with block exits
+            repository = AsyncBotRepository(db)
+            bot = await repository.get_bot_by_id(bot_id)
+            state = await repository.get_bot_state(bot_id)
+            if bot.status != "R":
+                await repository.update_status(bot_id, "R")  # restored again at startup
         # Build a BaseBot instance from the DB model
-        base_bot = build_bot_from_orm(bot)
+        base_bot = self._rebuild(bot, state)
         # Register and Start it
         self.register_bot(base_bot)
         await self.start_bot(base_bot.bot_id)
 
+    async def restore_running_bots(self) -> List[str]:
+        """
+        Startup: every bot running in the DB is rebuilt with its last state snapshot and started.
+        One query for all the bots, then the candles of every market are fetched concurrently
+        (once per market) so the first ticks are served from the cache.
+        Returns the ids of the restored bots.
+        """
+        async with self.session_factory() as db:
+            rows = await AsyncBotRepository(db).get_running_bots_with_state()
+
+        restored = []
+        for db_bot, state in rows:
+            if db_bot.id in self._bots:
+                continue
+            try:
+                bot = self._rebuild(db_bot, state)
+            except Exception as e:
+                bot_logger.error(f"Bot {db_bot.id} can't be restored: {e}", extra={"bot_id": db_bot.id})
+                continue
+            self.register_bot(bot)
+            restored.append(bot)
+
+        await self.warm_caches(restored)
+        for bot in restored:
+            await self.start_bot(bot.bot_id)
+
+        open_positions = sum(1 for _, state in rows if state and state.get("is_position_open"))
+        bot_logger.info(f"{len(restored)} bots restored, {open_positions} with an open position")
+        return [bot.bot_id for bot in restored]
+
+    async def warm_caches(self, bots: List[BaseBot]):
+        """Fetch the history of every market of `bots` once, concurrently (bounded by max_concurrency)"""
+        limits: Dict[tuple, int] = {}
+        for bot in bots:
+            key = (bot.strategy.symbol, bot.strategy.timeframe)
+            limits[key] = max(limits.get(key, 0), history_limit(bot.strategy))
+
+        semaphore = asyncio.Semaphore(self.scheduler.max_concurrency)
+
+        async def warm(symbol, timeframe, limit):
+            async with semaphore:
+                try:
+                    with metrics.span("warm_cache"):
+                        await self.exchange.get_history(symbol, timeframe, limit=limit)
+                except Exception as e:
+                    # Not fatal: the first tick fetches it
+                    bot_logger.error(f"Cache warm-up of {symbol} {timeframe} failed: {e}")
+
+        await asyncio.gather(*(warm(symbol, timeframe, limit) for (symbol, timeframe), limit in limits.items()))
+
+    def _rebuild(self, db_bot, state) -> BaseBot:
+        bot = build_bot_from_orm(db_bot)
+        if state and hasattr(bot.strategy, "restore_state"):
+            bot.strategy.restore_state(state)
+        return bot
+
 
     def list_running_bots(self):
         return [
@@ -52,6 +156,7 @@ class BotManager:
                 "status": bot.status,
                 "strategy": bot.strategy.__class__.__name__,
                 "params": bot.strategy.model_dump(),  # only public fields
+                "latency": metrics.bot_summary(bot.bot_id),
             }
             for bot in self._bots.values()
         ]
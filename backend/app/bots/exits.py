@@ -0,0 +1,153 @@
+"""
+Stop-loss / take-profit exits evaluated on the candles' high / low ("intrabar" exit mode).
+
+On the close only, a stop touched by a wick between two checks is missed, and an exit is filled
+at the close instead of at its level. Here a position exits on the first candle whose low reaches
+the stop-loss or whose high reaches the take-profit, at that level:
+- a candle opening beyond the level (gap) is filled at its open, the price actually available
+- a candle touching both levels exits at the stop-loss: the candle doesn't tell which came first,
+  the worst case is assumed
+
+- first_exit: vectorized search over a whole series (backtests)
+- live_exit: the candles received since the last check (live trading, replay)
+- backtest_positions: the entry / exit walk of a vectorized backtest, jumping from signal to exit
+"""
+from bisect import bisect_right
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.order import Order
+
+STOP_LOSS, TAKE_PROFIT = "stop-loss", "take-profit"
+
+Exit = Tuple[str, float]  # (reason, fill price)
+
+
+def candle_exit(open_: float, high: float, low: float, stop_loss: float, take_profit: float) -> Optional[Exit]:
+    """Exit of a position on one candle, None if neither level is reached"""
+    if low <= stop_loss:
+        return STOP_LOSS, float(min(open_, stop_loss))
+    if high >= take_profit:
+        return TAKE_PROFIT, float(max(open_, take_profit))
+    return None
+
+
+def first_exit(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray, start: int, end: int,
+               stop_loss: float, take_profit: float, chunk: int = 64) -> Optional[Tuple[int, str, float]]:
+    """
+    First candle of [start, end) reaching a level, as (index, reason, fill price).
+    The series is scanned by growing chunks: a trade lasting a few candles doesn't pay for the whole series.
+    """
+    i = start
+    while i < end:
+        stop = min(end, i + chunk)
+        touched = (lows[i:stop] <= stop_loss) | (highs[i:stop] >= take_profit)
+        if touched.any():
+            j = i + int(touched.argmax())
+            return (j, *candle_exit(opens[j], highs[j], lows[j], stop_loss, take_profit))
+        i = stop
+        chunk *= 4
+    return None
+
+
+def live_exit(history, since: Optional[int], stop_loss: float, take_profit: float) -> Tuple[Optional[Exit], Optional[int]]:
+    """
+    Exit on the candles of `history` (timestamp/open/high/low columns) after the `since` timestamp,
+    the current one included (its high / low so far when it is still forming).
+    Returns the exit and the timestamp to check after next time: the last closed candle,
+    so the current one is checked again once complete.
+    """
+    timestamps = timestamp_values(history['timestamp'])
+    if len(timestamps) == 0:
+        return None, since
+    start = len(timestamps) - 1 if since is None else bisect_right(timestamps, since)
+    hit = first_exit(np.asarray(history['open'], dtype=np.float64), np.asarray(history['high'], dtype=np.float64),
+                     np.asarray(history['low'], dtype=np.float64), start, len(timestamps), stop_loss, take_profit)
+    if len(timestamps) > 1 and (since is None or timestamps[-2] > since):
+        since = timestamps[-2]
+    return (hit[1:] if hit else None), since
+
+
+def timestamp_values(timestamps) -> List[int]:
+    """Candle timestamps as ints (datetimes as ns): comparable, and JSON serializable in the bot snapshots"""
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == "M":
+        timestamps = timestamps.astype("datetime64[ns]")
+    return timestamps.astype(np.int64).tolist()
+
+
+def backtest_positions(closes: List[float], opens: np.ndarray, highs: np.ndarray, lows: np.ndarray, start: int,
+                       buys: np.ndarray, sells: np.ndarray, is_open: Callable[[], bool],
+                       levels: Callable[[], Tuple[float, float]], on_signal: Callable[[int], Optional[Order]],
+                       on_exit: Callable[[str, float], Order]) -> List[Order]:
+    """
+    Orders of a backtest in intrabar mode, the same as replaying the candles one by one:
+    - flat: jump to the next buy signal, on_signal(i) opens the position
+    - open: the exit is the first candle reaching SL/TP (first_exit) or the next sell signal, whichever
+      comes first (on the same candle, the levels: they were reached during the candle, the signal is at its close)
+    One order per candle: after an exit, the next entry is looked for from the next candle.
+    buys / sells: sorted indexes of the buy / sell signals
+    """
+    orders = []
+    i = start
+    end = len(closes)
+    while i < end:
+        if not is_open():
+            k = int(np.searchsorted(buys, i))
+            if k == len(buys):
+                break
+            i = int(buys[k])
+            order = on_signal(i)
+            if order:
+                orders.append(order)
+            i += 1
+            continue
+
+        k = int(np.searchsorted(sells, i))
+        sell = int(sells[k]) if k < len(sells) else end
+        stop_loss, take_profit = levels()
+        hit = first_exit(opens, highs, lows, i, min(sell + 1, end), stop_loss, take_profit)
+        if hit:
+            j, reason, price = hit
+            orders.append(on_exit(reason, price))
+            i = j + 1
+        elif sell < end:
+            order = on_signal(sell)
+            if order:
+                orders.append(order)
+            i = sell + 1
+        else:
+            break
+
+    return orders
+
+
+class IntrabarExits:
+    """
+    Live side of the intrabar exit mode, mixed into the strategies. Expects the strategy fields
+    exit_mode, _is_position_open, _stop_loss, _take_profit, _exit_checked_timestamp and _exit_order().
+    """
+
+    def _check_exit(self, history, at_level: bool = False) -> Optional[Order]:
+        """
+        SL/TP on the high / low of the candles since the last check, None in close mode.
+        at_level: the exit is recorded at its SL/TP level (replayed candles, see
+        MarketDataProviderInterface.exits_at_level); otherwise at the current price, the exit
+        being sent as a market order.
+        """
+        if self.exit_mode != "intrabar" or not self._is_position_open or 'high' not in history:
+            return None
+        hit, self._exit_checked_timestamp = live_exit(history, self._exit_checked_timestamp,
+                                                      self._stop_loss, self._take_profit)
+        if hit is None:
+            return None
+        reason, price = hit
+        if not at_level:
+            price = float(history['close'][-1])
+        return self._exit_order(reason, price)
+
+    def _mark_entry(self, order: Optional[Order], history):
+        """A position opened on the current candle: its exits are checked from the next one"""
+        if order is not None and order.side == "BUY":
+            self._exit_checked_timestamp = timestamp_values(history['timestamp'])[-1]
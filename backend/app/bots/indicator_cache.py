@@ -0,0 +1,148 @@
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.bots.indicators import SERIES, cumulative_sum, rolling_mean_from_cumsum
+
+IndicatorKey = Tuple[Hashable, str, int]  # (dataset fingerprint, indicator, window)
+
+
+class IndicatorCache:
+    """
+    Indicator series computed once per dataset and shared by every strategy / config using them.
+
+    Entries are keyed by (dataset fingerprint, indicator, window): in a sweep, the 20/50 and
+    20/100 configs share the 20 moving average, and every moving average of a dataset comes
+    from the same cumulative sum (computed once too).
+    Least recently used entries are evicted when the cache goes over max_bytes.
+    Cached arrays are read-only: they are shared.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[IndicatorKey, np.ndarray]" = OrderedDict()
+        self._scopes: Dict[Hashable, Hashable] = {}  # scope (e.g. live market) -> its latest fingerprint
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.computations = 0  # indicator series actually computed
+
+    @staticmethod
+    def fingerprint(*arrays: np.ndarray) -> str:
+        """Identifies a dataset by its content (e.g. timestamps and closes)"""
+        digest = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.dtype.str, array.shape)).encode())
+            digest.update(array.data)
+        return digest.hexdigest()
+
+    def get(self, fingerprint: Hashable, indicator: str, window: int) -> Optional[np.ndarray]:
+        key = (fingerprint, indicator, window)
+        values = self._entries.get(key)
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return values
+
+    def put(self, fingerprint: Hashable, indicator: str, window: int, values: np.ndarray) -> np.ndarray:
+        key = (fingerprint, indicator, window)
+        values = np.asarray(values)
+        values.flags.writeable = False
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+        self._entries[key] = values
+        self.nbytes += values.nbytes
+        self._evict()
+        return values
+
+    def rolling_means(self, values: np.ndarray, windows: Iterable[int],
+                      fingerprint: Hashable = None, scope: Hashable = None) -> Dict[int, np.ndarray]:
+        """
+        Simple moving averages of `values` for every window (same values as indicators.rolling_mean).
+        fingerprint: identifies `values`, computed from their content if not given
+        scope: series replacing each other (a live market, new history on every candle): the entries
+        of the previous fingerprint of the scope are dropped, they won't be asked again
+        """
+        values = np.asarray(values, dtype=np.float64)
+        fingerprint = self._enter_scope(values, fingerprint, scope)
+
+        means = {}
+        missing = []
+        for window in windows:
+            cached = self.get(fingerprint, "sma", window)
+            if cached is None:
+                missing.append(window)
+            else:
+                means[window] = cached
+
+        if missing:
+            cumsum = self.get(fingerprint, "cumsum", 0)
+            if cumsum is None:
+                cumsum = self.put(fingerprint, "cumsum", 0, cumulative_sum(values))
+            base = values[0] if len(values) else 0.0
+            for window in missing:
+                self.computations += 1
+                means[window] = self.put(fingerprint, "sma", window, rolling_mean_from_cumsum(cumsum, base, window))
+
+        return means
+
+    def series(self, values: np.ndarray, indicators: Iterable[Tuple[str, int]],
+               fingerprint: Hashable = None, scope: Hashable = None) -> Dict[Tuple[str, int], np.ndarray]:
+        """
+        Any indicator of indicators.SERIES, as (kind, window) -> series (see rolling_means for the arguments).
+        The moving averages still come from the shared cumulative sum.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        fingerprint = self._enter_scope(values, fingerprint, scope)
+        indicators = list(dict.fromkeys(indicators))
+
+        windows = [window for kind, window in indicators if kind == "sma"]
+        means = self.rolling_means(values, windows, fingerprint) if windows else {}
+        result = {}
+        for kind, window in indicators:
+            if kind == "sma":
+                result[(kind, window)] = means[window]
+                continue
+            cached = self.get(fingerprint, kind, window)
+            if cached is None:
+                self.computations += 1
+                cached = self.put(fingerprint, kind, window, SERIES[kind](values, window))
+            result[(kind, window)] = cached
+        return result
+
+    def _enter_scope(self, values: np.ndarray, fingerprint: Hashable, scope: Hashable) -> Hashable:
+        if fingerprint is None:
+            fingerprint = self.fingerprint(values)
+        if scope is not None:
+            previous = self._scopes.get(scope)
+            if previous is not None and previous != fingerprint:
+                self.discard(previous)
+            self._scopes[scope] = fingerprint
+        return fingerprint
+
+    def discard(self, fingerprint: Hashable):
+        """Drop every entry of a dataset"""
+        for key in [key for key in self._entries if key[0] == fingerprint]:
+            self.nbytes -= self._entries.pop(key).nbytes
+
+    def _evict(self):
+        # Always keep the most recent entry, even if alone it is over the budget
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self._scopes.clear()
+        self.nbytes = 0
+
+
+# Shared by every live strategy of the process (indicator_mode="shared")
+shared_indicator_cache = IndicatorCache()
@@ -0,0 +1,285 @@
+"""
+Indicator helpers shared by the strategies.
+
+- whole-series NumPy functions (backtests, sweeps): same values as the pandas calls
+  used by the strategies, without building a DataFrame
+- RollingMean / RollingStd / WilderRSI: updated one candle at a time (live trading, incremental mode)
+- SERIES / STREAMING: indicator kind ("sma", "std", "rsi") -> whole-series function / one-candle state,
+  what the strategy engine uses for the indicators a strategy declares
+"""
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Relative gap under which two moving averages are taken as equal (no trend). Every path sums the
+# windows its own way (pandas, cumulative sums, running sums): on a flat market the averages are
+# equal up to the last bits, which must not decide a crossover in one mode and not in another.
+TREND_TOLERANCE = 1e-9
+
+
+def cumulative_sum(values: np.ndarray) -> np.ndarray:
+    """
+    Running sum of the series shifted by its first value, with a leading 0:
+    every moving average of the series is a difference of two of its elements.
+    (a year of BTC closes summed raw would lose precision on the last digits)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.zeros(1)
+    return np.concatenate(([0.0], np.cumsum(values - values[0])))
+
+
+def rolling_mean_from_cumsum(cumsum: np.ndarray, base: float, window: int) -> np.ndarray:
+    """Moving average from cumulative_sum(values), base = values[0]"""
+    length = len(cumsum) - 1
+    result = np.full(length, np.nan)
+    if window <= 0 or length < window:
+        return result
+
+    # Cumulative-sum trick: mean(t) = (cumsum[t] - cumsum[t - window]) / window
+    result[window - 1:] = base + (cumsum[window:] - cumsum[:-window]) / window
+    return result
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average over `window` values, like pandas `.rolling(window).mean()`.
+    The first `window - 1` rows are NaN (not enough candles yet).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 0 or len(values) < window:
+        return np.full(len(values), np.nan)
+    return rolling_mean_from_cumsum(cumulative_sum(values), values[0], window)
+
+
+def rolling_means(values: np.ndarray, windows) -> Dict[int, np.ndarray]:
+    """Moving averages of several windows from a single cumulative sum (same values as rolling_mean)"""
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = cumulative_sum(values)
+    base = values[0] if len(values) else 0.0
+    return {window: rolling_mean_from_cumsum(cumsum, base, window) for window in windows}
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Moving sample standard deviation over `window` values, like pandas `.rolling(window).std()`.
+    Two passes per window (mean, then squared deviations): a running sum of squares of prices
+    would cancel out most of its digits on flat markets.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 1 or len(values) < window:
+        return result
+    windows = sliding_window_view(values, window)
+    deviations = windows - windows.mean(axis=1)[:, None]
+    result[window - 1:] = np.sqrt((deviations * deviations).sum(axis=1) / (window - 1))
+    return result
+
+
+def wilder_rsi(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Relative Strength Index with Wilder's smoothing (exponential average of the gains and
+    losses, alpha = 1 / window, seeded with the first change).
+    RSI = 100 * avg_gain / (avg_gain + avg_loss): 50 on a flat market, NaN for the first `window` rows.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) <= window:
+        return result
+    changes = np.diff(values)
+    # pandas runs the recursive average in C (no NumPy equivalent without a python loop)
+    average_gain = pd.Series(np.maximum(changes, 0.0)).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    average_loss = pd.Series(np.maximum(-changes, 0.0)).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    result[window:] = _rsi(average_gain[window - 1:], average_loss[window - 1:])
+    return result
+
+
+def _rsi(average_gain, average_loss):
+    total = average_gain + average_loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, 100.0 * average_gain / total, 50.0)
+
+
+def trend_series(short_ma, long_ma) -> np.ndarray:
+    """Vectorized trend_sign: +1 when short > long, -1 when short < long, 0 otherwise (equal within TREND_TOLERANCE, or NaN)"""
+    short_ma = np.asarray(short_ma, dtype=np.float64)
+    long_ma = np.asarray(long_ma, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        distinct = np.abs(short_ma - long_ma) > TREND_TOLERANCE * np.maximum(np.abs(short_ma), np.abs(long_ma))
+    signal = np.zeros(len(short_ma), dtype=np.int64)
+    signal[distinct & (short_ma > long_ma)] = 1
+    signal[distinct & (short_ma < long_ma)] = -1
+    return signal
+
+
+def crossover_series(short_ma: np.ndarray, long_ma: np.ndarray) -> np.ndarray:
+    """
+    Trend sign and its change, like the pandas path of the MA crossover strategy:
+      signal    = trend_series(short_ma, long_ma)
+      crossover = signal.diff() -> +2 on upward cross, -2 on downward cross
+    """
+    signal = trend_series(short_ma, long_ma)
+
+    crossover = np.zeros(len(signal), dtype=np.int64)
+    crossover[1:] = np.diff(signal)
+    return crossover
+
+
+class RollingMean:
+    """
+    Moving average updated in constant time, one value at a time (live trading, replay).
+    Keeps a ring buffer of the last `window` values and their running sum, instead of
+    recomputing the mean over the whole window on every candle.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._buffer = [0.0] * window
+        self._index = 0  # next slot to overwrite = oldest value once the buffer is full
+        self._count = 0
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of values pushed so far"""
+        return self._count
+
+    @property
+    def value(self) -> float:
+        """Mean of the last `window` values, NaN until the window is full"""
+        if self._count < self.window:
+            return float("nan")
+        return self._sum / self.window
+
+    def push(self, value: float) -> float:
+        """Add a closed value to the window and return the new mean"""
+        self._sum += value - self._buffer[self._index]
+        self._buffer[self._index] = value
+        self._index = (self._index + 1) % self.window
+        self._count += 1
+
+        # Adding/removing floats for months drifts the last digits of the running sum:
+        # re-sum the buffer exactly once per full rotation (still O(1) amortized)
+        if self._index == 0:
+            self._sum = math.fsum(self._buffer)
+
+        return self.value
+
+    def peek(self, value: float) -> float:
+        """Mean the window would have if `value` was pushed, without changing the state"""
+        if self._count + 1 < self.window:
+            return float("nan")
+        oldest = self._buffer[self._index] if self._count >= self.window else 0.0
+        return (self._sum - oldest + value) / self.window
+
+
+class RollingStd:
+    """
+    Moving sample standard deviation updated one value at a time (same values as rolling_std).
+    The window is small (a few dozen candles): it is re-read on every push, in two passes,
+    rather than kept as running sums of squares that lose precision.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._buffer = [0.0] * window
+        self._index = 0
+        self._count = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def value(self) -> float:
+        if self._count < self.window or self.window <= 1:
+            return float("nan")
+        return self._std(self._buffer)
+
+    def push(self, value: float) -> float:
+        self._buffer[self._index] = value
+        self._index = (self._index + 1) % self.window
+        self._count += 1
+        return self.value
+
+    def peek(self, value: float) -> float:
+        if self._count + 1 < self.window or self.window <= 1:
+            return float("nan")
+        buffer = list(self._buffer)
+        buffer[self._index] = value
+        return self._std(buffer)
+
+    def _std(self, values) -> float:
+        mean = math.fsum(values) / self.window
+        return math.sqrt(math.fsum((value - mean) ** 2 for value in values) / (self.window - 1))
+
+
+class WilderRSI:
+    """
+    Relative Strength Index updated one value at a time (same values as wilder_rsi):
+    only the previous value and the two averages are kept.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._alpha = 1 / window
+        self._previous: Optional[float] = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def value(self) -> float:
+        if self._count <= self.window:
+            return float("nan")
+        return self._rsi(self._gain, self._loss)
+
+    def push(self, value: float) -> float:
+        if self._previous is not None:
+            self._gain, self._loss = self._averages(value)
+        self._previous = value
+        self._count += 1
+        return self.value
+
+    def peek(self, value: float) -> float:
+        if self._count + 1 <= self.window:
+            return float("nan")
+        return self._rsi(*self._averages(value))
+
+    def _averages(self, value: float):
+        change = value - self._previous
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self._count == 1:  # first change: seeds the averages
+            return gain, loss
+        return self._smooth(self._gain, gain), self._smooth(self._loss, loss)
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        total = gain + loss
+        return 100.0 * gain / total if total > 0 else 50.0
+
+    def _smooth(self, average: float, value: float) -> float:
+        # Same operations as pandas ewm(adjust=False), so both paths give the same bits
+        if average == value:
+            return average
+        return ((1 - self._alpha) * average + self._alpha * value) / ((1 - self._alpha) + self._alpha)
+
+
+def trend_sign(short_ma: float, long_ma: float) -> int:
+    """+1 when short > long, -1 when short < long, 0 otherwise (equal within TREND_TOLERANCE, or NaN)"""
+    if not abs(short_ma - long_ma) > TREND_TOLERANCE * max(abs(short_ma), abs(long_ma)):
+        return 0
+    return 1 if short_ma > long_ma else -1
+
+
+# Indicator kinds a strategy can declare: whole-series function (backtests, shared mode)
+# and one-candle state (incremental mode), giving the same values
+SERIES = {"sma": rolling_mean, "std": rolling_std, "rsi": wilder_rsi}
+STREAMING = {"sma": RollingMean, "std": RollingStd, "rsi": WilderRSI}
@@ -0,0 +1,238 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.bots.base import BaseBot, BotStatus
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.services.logging import bot_logger
+
+MarketKey = Tuple[str, str]  # (symbol, timeframe)
+
+# "M" (month) is nominal, 30 days like ccxt: the candle closes are computed on the calendar
+TIMEFRAME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+
+# Weekly candles open on Monday 00:00 UTC (like Binance): the epoch was a Thursday
+WEEK_OFFSET = 4 * 86400
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """"15m" -> 900, "1h" -> 3600, "4h" -> 14400"""
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def history_limit(strategy) -> int:
+    """Candles a strategy asks for on a check (its history_limit(), ~5x the long window otherwise)"""
+    limit = getattr(strategy, "history_limit", None)
+    return limit() if limit else getattr(strategy, "long_window", 50) * 5
+
+
+def seconds_until_next_close(timeframe: str, now: float) -> float:
+    """
+    Candles are aligned like Binance's: on the epoch (the 1h candle closes at every full hour),
+    weeks on Monday 00:00 UTC, months on the 1st of the calendar month (UTC)
+    """
+    if timeframe[-1] == "M":
+        return _next_month_start(int(timeframe[:-1]), now) - now
+    period = timeframe_seconds(timeframe)
+    offset = WEEK_OFFSET if timeframe[-1] == "w" else 0
+    return period - ((now - offset) % period)
+
+
+def _next_month_start(months: int, now: float) -> float:
+    """Start of the next candle of `months` months, counted from January 1970"""
+    date = datetime.fromtimestamp(now, tz=timezone.utc)
+    elapsed = (date.year - 1970) * 12 + date.month - 1
+    start = elapsed + months - elapsed % months
+    return datetime(1970 + start // 12, start % 12 + 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+class BotScheduler:
+    """
+    Runs bots grouped by market (symbol, timeframe) instead of one sleeping task per bot.
+
+    One loop per market waits for the candle close, fetches the history once (the exchange's
+    candle cache then serves every bot of the group) and ticks all the bots of the group together.
+    - max_concurrency bounds the ticks running at the same time, across all markets
+    - close_delay + a random jitter (up to max_jitter) after the close gives the exchange time
+      to publish the closed candle, and spreads the markets so they don't all hit it at once
+    - between two closes, the bots holding a position check their SL/TP every check_interval
+      (strategy.check_exit): a stop isn't left for the whole candle on long timeframes
+    """
+
+    def __init__(self, exchange, order_service, max_concurrency: int = 50,
+                 close_delay: float = 2.0, max_jitter: float = 3.0, state_store=None):
+        self.exchange = exchange
+        self.order_service = order_service
+        self.state_store = state_store  # snapshots the bots' state after their ticks
+        self.max_concurrency = max_concurrency
+        self.close_delay = close_delay
+        self.max_jitter = max_jitter
+
+        self._groups: Dict[MarketKey, Dict[str, BaseBot]] = {}
+        self._tasks: Dict[MarketKey, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Ticks run in their own tasks: stopping a market loop never cancels a tick mid-order
+        self._ticks: Dict[str, asyncio.Task] = {}  # bot_id -> its tick (running, or waiting for the semaphore)
+        self._started: Set[str] = set()  # bots whose tick is past the semaphore
+        self._stopping = False
+
+    @staticmethod
+    def _market(bot: BaseBot) -> MarketKey:
+        return bot.strategy.symbol, bot.strategy.timeframe
+
+    def add(self, bot: BaseBot):
+        if self._stopping:
+            raise RuntimeError("Scheduler is shutting down")
+        key = self._market(bot)
+        self._groups.setdefault(key, {})[bot.bot_id] = bot
+        if key not in self._tasks or self._tasks[key].done():
+            self._tasks[key] = asyncio.create_task(self._run_market(key))
+
+    def remove(self, bot_id: str):
+        for key, group in self._groups.items():
+            if group.pop(bot_id, None) is not None:
+                # The market loop ends by itself once its group is empty
+                return
+
+    def markets(self) -> Dict[MarketKey, int]:
+        """Number of bots per market"""
+        return {key: len(group) for key, group in self._groups.items() if group}
+
+    async def _run_market(self, key: MarketKey):
+        symbol, timeframe = key
+        bot_logger.info(f"Scheduler started market {symbol} {timeframe}")
+        while self._groups.get(key) and not self._stopping:
+            try:
+                await self._wait_candle_close(symbol, timeframe)
+                await self.tick_market(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bot_logger.error(f"Scheduler error on {symbol} {timeframe}: {e}")
+
+        self._groups.pop(key, None)
+        self._tasks.pop(key, None)
+        bot_logger.info(f"Scheduler stopped market {symbol} {timeframe}")
+
+    async def _wait_candle_close(self, symbol: str, timeframe: str):
+        key = (symbol, timeframe)
+        if isinstance(self.exchange, MarketDataProviderInterface) and self.exchange.pushes_candle_closes:
+            # Pushed by the stream: no need to guess when the candle is published
+            while True:
+                interval = self._exit_interval(key)
+                closed = await self.exchange.wait_for_candle_close(symbol, timeframe,
+                                                                   timeout=interval or timeframe_seconds(timeframe))
+                if closed or interval is None:
+                    return
+                await self.check_exits(key)
+
+        close = time.time() + seconds_until_next_close(timeframe, time.time())
+        while (interval := self._exit_interval(key)) is not None and time.time() + interval < close:
+            await asyncio.sleep(interval)
+            await self.check_exits(key)
+        delay = max(0.0, close - time.time()) + self.close_delay
+        await asyncio.sleep(delay + random.uniform(0, self.max_jitter))
+
+    def _exit_interval(self, key: MarketKey) -> Optional[float]:
+        """Shortest check_interval of the bots of the market holding a position (None: nothing to check)"""
+        intervals = [bot.check_interval for bot in self._exit_bots(key) if bot.check_interval > 0]
+        return min(intervals, default=None)
+
+    def _exit_bots(self, key: MarketKey) -> List[BaseBot]:
+        return [bot for bot in self._groups.get(key, {}).values()
+                if bot.status == BotStatus.RUNNING and hasattr(bot.strategy, "check_exit")
+                and getattr(bot.strategy, "_is_position_open", False)]
+
+    async def check_exits(self, key: MarketKey):
+        """SL/TP check of the bots of the market holding a position, between two candle closes"""
+        bots = self._exit_bots(key)
+        if bots and not self._stopping:
+            await self._run_ticks(bots, exits_only=True)
+
+    async def tick_market(self, key: MarketKey):
+        """Fetch the market data once, then tick every running bot of the market as one batch"""
+        symbol, timeframe = key
+        bots = [bot for bot in self._groups.get(key, {}).values() if bot.status == BotStatus.RUNNING]
+        if not bots or self._stopping:
+            return
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # Largest history any bot of the group asks for: the other requests are served from the cache
+        limit = max(history_limit(bot.strategy) for bot in bots)
+        async with self._semaphore:
+            await self.exchange.get_history(symbol, timeframe, limit=limit)
+        await self._run_ticks(bots)
+
+    async def _run_ticks(self, bots: List[BaseBot], exits_only: bool = False):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        ticks = []
+        for bot in bots:
+            if bot.bot_id in self._ticks:
+                continue  # still busy with the previous candle
+            task = asyncio.create_task(self._tick_bot(bot, exits_only))
+            self._ticks[bot.bot_id] = task
+            task.add_done_callback(lambda _, bot_id=bot.bot_id: self._ticks.pop(bot_id, None))
+            ticks.append(task)
+        if ticks:
+            # wait(), not gather(): cancelling this loop leaves the ticks running (see shutdown)
+            await asyncio.wait(ticks)
+
+    async def _tick_bot(self, bot: BaseBot, exits_only: bool = False):
+        async with self._semaphore:
+            if self._stopping or bot.status != BotStatus.RUNNING:
+                return  # queued before the stop: never started
+            self._started.add(bot.bot_id)
+            try:
+                if exits_only:
+                    await bot.check_exits(self.exchange, self.order_service)
+                else:
+                    await bot.tick(self.exchange, self.order_service)
+            except Exception as e:
+                bot_logger.error(f"Error in bot tick: {e}", extra={"bot_id": bot.bot_id})
+            finally:
+                self._started.discard(bot.bot_id)
+                # Even a failed tick may have opened / closed the position in the strategy
+                if self.state_store is not None:
+                    self.state_store.record(bot)
+
+    async def wait_tick(self, bot_id: str, timeout: Optional[float] = None) -> bool:
+        """Wait for the running tick of a bot, if any. Returns False if it is still running after timeout."""
+        task = self._ticks.get(bot_id)
+        if task is None:
+            return True
+        done, _ = await asyncio.wait([task], timeout=timeout)
+        return bool(done)
+
+    async def shutdown(self, timeout: float = 10.0) -> int:
+        """
+        Stop ticking: no new tick starts, the market loops stop, and the ticks already running
+        (maybe between an order and its execution) are given `timeout` seconds to finish, concurrently.
+        The ones still running after that are cancelled. Returns the number of ticks cancelled.
+        """
+        self._stopping = True
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+        # Ticks still waiting for the semaphore have done nothing yet: drop them right away
+        queued = [task for bot_id, task in self._ticks.items() if bot_id not in self._started]
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+
+        ticks = list(self._ticks.values())
+        if not ticks:
+            return 0
+        _, pending = await asyncio.wait(ticks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            bot_logger.error(f"{len(pending)} bot ticks still running after {timeout}s, cancelled")
+        return len(pending)
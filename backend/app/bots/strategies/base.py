@@ -1,13 +1,277 @@
-from abc import ABC, abstractmethod
+from abc import abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import ClassVar, Deque, Dict, List, Literal, Optional, Tuple
 
-class BaseStrategy(ABC):
-    def __init__(self, params: dict):
-        self.params = params
+import numpy
+import pandas as pandas
+from pydantic import BaseModel, PrivateAttr
+
+from app.bots.exits import STOP_LOSS, IntrabarExits
+from app.bots.indicators import SERIES, STREAMING
+from app.bots.strategy_engine import BUY, CANDLE_COLUMNS, HOLD, SELL, Indicator, StrategyEngine, strategy_engine
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.models.order import Order
+from app.services.logging import bot_logger
+from app.services.metrics import metrics
+
+# Runtime state persisted across restarts (bot_states table): the open position and its exits.
+# The indicator states are not: they are rebuilt from the history on the first check.
+SNAPSHOT_FIELDS = ("_is_position_open", "_entry_price", "_position_size", "_stop_loss", "_take_profit", "_last_signal",
+                   "_exit_checked_timestamp")
+
+# History asked by the bots in "shared" mode: the same for every bot of a market (see strategy_engine)
+SHARED_HISTORY_LIMIT = 1000
+
+
+class BaseStrategy(IntrabarExits, BaseModel):
+    """
+    Base of the strategies run by the strategy engine (app.bots.strategy_engine).
+
+    A strategy only declares:
+    - indicators(): the indicator series it needs, as (kind, window)
+    - signals(): a pure function of the candles and these series (NumPy arrays, one row per candle)
+      returning BUY / SELL / HOLD for every row
+    The engine fetches the candles, computes the indicators (shared between the strategies of a market),
+    and runs the entry / SL / TP / exit state machine below. So every strategy gets the vectorized
+    backtest, the shared live mode and the incremental live mode without writing them.
+    """
+
+    name: str = "BaseStrategy"
+    designation: str = "Default"
+    symbol: str = "BTC/USDT"
+    timeframe: str = "1h"
+    risk_per_trade: float = 0.01
+    stop_loss_pct: float = 0.02
+    take_profit_pct: float = 0.04
+    # "shared": indicators computed on the fetched history by the engine, shared by the bots of a market
+    # "incremental": indicators kept in memory, only fed the new candles
+    indicator_mode: Literal["shared", "incremental"] = "shared"
+    # "close": SL/TP only checked against the close of the current candle
+    # "intrabar": SL/TP reached by the high / low of the candles since the last check (see exits)
+    exit_mode: Literal["intrabar", "close"] = "close"
+
+    # Rows signals() needs to decide on the last one (2: the previous candle too, to detect a cross)
+    lookback: ClassVar[int] = 2
+
+    _is_position_open: bool = PrivateAttr(default=False)
+    _entry_price: float = PrivateAttr(default=0.0)
+    _position_size: float = PrivateAttr(default=0.0)
+    _stop_loss: float = PrivateAttr(default=0.0)
+    _take_profit: float = PrivateAttr(default=0.0)
+    _last_signal: Optional[str] = PrivateAttr(default=None)
+    _exit_checked_timestamp: Optional[int] = PrivateAttr(default=None)
+    _last_check_time: Optional[datetime] = PrivateAttr(default=None)
+
+    # Incremental indicator state (indicator_mode="incremental")
+    _streams: Optional[Dict[Indicator, object]] = PrivateAttr(default=None)
+    _tail: Optional[Deque[Tuple[Dict[str, float], Dict[Indicator, float]]]] = PrivateAttr(default=None)
+    _closed_count: int = PrivateAttr(default=0)
+    _last_closed_timestamp: Optional[object] = PrivateAttr(default=None)
+
+    # ---------------------------------------------------------------------
+    # Declared by the strategies
+    # ---------------------------------------------------------------------
+    @abstractmethod
+    def indicators(self) -> List[Indicator]:
+        """Indicator series the signals need, as (kind, window)"""
 
     @abstractmethod
-    async def compute_signal(self, market_data: dict) -> dict:
+    def signals(self, candles: Dict[str, numpy.ndarray], indicators: Dict[Indicator, numpy.ndarray]) -> numpy.ndarray:
+        """BUY / SELL / HOLD for every row. Must not depend on more than the last `lookback` rows."""
+
+    # ---------------------------------------------------------------------
+    def model_post_init(self, __context):
+        for kind, window in self.indicators():
+            if kind not in SERIES:
+                raise ValueError(f"Unknown indicator: {kind}")
+            if window < 1:
+                raise ValueError(f"Invalid {kind} window: {window}")
+
+    def warmup(self) -> int:
+        """Candles before the first one that can produce a signal (every indicator is defined from there)"""
+        return max((window for _, window in self.indicators()), default=0)
+
+    def history_limit(self) -> int:
+        """Largest number of candles asked to the market data on a check (~5x the warmup for mature indicators)"""
+        if self.indicator_mode == "shared":
+            return max(SHARED_HISTORY_LIMIT, self.warmup() * 5)
+        return max(self.warmup() * 5, self.lookback + 1)
+
+    def snapshot_state(self) -> Dict:
+        """Private runtime state, JSON serializable (see restore_state)"""
+        return {field.lstrip("_"): getattr(self, field) for field in SNAPSHOT_FIELDS}
+
+    def restore_state(self, state: Dict):
+        for field in SNAPSHOT_FIELDS:
+            if field.lstrip("_") in state:
+                setattr(self, field, state[field.lstrip("_")])
+
+    def signal_series(self, candles: Dict[str, numpy.ndarray], indicators: Dict[Indicator, numpy.ndarray]) -> numpy.ndarray:
+        """signals() over whole series, without the warmup candles"""
+        signals = numpy.asarray(self.signals(candles, indicators), dtype=numpy.int8)
+        signals[:self.warmup()] = HOLD
+        return signals
+
+    def calculate_position_size(self, capital: float, current_price: float) -> float:
+        """amount_to_spend = capital x risk_per_trade, position_size = amount_to_spend / price"""
+        return capital * self.risk_per_trade / current_price
+
+    # ---------------------------------------------------------------------
+    # Live
+    # ---------------------------------------------------------------------
+    async def generate_signals(self, market_data: MarketDataProviderInterface, capital: float = 1000.0) -> Optional[Order]:
+        if self.indicator_mode == "incremental":
+            return await self._generate_incremental_signals(market_data, capital)
+        return (await strategy_engine.evaluate(market_data, [self], capital))[0]
+
+    async def check_exit(self, market_data: MarketDataProviderInterface) -> Optional[Order]:
         """
-        Returns dict with action info, e.g.,
-        {"side": "buy", "amount": 1.2}
+        SL/TP of the open position on the candle still forming, between two candle closes
+        (BotScheduler, every check_interval). Never opens a position nor acts on a signal.
+        """
+        if not self._is_position_open:
+            return None
+        with metrics.span("fetch"):
+            history = await market_data.get_arrays(self.symbol, self.timeframe, limit=3)
+        if not history or len(history['close']) == 0:
+            return None
+        order = self._check_exit(history, market_data.exits_at_level)
+        if order is None and self.exit_mode == "close":
+            order = self._evaluate_candle(float(history['close'][-1]), HOLD, capital=0.0)
+        return order
+
+    async def _generate_incremental_signals(self, market_data: MarketDataProviderInterface, capital: float) -> Optional[Order]:
         """
-        pass
+        Same signals as the shared mode, but every indicator is updated in O(1) per new candle
+        (see indicators.STREAMING). Closed candles are pushed once; the last candle may still be
+        forming, so it is only peeked, then signals() runs on the last `lookback` rows.
+        """
+        start = None
+        if self._last_closed_timestamp is not None:
+            with metrics.span("fetch"):
+                history = await market_data.get_arrays(self.symbol, self.timeframe, limit=3)
+            timestamps = history['timestamp'].tolist() if history else []
+            if self._last_closed_timestamp in timestamps[:-1]:
+                start = timestamps.index(self._last_closed_timestamp) + 1
+
+        if start is None:
+            # First call, or candles were missed since the last call: (re)build the indicators
+            with metrics.span("fetch"):
+                history = await market_data.get_arrays(self.symbol, self.timeframe, limit=self.history_limit())
+            self._streams = {indicator: STREAMING[indicator[0]](indicator[1]) for indicator in self.indicators()}
+            self._tail = deque(maxlen=self.lookback - 1)
+            self._closed_count = 0
+            self._last_closed_timestamp = None
+            start = 0
+
+        if not history or len(history['close']) == 0:
+            return None
+
+        columns = {name: history[name].tolist() for name in CANDLE_COLUMNS if name in history}
+        timestamps = history['timestamp'].tolist()
+        last = len(timestamps) - 1
+
+        with metrics.span("indicators"):
+            for i in range(start, last):
+                close = columns['close'][i]
+                values = {indicator: stream.push(close) for indicator, stream in self._streams.items()}
+                self._tail.append(({name: column[i] for name, column in columns.items()}, values))
+                self._closed_count += 1
+                self._last_closed_timestamp = timestamps[i]
+
+            if self._closed_count < self.warmup():
+                return None
+
+            close = columns['close'][last]
+            current = ({name: column[last] for name, column in columns.items()},
+                       {indicator: stream.peek(close) for indicator, stream in self._streams.items()})
+            rows = [*self._tail, current]
+            candles = {name: numpy.array([row[0][name] for row in rows]) for name in columns}
+            indicators = {indicator: numpy.array([row[1][indicator] for row in rows]) for indicator in self._streams}
+            signal = int(self.signals(candles, indicators)[-1])
+
+        self._last_check_time = datetime.now()
+        return self._evaluate_with_exits(history, close, signal, capital, market_data.exits_at_level)
+
+    # ---------------------------------------------------------------------
+    # Backtest
+    # ---------------------------------------------------------------------
+    def backtest(self, candles: pandas.DataFrame, capital: float = 1000.0, indicators=None, fingerprint=None) -> List[Order]:
+        """
+        Vectorized backtest over the whole dataset: the same orders as ticking a HistoricalExchange
+        through generate_signals (see StrategyEngine.backtest).
+        indicators: IndicatorCache shared by the backtests of a sweep
+        """
+        return StrategyEngine(indicators).backtest(candles, [self], capital, fingerprint)[0]
+
+    # ---------------------------------------------------------------------
+    # Entry / SL / TP / exit
+    # ---------------------------------------------------------------------
+    def _evaluate_candle(self, current_price: float, signal: int, capital: float) -> Optional[Order]:
+        """
+        Entry/SL/TP/exit state machine for one candle:
+        SL/TP first, then the BUY / SELL signal of the strategy.
+        """
+        if self._is_position_open and current_price <= self._stop_loss:
+            return self._close_position(current_price, "stop-loss", f" | sl={self._stop_loss:.2f}")
+
+        if self._is_position_open and current_price >= self._take_profit:
+            return self._close_position(current_price, "take-profit", f" | tp={self._take_profit:.2f}")
+
+        if signal == BUY:
+            if self._is_position_open:
+                bot_logger.info(f"BUY signal skipped — position already open | {self.symbol} | price={current_price:.2f}")
+                return None
+            self._position_size = self.calculate_position_size(capital, current_price)
+            self._entry_price = current_price
+            self._is_position_open = True
+            self._stop_loss = current_price * (1 - self.stop_loss_pct)
+            self._take_profit = current_price * (1 + self.take_profit_pct)
+            self._last_signal = "BUY"
+            bot_logger.info(
+                f"BUY  | {self.symbol} | price={current_price:.2f}"
+                f" | amount={self._position_size:.6f}"
+                f" | sl={self._stop_loss:.2f} tp={self._take_profit:.2f} | {self.name}"
+            )
+            order = self._order("BUY", current_price)
+            order.stop_loss = self._stop_loss
+            order.take_profit = self._take_profit
+            return order
+
+        if signal == SELL:
+            if not self._is_position_open:
+                bot_logger.info(f"SELL signal skipped — no open position | {self.symbol} | price={current_price:.2f}")
+                return None
+            return self._close_position(current_price, self.name, f" | entry={self._entry_price:.2f}")
+
+        return None
+
+    def _evaluate_with_exits(self, history, current_price: float, signal: int, capital: float,
+                             exits_at_level: bool = False) -> Optional[Order]:
+        """Intrabar SL/TP on the candles since the last check, then the current candle"""
+        order = self._check_exit(history, exits_at_level)
+        if order is None:
+            order = self._evaluate_candle(current_price, signal, capital)
+            self._mark_entry(order, history)
+        return order
+
+    def _exit_order(self, reason: str, price: float) -> Order:
+        level = f" | sl={self._stop_loss:.2f}" if reason == STOP_LOSS else f" | tp={self._take_profit:.2f}"
+        return self._close_position(price, reason, level)
+
+    def _close_position(self, current_price: float, reason: str, extra_log: str = "") -> Order:
+        self._is_position_open = False
+        self._last_signal = "SELL"
+        pnl = (current_price - self._entry_price) * self._position_size
+        bot_logger.info(
+            f"SELL ({reason}) | {self.symbol} | price={current_price:.2f}"
+            f" | amount={self._position_size:.6f}"
+            f" | pnl={pnl:+.2f} USDT"
+            + extra_log
+        )
+        return self._order("SELL", current_price)
+
+    def _order(self, side: str, price: float) -> Order:
+        return Order(bot_id="", symbol=self.symbol, side=side, amount=self._position_size,
+                     price=price, created_at=datetime.now())
@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+import numpy
+
+from app.bots.strategies.base import BUY, HOLD, SELL, BaseStrategy, Indicator
+
+
+class BollingerBandsStrategy(BaseStrategy):
+    """
+    Mean reversion on the Bollinger bands (moving average +/- num_std standard deviations).
+    Buy when the close comes back above the lower band.
+    Sell when the close breaks above the upper band.
+    """
+
+    name: str = "BollingerBandsStrategy"
+    window: int = 20
+    num_std: float = 2.0
+
+    def indicators(self) -> List[Indicator]:
+        return [("sma", self.window), ("std", self.window)]
+
+    def signals(self, candles: Dict[str, numpy.ndarray], indicators: Dict[Indicator, numpy.ndarray]) -> numpy.ndarray:
+        close = candles["close"]
+        middle = indicators[("sma", self.window)]
+        width = self.num_std * indicators[("std", self.window)]
+        lower, upper = middle - width, middle + width
+
+        signals = numpy.full(len(close), HOLD, dtype=numpy.int8)
+        signals[1:][(close[:-1] < lower[:-1]) & (close[1:] >= lower[1:])] = BUY
+        signals[1:][(close[:-1] <= upper[:-1]) & (close[1:] > upper[1:])] = SELL
+        return signals
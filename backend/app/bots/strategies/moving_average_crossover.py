@@ -1,21 +1,23 @@
-import asyncio
+import numpy
 import pandas as pandas  # convert OHLCV data (Open, High, Low, Close, Volume) into a pandas DataFrame
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, PrivateAttr
-
-from app.infrastructure.adapters.binance_adapter import BinanceAdapter
+from app.bots.indicators import trend_series
+from app.bots.strategies.base import BUY, HOLD, SELL, BaseStrategy, Indicator
 from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
 from app.models.order import Order
-from app.services.logging import bot_logger
+from app.services.metrics import metrics
 
 
-class MovingAverageCrossoverStrategy(BaseModel):
+class MovingAverageCrossoverStrategy(BaseStrategy):
     """
     A trading strategy based on moving average crossovers.
     Buy when the short moving average crosses above the long moving average.
     Sell when the short moving average crosses below the long moving average.
+
+    The entry / SL / TP / exit state machine, the backtest and the shared / incremental live
+    modes are the strategy engine's (see BaseStrategy); only the "pandas" mode is specific.
     """
 
     # TODO: the exchange platform (e.g. Binance) should be initialized in the strategy constructor
@@ -24,14 +26,12 @@ class MovingAverageCrossoverStrategy(BaseModel):
 
     # Parameters you want to store in JSONB
     name: str = "MovingAverageCrossoverStrategy"
-    designation: str = "Default"
-    symbol: str = "BTC/USDT"
-    timeframe: str = "1h"
     short_window: int = 20 # avg of last 20 hours
     long_window: int = 50  # avg of last 50 hours
-    risk_per_trade: float = 0.01
-    stop_loss_pct: float = 0.02
-    take_profit_pct: float = 0.04
+    # "pandas": recompute both rolling windows from the fetched history on every check
+    # "incremental": keep running windows in memory and only feed them the new candles
+    # "shared": moving averages served by the process-wide indicator cache (bots on the same market share them)
+    indicator_mode: Literal["pandas", "incremental", "shared"] = "pandas"
 
     # Example of other values:
     # -- Strategy --
@@ -58,16 +58,6 @@ class MovingAverageCrossoverStrategy(BaseModel):
     # | `15m`     | 20       | 50      | 5h vs 12.5h trend |
     # | `4h`      | 20       | 50      | 80h vs 200h trend |
 
-    # Internal runtime state (not stored in DB)
-    _is_position_open: bool = PrivateAttr(default=False)
-    _entry_price: float = PrivateAttr(default=0.0)
-    _position_size: float = PrivateAttr(default=0.0)
-    _last_signal: Optional[str] = PrivateAttr(default=None)
-    _last_check_time: Optional[str] = PrivateAttr(default=None)
-
-    _stop_loss: float = PrivateAttr(default=0.0)
-    _take_profit: float = PrivateAttr(default=0.0)
-
     # async def get_historical_data(self, exchange: BinanceAdapter, limit: int = 250) -> pandas.DataFrame:
     #     """
     #     Return a DataFrame containing historical market data of OHLCV (Open, High, Low, Close, Volume) for the
@@ -93,6 +83,17 @@ class MovingAverageCrossoverStrategy(BaseModel):
     #         print(f"Error retrieving historical data: {e}")
     #         return pandas.DataFrame()
 
+    def indicators(self) -> List[Indicator]:
+        return [("sma", self.short_window), ("sma", self.long_window)]
+
+    def signals(self, candles: Dict[str, numpy.ndarray], indicators: Dict[Indicator, numpy.ndarray]) -> numpy.ndarray:
+        """BUY when the trend (sign of short - long) goes from -1 to +1, SELL from +1 to -1"""
+        trend = trend_series(indicators[("sma", self.short_window)], indicators[("sma", self.long_window)])
+        signals = numpy.full(len(trend), HOLD, dtype=numpy.int8)
+        signals[1:][numpy.diff(trend) == 2] = BUY
+        signals[1:][numpy.diff(trend) == -2] = SELL
+        return signals
+
     def calculate_indicators(self, dataframe: pandas.DataFrame) -> pandas.DataFrame:
         """Calculates technical indicators for the strategy."""
         if len(dataframe) < self.long_window:
@@ -107,11 +108,8 @@ class MovingAverageCrossoverStrategy(BaseModel):
 
         # Crossover signal: +1 when short > long (uptrend), -1 when short < long (downtrend)
         # diff() produces +2 on upward cross, -2 on downward cross
-        dataframe['signal'] = 0
-        # if short avg > long avg => price is increasing
-        # dataframe.loc[condition_lines, column] = x => assign value x to line that validate the condition
-        dataframe.loc[dataframe['short_ma'] > dataframe['long_ma'], 'signal'] = 1
-        dataframe.loc[dataframe['short_ma'] < dataframe['long_ma'], 'signal'] = -1
+        # Averages equal up to their last bits (flat market) are no trend, as in the other modes (see trend_series)
+        dataframe['signal'] = trend_series(dataframe['short_ma'].to_numpy(), dataframe['long_ma'].to_numpy())
 
         # Detect crossovers (signal change)
         # .diff: calc difference between 2 consecutive lines
@@ -123,131 +121,27 @@ class MovingAverageCrossoverStrategy(BaseModel):
 
         return dataframe
 
-    def _close_position(self, current_price: float, reason: str, extra_log: str = "") -> Dict:
-        self._is_position_open = False
-        pnl = (current_price - self._entry_price) * self._position_size
-        bot_logger.info(
-            f"SELL ({reason}) | {self.symbol} | price={current_price:.2f}"
-            f" | amount={self._position_size:.6f}"
-            f" | pnl={pnl:+.2f} USDT"
-            + extra_log
-        )
-        self._last_signal = "SELL"
-        return {
-            "type": "SELL",
-            "symbol": self.symbol,
-            "price": current_price,
-            "amount": self._position_size,
-            "timestamp": datetime.now().isoformat()
-        }
-
-    def calculate_position_size(self, capital: float, current_price: float) -> float:
-        """Calculates position size based on capital and risk
-        amount_to_spend = capital × risk_per_trade  (ex: 1000 × 0.01 = 10 USDT)
-        position_size   = amount_to_spend / price   (ex: 10 / 70000 = 0.000142 BTC)
-        """
-        amount_to_spend = capital * self.risk_per_trade
-        return amount_to_spend / current_price
-
-    async def generate_signals(self, market_data: MarketDataProviderInterface, capital: float = 1000.0) -> Optional[Dict]:
+    async def generate_signals(self, market_data: MarketDataProviderInterface, capital: float = 1000.0) -> Optional[Order]:
         """
         Analyzes data and generates trading signals.
         Returns an order to execute if a signal is detected.
         """
-        history_df = await market_data.get_history(self.symbol, self.timeframe, limit=self.long_window * 5)
-        if history_df.empty:
-            return None
-
-        # Calculate indicators
-        df = self.calculate_indicators(history_df)
-
-        # Drop warmup rows where the long MA is not yet computable (NaN)
-        df = df.iloc[self.long_window:] # supprime les 49 premières lignes où long_ma est NaN sinon la prochaine ligne ne passe pas
+        if self.indicator_mode != "pandas":
+            return await super().generate_signals(market_data, capital)
 
-        if df.empty:
+        with metrics.span("fetch"):
+            history_df = await market_data.get_history(self.symbol, self.timeframe, limit=self.history_limit())
+        # Same warmup as the other modes: at least long_window candles before the current one
+        if len(history_df) <= self.long_window:
             return None
 
-        # Read the latest candle
-        last_row = df.iloc[-1]
-        last_crossover = last_row['crossover']
-        current_price = last_row['close']
-        short_ma = last_row['short_ma']
-        long_ma = last_row['long_ma']
+        # Calculate indicators
+        with metrics.span("indicators"):
+            df = self.calculate_indicators(history_df)
+            means = {("sma", self.short_window): df['short_ma'].to_numpy()[-self.lookback:],
+                     ("sma", self.long_window): df['long_ma'].to_numpy()[-self.lookback:]}
+            signal = int(self.signals({}, means)[-1])
 
         self._last_check_time = datetime.now()
-        signal = None
-
-        # Priority: check SL/TP before crossover signals
-        if self._is_position_open and current_price <= self._stop_loss:
-            signal = self._close_position(current_price, "stop-loss", f" | sl={self._stop_loss:.2f}")
-
-        elif self._is_position_open and current_price >= self._take_profit:
-            signal = self._close_position(current_price, "take-profit", f" | tp={self._take_profit:.2f}")
-
-        # Buy signal: short MA just crossed above long MA
-        elif last_crossover == 2:  # Upward crossing (from -1 to 1)
-            if not self._is_position_open:
-                self._position_size = self.calculate_position_size(capital, current_price)
-                self._entry_price = current_price
-                self._is_position_open = True
-
-                stop_loss = current_price * (1 - self.stop_loss_pct)
-                take_profit = current_price * (1 + self.take_profit_pct)
-
-                self._stop_loss = stop_loss
-                self._take_profit = take_profit
-
-                bot_logger.info(
-                    f"BUY  | {self.symbol} | price={current_price:.2f}"
-                    f" | amount={self._position_size:.6f}"
-                    f" | sl={stop_loss:.2f} tp={take_profit:.2f}"
-                    f" | short_ma={short_ma:.2f} long_ma={long_ma:.2f}"
-                )
-
-                signal = {
-                    "type": "BUY",
-                    "symbol": self.symbol,
-                    "price": current_price,
-                    "amount": self._position_size,
-                    "stop_loss": stop_loss,
-                    "take_profit": take_profit,
-                    "timestamp": datetime.now().isoformat()
-                }
-
-                self._last_signal = "BUY"
-            else:
-                bot_logger.info(
-                    f"BUY signal skipped — position already open | {self.symbol} | price={current_price:.2f}"
-                )
-
-        # Sell signal: short MA just crossed below long MA (only if SL/TP didn't already fire)
-        elif last_crossover == -2:  # Downward crossing (from 1 to -1)
-            if self._is_position_open:
-                signal = self._close_position(
-                    current_price, "MA crossover",
-                    f" | entry={self._entry_price:.2f} | short_ma={short_ma:.2f} long_ma={long_ma:.2f}"
-                )
-            else:
-                bot_logger.info(
-                    f"SELL signal skipped — no open position | {self.symbol} | price={current_price:.2f}"
-                )
-
-        # Create an order if a signal was generated
-        if signal:
-            order = Order(
-                bot_id="",
-                symbol=signal["symbol"],
-                side=signal["type"],
-                amount=signal["amount"],
-                price=signal["price"],
-                created_at=datetime.now()
-            )
-
-            # If it's a buy, add stop loss and take profit
-            if signal["type"] == "BUY":
-                order.stop_loss = signal.get("stop_loss")
-                order.take_profit = signal.get("take_profit")
-
-            return order
-
-        return None
+        return self._evaluate_with_exits(history_df, float(df['close'].iloc[-1]), signal, capital,
+                                         market_data.exits_at_level)
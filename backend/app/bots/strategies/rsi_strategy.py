@@ -0,0 +1,30 @@
+from typing import Dict, List
+
+import numpy
+
+from app.bots.strategies.base import BUY, HOLD, SELL, BaseStrategy, Indicator
+
+
+class RSIStrategy(BaseStrategy):
+    """
+    Mean reversion on the Relative Strength Index (Wilder).
+    Buy when the RSI comes back up through the oversold level.
+    Sell when the RSI comes back down through the overbought level.
+    """
+
+    name: str = "RSIStrategy"
+    rsi_window: int = 14
+    oversold: float = 30.0
+    overbought: float = 70.0
+
+    def indicators(self) -> List[Indicator]:
+        return [("rsi", self.rsi_window)]
+
+    def signals(self, candles: Dict[str, numpy.ndarray], indicators: Dict[Indicator, numpy.ndarray]) -> numpy.ndarray:
+        rsi = indicators[("rsi", self.rsi_window)]
+        previous, current = rsi[:-1], rsi[1:]
+
+        signals = numpy.full(len(rsi), HOLD, dtype=numpy.int8)
+        signals[1:][(previous < self.oversold) & (current >= self.oversold)] = BUY
+        signals[1:][(previous > self.overbought) & (current <= self.overbought)] = SELL
+        return signals
@@ -0,0 +1,132 @@
+"""
+Strategy engine: runs the strategies built on strategies.base.BaseStrategy.
+
+A strategy declares its indicators as (kind, window) and a pure signal function over NumPy arrays.
+The engine does the rest, the same way for every strategy:
+- live (evaluate): one fetch per market, the indicators of all the strategies of the market computed
+  once (shared indicator cache), each signal function run on the last rows only, then the
+  entry / SL / TP / exit state machine of each strategy
+- backtest: the indicators computed once over the whole dataset for a batch of strategies, each signal
+  function run once over the whole series, and only the candles where something can happen
+  (a signal, or an exit: see exits.backtest_positions) go through the state machine
+"""
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.bots.exits import backtest_positions
+from app.bots.indicator_cache import IndicatorCache, shared_indicator_cache
+from app.bots.indicators import SERIES
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.models.order import Order
+from app.services.metrics import metrics
+
+Indicator = Tuple[str, int]  # (kind, window), kind in indicators.SERIES: ("rsi", 14), ("sma", 20)...
+
+# Candle columns given to the signal functions (when the market data has them)
+CANDLE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Signals returned by the signal functions, one per candle
+BUY, SELL, HOLD = 1, -1, 0
+
+
+class StrategyEngine:
+    """
+    indicators: cache the indicator series go through (None: computed on every call, not kept)
+    """
+
+    def __init__(self, indicators: Optional[IndicatorCache] = None):
+        self.indicators = indicators
+
+    def compute(self, close: np.ndarray, indicators: Iterable[Indicator], fingerprint: Hashable = None,
+                scope: Hashable = None) -> Dict[Indicator, np.ndarray]:
+        """Every requested series, each computed once"""
+        if self.indicators is not None:
+            return self.indicators.series(close, indicators, fingerprint, scope)
+        return {(kind, window): SERIES[kind](close, window) for kind, window in dict.fromkeys(indicators)}
+
+    async def evaluate(self, market_data: MarketDataProviderInterface, strategies: List, capital: float = 1000.0
+                       ) -> List[Optional[Order]]:
+        """Live check of a batch of strategies. Returns the order of each strategy (None: nothing to do)."""
+        orders: List[Optional[Order]] = [None] * len(strategies)
+        markets: Dict[Tuple[str, str], List[int]] = {}
+        for i, strategy in enumerate(strategies):
+            markets.setdefault((strategy.symbol, strategy.timeframe), []).append(i)
+
+        for (symbol, timeframe), indexes in markets.items():
+            batch = [strategies[i] for i in indexes]
+            with metrics.span("fetch"):
+                history = await market_data.get_arrays(symbol, timeframe,
+                                                       limit=max(strategy.history_limit() for strategy in batch))
+            if not history or len(history['close']) == 0:
+                continue
+
+            close = np.asarray(history['close'], dtype=np.float64)
+            with metrics.span("indicators"):
+                fingerprint = None
+                if self.indicators is not None:
+                    fingerprint = IndicatorCache.fingerprint(np.asarray(history['timestamp']), close)
+                series = self.compute(close, [indicator for strategy in batch for indicator in strategy.indicators()],
+                                      fingerprint, scope=(symbol, timeframe))
+            candles = {name: np.asarray(history[name], dtype=np.float64) for name in CANDLE_COLUMNS if name in history}
+
+            for i, strategy in zip(indexes, batch):
+                # Same warmup as the backtest: at least warmup() candles before the current one
+                if len(close) <= strategy.warmup():
+                    continue
+                rows = strategy.lookback
+                signal = strategy.signals({name: column[-rows:] for name, column in candles.items()},
+                                          {indicator: series[indicator][-rows:] for indicator in strategy.indicators()})
+                strategy._last_check_time = datetime.now()
+                orders[i] = strategy._evaluate_with_exits(history, float(close[-1]), int(signal[-1]), capital,
+                                                          market_data.exits_at_level)
+
+        return orders
+
+    def backtest(self, candles, strategies: List, capital: float = 1000.0, fingerprint: Hashable = None
+                 ) -> List[List[Order]]:
+        """
+        Vectorized backtest of a batch of strategies over the same candles (DataFrame or arrays).
+        Returns the orders of each strategy: the same as ticking a HistoricalExchange through its generate_signals.
+        """
+        columns = {name: np.asarray(candles[name], dtype=np.float64) for name in CANDLE_COLUMNS if name in candles}
+        close = columns['close']
+        series = self.compute(close, [indicator for strategy in strategies for indicator in strategy.indicators()],
+                              fingerprint)
+
+        # Plain python lists: scalar access is much cheaper than on numpy arrays
+        closes = close.tolist()
+        results = []
+        for strategy in strategies:
+            signals = strategy.signal_series(columns, {indicator: series[indicator]
+                                                       for indicator in strategy.indicators()})
+            signal_list = signals.tolist()
+            on_signal = lambda i, strategy=strategy, signal_list=signal_list: strategy._evaluate_candle(
+                closes[i], signal_list[i], capital)
+
+            if strategy.exit_mode == "intrabar" and 'high' in columns:
+                # Only the signals and the exits go through python, the candles in between are searched with NumPy
+                results.append(backtest_positions(
+                    closes, columns['open'], columns['high'], columns['low'], strategy.warmup(),
+                    buys=np.flatnonzero(signals == BUY), sells=np.flatnonzero(signals == SELL),
+                    is_open=lambda strategy=strategy: strategy._is_position_open,
+                    levels=lambda strategy=strategy: (strategy._stop_loss, strategy._take_profit),
+                    on_signal=on_signal, on_exit=strategy._exit_order,
+                ))
+                continue
+
+            orders = []
+            for i in range(strategy.warmup(), len(closes)):
+                if not strategy._is_position_open and signal_list[i] == HOLD:
+                    continue
+                order = on_signal(i)
+                if order:
+                    orders.append(order)
+            results.append(orders)
+
+        return results
+
+
+# Live strategies of the process (indicator_mode="shared"): their indicators go through the shared cache
+strategy_engine = StrategyEngine(shared_indicator_cache)
@@ -13,6 +13,8 @@ class APIKeyPair(BaseModel):
 
 class Settings(BaseSettings):
     sandbox_mode: bool = os.getenv("USE_SANDBOX", "False") == "True"
+    # Bots read the candles from the Binance WebSocket streams (ticked as soon as a candle closes) instead of REST
+    market_data_stream: bool = os.getenv("USE_MARKET_DATA_STREAM", "False") == "True"
     environment: str = os.getenv("ENVIRONMENT", "development")
     root_path: str = os.getenv("ROOT_PATH", "")
 
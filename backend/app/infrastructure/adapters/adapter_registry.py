@@ -0,0 +1,38 @@
+from typing import Dict, Tuple
+
+from app.infrastructure.adapters.binance_adapter import BinanceAdapter
+from app.infrastructure.adapters.binance_stream_adapter import BinanceStreamAdapter
+
+
+class AdapterRegistry:
+    """
+    Exchange adapters shared by the bots and the API, created once in the app lifespan.
+
+    One BinanceAdapter per (api key, sandbox): its ccxt client keeps its HTTP connections
+    (no TLS handshake per request), markets table and ticker cache alive between requests.
+    One BinanceStreamAdapter per network (sandbox or not): the market data streams are public.
+    """
+
+    def __init__(self):
+        self._adapters: Dict[Tuple[str, bool], BinanceAdapter] = {}
+        self._streams: Dict[bool, BinanceStreamAdapter] = {}
+
+    def get(self, api_key: str, secret: str, sandbox: bool = True) -> BinanceAdapter:
+        key = (api_key, sandbox)
+        if key not in self._adapters:
+            self._adapters[key] = BinanceAdapter(api_key=api_key, secret=secret, sandbox=sandbox)
+        return self._adapters[key]
+
+    def stream(self, api_key: str, secret: str, sandbox: bool = True) -> BinanceStreamAdapter:
+        """Market data pushed by the WebSocket streams of the network, backfilled through the REST adapter"""
+        if sandbox not in self._streams:
+            self._streams[sandbox] = BinanceStreamAdapter(rest=self.get(api_key, secret, sandbox), sandbox=sandbox)
+        return self._streams[sandbox]
+
+    async def close(self):
+        for stream in self._streams.values():
+            await stream.close()
+        self._streams.clear()
+        for adapter in self._adapters.values():
+            await adapter.close()
+        self._adapters.clear()
@@ -1,20 +1,55 @@
+import os
+
 import ccxt
 import ccxt.async_support as ccxt_async
 import pandas as pd
 
 from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.infrastructure.adapters.ohlcv_cache import OHLCVCache
+from app.infrastructure.adapters.ttl_cache import AsyncTTLCache
 from app.models.order import Order
 from app.services.logging import bot_logger
+from app.services.metrics import metrics
+
+
+# Markets (symbols, precision, limits) rarely change: downloaded at most once per hour
+MARKETS_TTL = 3600.0
+# Last price served to the API without asking Binance again
+TICKER_TTL = 1.0
+# Base URL of a Binance stand-in (e.g. benchmarks.fake_binance, "http://127.0.0.1:8900"): spot API only
+BINANCE_API_URL = os.getenv("BINANCE_API_URL")
 
 
 class BinanceAdapter(MarketDataProviderInterface):
-    def __init__(self, api_key: str, secret: str, sandbox: bool = True):
+    def __init__(self, api_key: str, secret: str, sandbox: bool = True,
+                 markets_ttl: float = MARKETS_TTL, ticker_ttl: float = TICKER_TTL, api_url: str | None = BINANCE_API_URL):
+        # One ccxt client = one HTTP session: keep the adapter alive and share it (see AdapterRegistry)
         self.client = ccxt_async.binance({
             "apiKey": api_key,
             "secret": secret,
             "enableRateLimit": True,
         })
         self.client.set_sandbox_mode(sandbox)
+        if api_url:
+            self._use_api_url(api_url)
+        # Bots watching the same market share the candles (and the REST calls)
+        self.ohlcv_cache = OHLCVCache(
+            fetch=self.fetch_ohlcv,
+            timeframe_seconds=self.parse_timeframe,
+            now_ms=self.milliseconds,
+        )
+        self.markets_cache = AsyncTTLCache(ttl=markets_ttl)
+        self.ticker_cache = AsyncTTLCache(ttl=ticker_ttl)
+
+    def _use_api_url(self, api_url: str):
+        """Send the REST calls to api_url instead of Binance (same paths), spot markets only"""
+        api_url = api_url.rstrip("/")
+        self.client.urls["api"] = {
+            name: api_url + "/" + url.split("/", 3)[3] if isinstance(url, str) else url
+            for name, url in self.client.urls["api"].items()
+        }
+        self.client.options["fetchMarkets"] = {"types": ["spot"]}
+        self.client.options["fetchCurrencies"] = False
 
     def milliseconds(self) -> int:
         return self.client.milliseconds() # cctx.milliseconds
@@ -30,7 +65,7 @@ class BinanceAdapter(MarketDataProviderInterface):
         """
             Return a DataFrame containing historical market data of OHLCV (Open, High, Low, Close, Volume) for the
             configured trading symbol and timeframe.
-            - Calls Binance API
+            - Calls Binance API (through the shared OHLCV cache)
             - Downloads candles
             - Converts to a dataframe
 
@@ -44,9 +79,9 @@ class BinanceAdapter(MarketDataProviderInterface):
                 This will make indicator more "mature" and steady
         """
         try:
-            since = self.milliseconds() - (limit * self.parse_timeframe(timeframe) * 1000)  # if timeframe = 1h, limit * timeframe = 100 * 1h = 100h = 4.2days
-
-            ohlcv = await self.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+            # Served by the shared cache: only the candles since the last cached one are downloaded
+            with metrics.span("exchange_get_history"):
+                ohlcv = await self.ohlcv_cache.get(symbol, timeframe, limit)
 
             dataframe = pd.DataFrame(
                 ohlcv,
@@ -64,18 +99,26 @@ class BinanceAdapter(MarketDataProviderInterface):
     #   "ETH/EUR" → trading Ethereum against euros
     #   "DOGE/BTC" → trading Dogecoin against Bitcoin
     async def get_price(self, symbol: str) -> float:
-        ticker = await self.client.fetch_ticker(symbol)
+        with metrics.span("exchange_get_price"):
+            ticker = await self.ticker_cache.get(symbol, lambda: self.client.fetch_ticker(symbol))
         return ticker["last"]
 
+    async def load_markets(self) -> dict:
+        """Markets and precision table, downloaded again only once markets_ttl has expired"""
+        with metrics.span("exchange_load_markets"):
+            return await self.markets_cache.get("markets", lambda: self.client.load_markets(reload=True))
+
     async def fetch_ohlcv(self, symbol: str, timeframe: str = "1m", since: int | None = None, limit: int = 30):
         """
         Fetch OHLCV candels and return: [timestamp, open, high, low, close, volume]
         - since: timestamp in milliseconds, optional
         - limit: number of candles
         """
-        return await self.client.fetch_ohlcv(
-            symbol, timeframe=timeframe,since=since, limit=limit
-        )
+        # The actual REST call (get_history is mostly served by the cache)
+        with metrics.span("exchange_fetch_ohlcv"):
+            return await self.client.fetch_ohlcv(
+                symbol, timeframe=timeframe,since=since, limit=limit
+            )
 
     async def close(self):
         await self.client.close()
@@ -88,15 +131,16 @@ class BinanceAdapter(MarketDataProviderInterface):
         try:
             bot_logger.info(f"Placing MARKET BUY | symbol={symbol} | raw_amount={amount}"
                             )
-            # Ensure markets are loaded
-            await self.client.load_markets()
+            # Ensure markets are loaded (cached)
+            await self.load_markets()
 
             # Adjust precision
             amount = self.client.amount_to_precision(symbol, amount)
 
             bot_logger.info(f"Adjusted amount to precision: {amount}")
 
-            order = await self.client.create_market_buy_order(symbol, amount)
+            with metrics.span("exchange_market_buy"):
+                order = await self.client.create_market_buy_order(symbol, amount)
 
             bot_logger.info(
                 f"MARKET BUY SUCCESS | id={order.get('id')} "
@@ -124,15 +168,16 @@ class BinanceAdapter(MarketDataProviderInterface):
         try:
             bot_logger.info(f"Placing MARKET SELL | symbol={symbol} | raw_amount={amount}")
 
-            # Ensure markets are loaded
-            await self.client.load_markets()
+            # Ensure markets are loaded (cached)
+            await self.load_markets()
 
             # Adjust precision
             amount = self.client.amount_to_precision(symbol, amount)
 
             bot_logger.info(f"Adjusted amount to precision: {amount}")
 
-            order = await self.client.create_market_sell_order(symbol, amount)
+            with metrics.span("exchange_market_sell"):
+                order = await self.client.create_market_sell_order(symbol, amount)
 
             bot_logger.info(
                 f"MARKET SELL SUCCESS | id={order.get('id')} "
@@ -157,7 +202,9 @@ class BinanceAdapter(MarketDataProviderInterface):
             raise
 
     async def place_limit_buy(self, symbol: str, amount: float, price: float):
-        return await self.client.create_limit_buy_order(symbol, amount, price)
+        with metrics.span("exchange_limit_buy"):
+            return await self.client.create_limit_buy_order(symbol, amount, price)
 
     async def place_limit_sell(self, symbol: str, amount: float, price: float):
-        return await self.client.create_limit_sell_order(symbol, amount, price)
+        with metrics.span("exchange_limit_sell"):
+            return await self.client.create_limit_sell_order(symbol, amount, price)
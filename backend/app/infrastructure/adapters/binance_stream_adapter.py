@@ -0,0 +1,252 @@
+import asyncio
+import json
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import pandas as pd
+import websockets
+
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+from app.services.logging import bot_logger
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+BINANCE_SANDBOX_STREAM_URL = "wss://testnet.binance.vision/stream"
+
+StreamKey = Tuple[str, str]  # (symbol, timeframe)
+
+
+class BinanceStreamAdapter(MarketDataProviderInterface):
+    """
+    Live market data pushed by Binance kline/ticker WebSocket streams instead of REST polling.
+
+    - one combined-stream connection, markets are subscribed on first use (get_history / subscribe)
+    - an in-memory rolling buffer of candles per (symbol, timeframe), the last one updated while it forms
+    - wait_for_candle_close() lets bots react as soon as a candle closes
+    - optional REST adapter (BinanceAdapter) to backfill the buffer with older candles, and to fill
+      the candles missed while the connection was down
+    - url: the production or testnet streams (sandbox), unless given
+    """
+
+    pushes_candle_closes = True
+
+    def __init__(self, rest=None, url: Optional[str] = None, buffer_size: int = 1000, sandbox: bool = False):
+        self.rest = rest
+        self.url = url or (BINANCE_SANDBOX_STREAM_URL if sandbox else BINANCE_STREAM_URL)
+        self.buffer_size = buffer_size
+
+        self._candles: Dict[StreamKey, Deque[list]] = {}  # [timestamp, open, high, low, close, volume]
+        self._prices: Dict[str, float] = {}
+        self._candle_closed: Dict[StreamKey, asyncio.Event] = {}
+        self._backfilled: set = set()
+        self._resync: set = set()  # markets whose last candle may be stale after a reconnect
+        self._gap_fills: Dict[StreamKey, asyncio.Task] = {}
+
+        self._symbols: Dict[str, str] = {}  # "BTCUSDT" -> "BTC/USDT"
+        self._streams: set = set()
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._request_id = 0
+        self.connected = asyncio.Event()
+
+    @staticmethod
+    def _stream_symbol(symbol: str) -> str:
+        return symbol.replace("/", "").lower()
+
+    # ---------------------------------------------------------------------
+    # Connection
+    # ---------------------------------------------------------------------
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for fill in self._gap_fills.values():
+            fill.cancel()
+        self._gap_fills.clear()
+
+    async def _run(self):
+        backoff = 1
+        while True:
+            try:
+                async with websockets.connect(self.url) as ws:
+                    self._ws = ws
+                    backoff = 1
+                    # Candles may have closed while disconnected: checked against REST on their next kline
+                    self._resync = set(self._candles)
+                    # (Re)subscribe everything: a new connection starts with no stream
+                    if self._streams:
+                        await self._send_subscribe(sorted(self._streams))
+                    self.connected.set()
+                    bot_logger.info(f"Binance stream connected | streams={len(self._streams)}")
+
+                    async for raw in ws:
+                        self._handle_message(json.loads(raw))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bot_logger.error(f"Binance stream disconnected: {e}")
+
+            self._ws = None
+            self.connected.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _send_subscribe(self, streams: List[str]):
+        self._request_id += 1
+        await self._ws.send(json.dumps({"method": "SUBSCRIBE", "params": streams, "id": self._request_id}))
+
+    async def subscribe(self, symbol: str, timeframe: str):
+        """Start receiving the kline and ticker streams of a market"""
+        key = (symbol, timeframe)
+        if key not in self._candles:
+            self._candles[key] = deque(maxlen=self.buffer_size)
+            self._candle_closed[key] = asyncio.Event()
+
+        stream_symbol = self._stream_symbol(symbol)
+        self._symbols[stream_symbol.upper()] = symbol
+        new_streams = {f"{stream_symbol}@kline_{timeframe}", f"{stream_symbol}@miniTicker"} - self._streams
+        self._streams |= new_streams
+
+        await self.start()
+        if new_streams and self._ws is not None:
+            await self._send_subscribe(sorted(new_streams))
+
+    # ---------------------------------------------------------------------
+    # Messages
+    # ---------------------------------------------------------------------
+    def _handle_message(self, message: dict):
+        # Combined stream payload: {"stream": "btcusdt@kline_1h", "data": {...}}
+        data = message.get("data", message)
+        event = data.get("e")
+        if event == "kline":
+            self._on_kline(data)
+        elif event in ("24hrMiniTicker", "24hrTicker"):
+            symbol = self._symbols.get(data["s"])
+            if symbol:
+                self._prices[symbol] = float(data["c"])
+        # else: SUBSCRIBE acknowledgement ({"result": null, "id": 1})
+
+    def _on_kline(self, data: dict):
+        kline = data["k"]
+        symbol = self._symbols.get(kline["s"])
+        key = (symbol, kline["i"])
+        candles = self._candles.get(key)
+        if candles is None:
+            return
+
+        candle = [
+            int(kline["t"]),
+            float(kline["o"]), float(kline["h"]), float(kline["l"]), float(kline["c"]),
+            float(kline["v"]),
+        ]
+        if candles and candles[-1][0] < candle[0] and self.rest is not None:
+            step = self.rest.parse_timeframe(kline["i"]) * 1000
+            # Candles missing (disconnected), or the last one never got its final update
+            if candle[0] - candles[-1][0] > step or key in self._resync:
+                self._fill_gap(key, candles[-1][0], candle[0])
+        self._resync.discard(key)
+
+        # Updates of the forming candle replace it, a new open time starts a new one
+        if candles and candles[-1][0] == candle[0]:
+            candles[-1] = candle
+        elif not candles or candles[-1][0] < candle[0]:
+            candles.append(candle)
+
+        self._prices[symbol] = candle[4]
+
+        if kline["x"]:  # candle closed
+            event = self._candle_closed[key]
+            event.set()
+            # Next waiters wait for the next close
+            self._candle_closed[key] = asyncio.Event()
+
+    async def wait_for_candle_close(self, symbol: str, timeframe: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the next candle of the market closes.
+        Returns False if the timeout expired first.
+        """
+        await self.subscribe(symbol, timeframe)
+        event = self._candle_closed[(symbol, timeframe)]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # ---------------------------------------------------------------------
+    # MarketDataProviderInterface
+    # ---------------------------------------------------------------------
+    async def _backfill(self, symbol: str, timeframe: str, limit: int):
+        """Prepend older candles from REST, once per market"""
+        key = (symbol, timeframe)
+        candles = self._candles[key]
+        since = self.rest.milliseconds() - limit * self.rest.parse_timeframe(timeframe) * 1000
+        ohlcv = await self.rest.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+        self._backfilled.add(key)
+
+        first_streamed = candles[0][0] if candles else None
+        older = [list(c) for c in ohlcv if first_streamed is None or c[0] < first_streamed]
+        merged = older + list(candles)
+        candles.clear()
+        candles.extend(merged[-self.buffer_size:])
+
+    def _fill_gap(self, key: StreamKey, since: int, until: int):
+        """Fetch the candles of [since, until) from REST in the background, get_history waits for it"""
+        self._gap_fills[key] = asyncio.get_running_loop().create_task(self._gap_fill(key, since, until))
+
+    async def _gap_fill(self, key: StreamKey, since: int, until: int):
+        symbol, timeframe = key
+        step = self.rest.parse_timeframe(timeframe) * 1000
+        since = max(since, until - self.buffer_size * step)
+        try:
+            ohlcv = await self.rest.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since,
+                                                limit=(until - since) // step)
+        except Exception as e:
+            bot_logger.error(f"Gap fill failed | {symbol} {timeframe}: {e}")
+            return
+
+        # Merged by open time: the candles streamed meanwhile (from `until`) are kept
+        candles = self._candles[key]
+        merged = {candle[0]: candle for candle in candles}
+        fetched = [list(c) for c in ohlcv if since <= c[0] < until]
+        merged.update((candle[0], candle) for candle in fetched)
+        candles.clear()
+        candles.extend(sorted(merged.values())[-self.buffer_size:])
+        bot_logger.info(f"Gap filled | {symbol} {timeframe} | candles={len(fetched)}")
+
+    async def get_history(self, symbol: str, timeframe: str, limit: int = 250) -> pd.DataFrame:
+        try:
+            await self.subscribe(symbol, timeframe)
+            key = (symbol, timeframe)
+            fill = self._gap_fills.get(key)
+            if fill is not None:
+                # Never computed on a buffer with a hole
+                await asyncio.shield(fill)
+            if len(self._candles[key]) < limit and self.rest is not None and key not in self._backfilled:
+                await self._backfill(symbol, timeframe, limit)
+
+            dataframe = pd.DataFrame(
+                list(self._candles[key])[-limit:],
+                columns=["timestamp", "open", "high", "low", "close", "volume"],
+            )
+            dataframe["timestamp"] = pd.to_datetime(dataframe["timestamp"], unit="ms")
+            return dataframe
+
+        except Exception as e:
+            bot_logger.error(f"Error retrieving streamed history: {e}")
+            return pd.DataFrame()
+
+    async def get_price(self, symbol: str) -> float:
+        return self._prices.get(symbol)
+
+    def tick(self) -> bool:
+        # Live data always advances
+        return True
@@ -0,0 +1,279 @@
+"""
+Columnar on-disk candle store.
+
+Binance monthly kline CSVs are parsed once and saved as one .npy file per column:
+
+    {root}/{symbol}/{timeframe}/{YYYY-MM}/timestamp.npy   int64 (ms)
+                                          open.npy        float64
+                                          ...
+
+Reading a month is a memory map of the column files (no parsing, no copy), so serving
+years of candles to HistoricalExchange is near-instant and only the pages actually
+read are loaded in memory.
+
+Ingest from backend/:
+    python -m app.infrastructure.adapters.candle_store --data-dir tests/data
+"""
+import argparse
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange, StreamingHistoricalExchange
+
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "data/candles")
+
+# Binance monthly klines CSVs have no header row — these are the standard column names
+BINANCE_KLINE_COLUMNS = [
+    "timestamp", "open", "high", "low", "close", "volume",
+    "close_time", "quote_volume", "trades", "taker_base", "taker_quote", "ignore",
+]
+
+# Stored columns and their type (the CSV's taker_* and ignore columns are dropped)
+CANDLE_COLUMNS = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "quote_volume": np.float64,
+    "trades": np.int64,
+}
+
+# BTCUSDT-1h-2024-03.csv
+CSV_NAME_PATTERN = re.compile(r"^(?P<symbol>[A-Z0-9]+)-(?P<timeframe>\w+)-(?P<year>\d{4})-(?P<month>\d{2})\.csv$")
+
+TimeBound = Union[int, str, pd.Timestamp, None]
+
+# Longest a reader waits for a directory being swapped by a re-ingest
+SWAP_WAIT = 5.0
+
+
+def load_candles(path: Path) -> pd.DataFrame:
+    """Parse a Binance monthly kline CSV"""
+    return pd.read_csv(path, names=BINANCE_KLINE_COLUMNS)
+
+
+def to_milliseconds(timestamps: np.ndarray) -> np.ndarray:
+    """Binance switched spot kline files from ms to µs timestamps in 2025: normalize to ms"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) and timestamps[0] > 10**14:
+        return timestamps // 1000
+    return timestamps
+
+
+def _time_bound_ms(value: TimeBound) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return timestamp.value // 1_000_000
+
+
+def _old_dir(directory: Path) -> Path:
+    return directory.with_name(directory.name + ".old")
+
+
+def _inode(directory: Path) -> Optional[int]:
+    try:
+        return directory.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _swap_dir(tmp_dir: Path, directory: Path):
+    """
+    Put the fully written tmp_dir in place of directory. The previous version is renamed away
+    first and deleted last: directory is only missing between the two renames, and
+    _load_columns waits that out (open memory maps of the old files stay valid).
+    """
+    old_dir = _old_dir(directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if directory.exists():
+        directory.rename(old_dir)
+    tmp_dir.rename(directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _load_columns(directory: Path, names) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Memory maps of the column files of a directory, None if it isn't stored.
+    Read again if it was swapped while its files were opened: the columns are always of one version.
+    """
+    deadline = time.monotonic() + SWAP_WAIT
+    while True:
+        inode = _inode(directory)
+        try:
+            columns = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in names}
+            if _inode(directory) == inode:
+                return columns
+        except FileNotFoundError:
+            current = _inode(directory)
+            if current is not None and current == inode:
+                raise  # not being swapped: a column file is missing
+            if current is None and not _old_dir(directory).exists():
+                return None
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{directory} is still being replaced")
+        time.sleep(0.01)
+
+
+class CandleStore:
+    """
+    Candles indexed by symbol / timeframe / month, stored as typed column files.
+    """
+
+    def __init__(self, root: Union[str, Path] = CANDLE_STORE_DIR):
+        self.root = Path(root)
+
+    def _month_dir(self, symbol: str, timeframe: str, year: int, month: int) -> Path:
+        return self.root / symbol / timeframe / f"{year}-{month:02d}"
+
+    # ---------------------------------------------------------------------
+    # Ingest
+    # ---------------------------------------------------------------------
+    def ingest_frame(self, candles: pd.DataFrame, symbol: str, timeframe: str, year: int, month: int) -> Path:
+        """Save one month of candles (Binance kline columns) as typed column files"""
+        month_dir = self._month_dir(symbol, timeframe, year, month)
+        # Write next to the final directory, then swap (_swap_dir): readers never see a half-written month
+        tmp_dir = month_dir.with_name(month_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        for name, dtype in CANDLE_COLUMNS.items():
+            values = candles[name].to_numpy()
+            if name == "timestamp":
+                values = to_milliseconds(values)
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(values, dtype=dtype))
+
+        _swap_dir(tmp_dir, month_dir)
+        return month_dir
+
+    def ingest_csv(self, path: Union[str, Path], symbol: str = None, timeframe: str = None,
+                   year: int = None, month: int = None, force: bool = False) -> Path:
+        """
+        Ingest a Binance monthly kline CSV. symbol/timeframe/year/month default to the ones in the file name.
+        Skipped if the month is already stored and newer than the CSV (unless force).
+        """
+        path = Path(path)
+        if symbol is None or timeframe is None or year is None or month is None:
+            match = CSV_NAME_PATTERN.match(path.name)
+            if not match:
+                raise ValueError(f"Can't read symbol/timeframe/month from file name {path.name}")
+            symbol = symbol or match["symbol"]
+            timeframe = timeframe or match["timeframe"]
+            year = year or int(match["year"])
+            month = month or int(match["month"])
+
+        month_dir = self._month_dir(symbol, timeframe, year, month)
+        if not force and month_dir.exists() and month_dir.stat().st_mtime >= path.stat().st_mtime:
+            return month_dir
+
+        return self.ingest_frame(load_candles(path), symbol, timeframe, year, month)
+
+    def ingest_directory(self, data_dir: Union[str, Path], force: bool = False) -> List[Path]:
+        """Ingest every Binance monthly kline CSV found in data_dir"""
+        ingested = []
+        for path in sorted(Path(data_dir).glob("*.csv")):
+            if CSV_NAME_PATTERN.match(path.name):
+                ingested.append(self.ingest_csv(path, force=force))
+        return ingested
+
+    # ---------------------------------------------------------------------
+    # Read
+    # ---------------------------------------------------------------------
+    def months(self, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """Stored (year, month) pairs, in chronological order"""
+        timeframe_dir = self.root / symbol / timeframe
+        if not timeframe_dir.exists():
+            return []
+        months = set()
+        for month_dir in timeframe_dir.iterdir():
+            # A month being re-ingested is only there as ".old" for a moment
+            match = re.fullmatch(r"(\d{4})-(\d{2})(\.old)?", month_dir.name)
+            if match and month_dir.is_dir():
+                months.add((int(match[1]), int(match[2])))
+        return sorted(months)
+
+    def has_month(self, symbol: str, timeframe: str, year: int, month: int) -> bool:
+        return self._month_dir(symbol, timeframe, year, month).exists()
+
+    def load_month(self, symbol: str, timeframe: str, year: int, month: int) -> Dict[str, np.ndarray]:
+        """Memory-mapped, read-only columns of one month"""
+        columns = _load_columns(self._month_dir(symbol, timeframe, year, month), CANDLE_COLUMNS)
+        if columns is None:
+            raise ValueError(f"No candles stored for {symbol} {timeframe} {year}-{month:02d}")
+        return columns
+
+    def iter_months(self, symbol: str, timeframe: str, start: TimeBound = None,
+                    end: TimeBound = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Month by month columns for [start, end), each one trimmed to the range.
+        Nothing is concatenated: the columns are views on the memory maps.
+        """
+        start_ms = _time_bound_ms(start)
+        end_ms = _time_bound_ms(end)
+
+        for year, month in self.months(symbol, timeframe):
+            # Skip whole months outside of the range without opening them
+            month_start_ms = _time_bound_ms(pd.Timestamp(year=year, month=month, day=1))
+            month_end_ms = _time_bound_ms(pd.Timestamp(year=year, month=month, day=1) + pd.offsets.MonthBegin(1))
+            if (end_ms is not None and month_start_ms >= end_ms) or (start_ms is not None and month_end_ms <= start_ms):
+                continue
+
+            columns = self.load_month(symbol, timeframe, year, month)
+            timestamps = columns["timestamp"]
+            first = int(np.searchsorted(timestamps, start_ms)) if start_ms is not None else 0
+            last = int(np.searchsorted(timestamps, end_ms)) if end_ms is not None else len(timestamps)
+            if last > first:
+                yield {name: values[first:last] for name, values in columns.items()}
+
+    def load(self, symbol: str, timeframe: str, start: TimeBound = None, end: TimeBound = None) -> Dict[str, np.ndarray]:
+        """
+        Columns for the time range [start, end) (ms timestamps, datetimes or date strings, UTC).
+        A range inside one month is returned as memory-mapped views, longer ones are concatenated once.
+        """
+        chunks = list(self.iter_months(symbol, timeframe, start, end))
+        if not chunks:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in CANDLE_COLUMNS.items()}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in CANDLE_COLUMNS}
+
+    def load_frame(self, symbol: str, timeframe: str, start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        return pd.DataFrame(self.load(symbol, timeframe, start, end), copy=False)
+
+    def historical_exchange(self, symbol: str, timeframe: str, start: TimeBound = None,
+                            end: TimeBound = None) -> HistoricalExchange:
+        """HistoricalExchange replaying the stored candles of [start, end)"""
+        return HistoricalExchange.from_arrays(self.load(symbol, timeframe, start, end))
+
+    def streaming_exchange(self, symbol: str, timeframe: str, tail: int, start: TimeBound = None,
+                           end: TimeBound = None) -> StreamingHistoricalExchange:
+        """Same replay, opening the months one at a time and keeping `tail` candles of the previous ones"""
+        return StreamingHistoricalExchange(self.iter_months(symbol, timeframe, start, end), tail=tail)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest Binance monthly kline CSVs into the candle store")
+    parser.add_argument("--data-dir", type=Path, required=True, help="Directory of Binance monthly kline CSVs")
+    parser.add_argument("--store", type=Path, default=Path(CANDLE_STORE_DIR), help="Candle store root directory")
+    parser.add_argument("--force", action="store_true", help="Re-ingest months already stored")
+    args = parser.parse_args(argv)
+
+    ingested = CandleStore(args.store).ingest_directory(args.data_dir, force=args.force)
+    print(f"{len(ingested)} months available in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
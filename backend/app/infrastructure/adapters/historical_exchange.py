@@ -1,27 +1,152 @@
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
 import pandas as pd
 from .market_data_provider_interface import MarketDataProviderInterface
 
 
 class HistoricalExchange(MarketDataProviderInterface):
+    """
+    Replays historical candles, one candle per tick().
+
+    Candles are stored once as a read-only float64 block of shape (columns, rows):
+    each column is a contiguous array, and get_history() / get_arrays() return views
+    on the rows before the cursor, nothing is copied per tick.
+    The strategy can add its own columns to the returned DataFrame, but writing into
+    the candle columns raises (the replayed data can't be mutated).
+
+    All columns must be numeric (Binance kline CSVs are): int columns such as
+    timestamps in ms/µs fit exactly in a float64.
+    """
+
+    # Rows of the replay dropped before the current block (StreamingHistoricalExchange)
+    offset = 0
+    exits_at_level = True
+
     def __init__(self, dataframe: pd.DataFrame):
-        self.df = dataframe.reset_index(drop=True)
+        block = dataframe.to_numpy(dtype=np.float64).T
+        self._init_block(list(dataframe.columns), block)
+
+    @classmethod
+    def from_arrays(cls, columns: Dict[str, np.ndarray]) -> "HistoricalExchange":
+        """
+        Build an exchange directly from column arrays, without going through a DataFrame.
+        """
+        block = np.vstack([np.asarray(values, dtype=np.float64) for values in columns.values()])
+        return cls.from_block(list(columns.keys()), block)
+
+    @classmethod
+    def from_block(cls, names: Sequence[str], block: np.ndarray) -> "HistoricalExchange":
+        """
+        Build an exchange on a (columns, rows) float64 block, e.g. a memory-mapped file.
+        The block is used as is (no copy) when it is already C-contiguous float64.
+        """
+        exchange = cls.__new__(cls)
+        exchange._init_block(list(names), block)
+        return exchange
+
+    def _init_block(self, names: list, block: np.ndarray):
+        block = np.ascontiguousarray(block, dtype=np.float64)
+        if block.flags.writeable:
+            block = block.view()  # don't change the flags of the caller's array
+            block.flags.writeable = False
+
+        self.block = block
+        self.column_names = pd.Index(names)  # built once, reused by every get_history()
+        self.columns = {name: block[i] for i, name in enumerate(names)}
+        self.length = block.shape[1]
         self.cursor = 0
 
     def tick(self) -> bool:
-        if self.cursor < len(self.df):
+        if self.cursor < self.length:
             self.cursor += 1
             return True
         return False
 
+    def next_timestamp(self) -> Optional[float]:
+        """Open time of the candle the next tick() reveals, None at the end of the replay"""
+        if self.cursor < self.length:
+            return self.columns["timestamp"][self.cursor]
+        return None
+
+    def _window_start(self, limit) -> int:
+        if limit:
+            return max(0, self.cursor - limit)
+        return 0
+
     async def get_history(self, symbol: str, timeframe: str, limit=None) -> pd.DataFrame:
         # replace fetch_ohlcv(...) in binance adapter
         # Time simulated with cursor
-        df = self.df.iloc[:self.cursor]
+        start = self._window_start(limit)
+        # (rows, columns) view on the block: pandas wraps it as a single block without copying
+        return pd.DataFrame(
+            self.block[:, start:self.cursor].T,
+            columns=self.column_names,
+            index=pd.RangeIndex(self.offset + start, self.offset + self.cursor),
+            copy=False,
+        )
 
-        if limit:
-            return df.tail(limit).copy()
-
-        return df.copy()
+    async def get_arrays(self, symbol: str, timeframe: str, limit=None) -> Dict[str, np.ndarray]:
+        start = self._window_start(limit)
+        return {name: values[start:self.cursor] for name, values in self.columns.items()}
 
     def get_price(self, symbol: str) -> float:
-        return float(self.df.iloc[self.cursor - 1]["close"])
\ No newline at end of file
+        return float(self.columns["close"][self.cursor - 1])
+
+
+Chunk = Union[pd.DataFrame, Dict[str, np.ndarray]]
+
+
+def _chunk_block(chunk: Chunk) -> Tuple[list, np.ndarray]:
+    if isinstance(chunk, pd.DataFrame):
+        return list(chunk.columns), chunk.to_numpy(dtype=np.float64).T
+    return list(chunk.keys()), np.vstack([np.asarray(values, dtype=np.float64) for values in chunk.values()])
+
+
+class StreamingHistoricalExchange(HistoricalExchange):
+    """
+    Replays candles coming from an iterator of chunks (month CSVs, CandleStore months...),
+    without ever holding the whole history.
+
+    Only the current chunk and the last `tail` candles of the previous ones are kept:
+    `tail` must cover the largest history the strategy asks for (get_history limit),
+    then every get_history / get_arrays returns exactly what the in-memory replay returns
+    (same values, same index), and memory stays flat whatever the length of the history.
+    """
+
+    def __init__(self, chunks: Iterable[Chunk], tail: int):
+        self.tail = tail
+        self._chunks: Iterator[Chunk] = iter(chunks)
+        self.offset = 0
+        self._init_block([], np.empty((0, 0)))
+        self._next_chunk()
+
+    def _next_chunk(self) -> bool:
+        """Swap in the next non-empty chunk, keeping the last `tail` candles before the cursor"""
+        for chunk in self._chunks:
+            names, rows = _chunk_block(chunk)
+            if rows.shape[1] == 0:
+                continue
+            keep_from = max(0, self.cursor - self.tail)
+            if len(self.column_names) and list(self.column_names) != names:
+                raise ValueError(f"Chunk columns {names} differ from {list(self.column_names)}")
+
+            kept = self.block[:, keep_from:self.cursor] if self.length else np.empty((len(names), 0))
+            offset = self.offset + keep_from
+            self._init_block(names, np.hstack([kept, rows]))
+            self.offset = offset
+            self.cursor = kept.shape[1]
+            return True
+        return False
+
+    def tick(self) -> bool:
+        if self.cursor >= self.length and not self._next_chunk():
+            return False
+        self.cursor += 1
+        return True
+
+    def next_timestamp(self) -> Optional[float]:
+        # The next candle may be in the next chunk: swapping it in early keeps the same tail
+        if self.cursor >= self.length and not self._next_chunk():
+            return None
+        return self.columns["timestamp"][self.cursor]
@@ -1,4 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import numpy as np
 import pandas as pd
 
 
@@ -8,6 +12,13 @@ class MarketDataProviderInterface(ABC):
     Can be backed by live exchange data or historical data.
     """
 
+    # Replayed candles (backtests): an intrabar SL/TP exit is recorded at its level, like a stop order.
+    # Live, the exit is sent as a market order: it is recorded at the current price (see exits.IntrabarExits)
+    exits_at_level: bool = False
+
+    # Streamed market data: wait_for_candle_close() returns as soon as a candle closes
+    pushes_candle_closes: bool = False
+
     @abstractmethod
     async def get_history(self, symbol: str, timeframe: str, limit) -> pd.DataFrame:
         """
@@ -15,6 +26,14 @@ class MarketDataProviderInterface(ABC):
         """
         pass
 
+    async def get_arrays(self, symbol: str, timeframe: str, limit) -> Dict[str, np.ndarray]:
+        """
+        Return historical OHLCV data as column arrays.
+        Default: converted from get_history(), providers that hold arrays return them directly.
+        """
+        dataframe = await self.get_history(symbol, timeframe, limit)
+        return {name: dataframe[name].to_numpy() for name in dataframe.columns}
+
     @abstractmethod
     def get_price(self, symbol: str) -> float:
         """
@@ -22,6 +41,15 @@ class MarketDataProviderInterface(ABC):
         """
         pass
 
+    async def wait_for_candle_close(self, symbol: str, timeframe: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the next candle of the market closes. Returns False if the timeout expired first.
+        Default (polled market data, nothing pushed): sleeps the timeout.
+        """
+        if timeout is not None:
+            await asyncio.sleep(timeout)
+        return False
+
     @abstractmethod
     def tick(self) -> bool:
         """
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Binance returns at most 1000 candles per klines request
+MAX_CANDLES_PER_REQUEST = 1000
+
+CacheKey = Tuple[str, str]  # (symbol, timeframe)
+
+
+@dataclass
+class _Entry:
+    candles: np.ndarray  # shape (n, 6): timestamp, open, high, low, close, volume
+    fetched_at: float = field(default_factory=time.monotonic)
+
+
+class OHLCVCache:
+    """
+    Candle cache per (symbol, timeframe), shared by every bot using the same adapter.
+
+    - concurrent requests for the same market wait for a single in-flight fetch
+    - closed candles are kept: a refresh only fetches the candles since the last cached one
+      (the last cached candle is fetched again, it may have been still forming)
+    - markets are evicted least recently used first when the cache goes over max_bytes
+    """
+
+    def __init__(self,
+                 fetch: Callable[[str, str, Optional[int], int], Awaitable[list]],
+                 timeframe_seconds: Callable[[str], int],
+                 now_ms: Callable[[], int],
+                 max_bytes: int = 64 * 1024 * 1024,
+                 max_age: float = 1.0):
+        """
+        fetch: async (symbol, timeframe, since, limit) -> [[timestamp, open, high, low, close, volume], ...]
+        max_age: seconds during which cached candles are served without asking the exchange again
+        """
+        self._fetch = fetch
+        self._timeframe_seconds = timeframe_seconds
+        self._now_ms = now_ms
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._limits: Dict[CacheKey, int] = {}  # largest limit requested per market: what we keep
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self.fetch_count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.candles.nbytes for entry in self._entries.values())
+
+    async def get(self, symbol: str, timeframe: str, limit: int) -> np.ndarray:
+        """Last `limit` candles of the market (fewer if the exchange has less history)"""
+        key = (symbol, timeframe)
+        self._limits[key] = max(self._limits.get(key, 0), limit)
+
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.max_age \
+                    and len(entry.candles) >= limit:
+                self._entries.move_to_end(key)
+                return entry.candles[-limit:]
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = asyncio.ensure_future(self._refresh(key))
+                self._in_flight[key] = in_flight
+                in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+                started_here = True
+            else:
+                started_here = False
+
+            # shield: a cancelled bot must not cancel the fetch the other bots are waiting for
+            candles = await asyncio.shield(in_flight)
+            if started_here or len(candles) >= limit:
+                return candles[-limit:]
+            # The fetch we joined was sized for a smaller request: go again with ours
+
+    async def _refresh(self, key: CacheKey) -> np.ndarray:
+        symbol, timeframe = key
+        limit = self._limits[key]
+        timeframe_ms = self._timeframe_seconds(timeframe) * 1000
+        now = self._now_ms()
+
+        entry = self._entries.get(key)
+        cached = entry.candles if entry is not None else np.empty((0, 6))
+
+        if len(cached) >= limit:
+            # Delta: from the last cached candle (may have been still forming) until now
+            since = int(cached[-1, 0])
+            count = (now - since) // timeframe_ms + 1
+        else:
+            since = now - limit * timeframe_ms
+            count = limit
+
+        if count > MAX_CANDLES_PER_REQUEST:
+            # Too far behind for a delta, start over
+            cached = np.empty((0, 6))
+            since = now - limit * timeframe_ms
+            count = limit
+
+        self.fetch_count += 1
+        fetched = np.asarray(await self._fetch(symbol, timeframe, since, min(count, MAX_CANDLES_PER_REQUEST)),
+                             dtype=np.float64).reshape(-1, 6)
+
+        if len(fetched):
+            # Fetched candles replace the cached ones from the same timestamp on
+            keep = cached[cached[:, 0] < fetched[0, 0]]
+            candles = np.concatenate([keep, fetched])
+        else:
+            candles = cached
+        candles = np.ascontiguousarray(candles[-limit:])
+        candles.flags.writeable = False  # shared by every caller
+
+        self._entries[key] = _Entry(candles=candles)
+        self._entries.move_to_end(key)
+        self._evict()
+        return candles
+
+    def _evict(self):
+        total = self.nbytes
+        # Always keep the most recently used market, even if alone it is over the budget
+        while total > self.max_bytes and len(self._entries) > 1:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._limits.pop(evicted_key, None)
+            total -= evicted.candles.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self._limits.clear()
@@ -0,0 +1,309 @@
+"""
+Simulated exchange: the trading surface of BinanceAdapter over historical candles.
+
+Market data is a HistoricalExchange replay; on top of it, orders go through a small matching engine
+instead of filling instantly at the close:
+- latency: an order sent at the close of the current candle reaches the engine latency_ms later,
+  and is matched on the candle it arrives in (a market order fills at that candle's open: the gap is paid)
+- fees: taker fee on market orders and on limit orders crossing on arrival, maker fee on resting
+  limit orders, charged in the quote currency
+- partial fills: a candle only gives `participation` of its volume to our orders, what's left of a
+  market order is worked on the next candles, a resting limit order stays in the book
+- resting limit orders: bids / asks books, filled at their price when the candle's low / high reaches it
+  (price then time priority), from the candle after the one they arrived in
+
+Orders in flight are a heap of arrival times: a tick() without any order costs nothing more than the
+HistoricalExchange tick, and one with orders only pops the events due on the new candle.
+The returned orders are ccxt unified order dicts, like the ones BinanceAdapter returns, and the
+errors are ccxt's (InvalidOrder, InsufficientFunds, OrderNotFound): OrderService and BaseBot.tick
+run unchanged against it.
+
+Example:
+    exchange = SimulatedExchange(candles, balances={"USDT": 10000.0}, latency_ms=200)
+    service = OrderService(exchange=exchange, journal=journal)
+    while exchange.tick():
+        await bot.tick(exchange, service)
+"""
+import heapq
+import itertools
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+import ccxt
+import numpy as np
+import pandas as pd
+
+from app.bots.scheduler import timeframe_seconds
+from .candle_store import to_milliseconds
+from .historical_exchange import HistoricalExchange
+
+# Binance spot, regular account (VIP 0)
+TAKER_FEE = 0.001
+MAKER_FEE = 0.001
+# BTC/USDT filters: LOT_SIZE step and NOTIONAL minimum
+AMOUNT_STEP = 0.00001
+MIN_NOTIONAL = 5.0
+
+
+@dataclass
+class SimulatedOrder:
+    id: str
+    symbol: str
+    type: str  # "market" / "limit"
+    side: str  # "buy" / "sell"
+    amount: float
+    price: Optional[float]  # limit price
+    timestamp: int  # sent (ms)
+    arrival: int  # reaches the matching engine (ms)
+    filled: float = 0.0
+    cost: float = 0.0  # quote amount traded, fees excluded
+    fee: float = 0.0
+    status: str = "open"  # "open" / "closed" / "canceled"
+    trades: List[Dict] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> float:
+        return self.amount - self.filled
+
+    @property
+    def average(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled else None
+
+    def to_ccxt(self) -> Dict:
+        quote = self.symbol.split("/")[1]
+        return {
+            "id": self.id,
+            "clientOrderId": None,
+            "timestamp": self.timestamp,
+            "datetime": pd.Timestamp(self.timestamp, unit="ms", tz="UTC").isoformat(),
+            "symbol": self.symbol,
+            "type": self.type,
+            "side": self.side,
+            "price": self.price,
+            "amount": self.amount,
+            "filled": self.filled,
+            "remaining": self.remaining,
+            "cost": self.cost,
+            "average": self.average,
+            "status": self.status,
+            "fee": {"cost": self.fee, "currency": quote},
+            "trades": list(self.trades),
+        }
+
+
+class SimulatedExchange(HistoricalExchange):
+    """
+    candles: timestamp / open / high / low / close / volume (a Binance kline DataFrame, or column arrays)
+    balances: free balance per currency ({"USDT": 10000.0}): fills are capped by them
+    latency_ms: from the close of the current candle to the matching engine
+    participation: fraction of each candle's volume our orders can take (None: unlimited)
+    slippage_bps: market fills this much worse than the candle's open
+    """
+
+    def __init__(self, candles: Union[pd.DataFrame, Dict[str, np.ndarray]], timeframe: str = "1h",
+                 balances: Optional[Dict[str, float]] = None, taker_fee: float = TAKER_FEE,
+                 maker_fee: float = MAKER_FEE, latency_ms: int = 0, participation: Optional[float] = 0.1,
+                 slippage_bps: float = 0.0, amount_step: float = AMOUNT_STEP, min_notional: float = MIN_NOTIONAL):
+        if not isinstance(candles, pd.DataFrame):
+            candles = pd.DataFrame(candles)
+        super().__init__(candles)
+        self.exits_at_level = False  # the exits are market orders here too, filled like the live ones
+        self.timeframe_ms = timeframe_seconds(timeframe) * 1000
+        self.timestamps = to_milliseconds(self.columns["timestamp"]).tolist()
+
+        self.balances = dict(balances if balances is not None else {"USDT": 10_000.0})
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.latency_ms = latency_ms
+        self.participation = participation
+        self.slippage = slippage_bps / 10_000
+        self.amount_step = amount_step
+        self.min_notional = min_notional
+
+        self.orders: Dict[str, SimulatedOrder] = {}
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()  # time priority between orders of the same time / price
+        self._in_flight: List[Tuple[int, int, SimulatedOrder]] = []  # heap by arrival time
+        self._working: Deque[SimulatedOrder] = deque()  # market orders partially filled
+        self._bids: List[Tuple[float, int, SimulatedOrder]] = []  # heap by -price
+        self._asks: List[Tuple[float, int, SimulatedOrder]] = []  # heap by price
+        self._liquidity = 0.0  # left on the current candle
+
+    # ---------------------------------------------------------------------
+    # Clock
+    # ---------------------------------------------------------------------
+    @property
+    def now_ms(self) -> int:
+        """Close time of the last revealed candle: when the strategies send their orders"""
+        if self.cursor == 0:
+            return self.timestamps[0] if self.timestamps else 0
+        return self.timestamps[self.cursor - 1] + self.timeframe_ms
+
+    def tick(self) -> bool:
+        if not super().tick():
+            return False
+        if self._in_flight or self._working or self._bids or self._asks:
+            self._match(self.cursor - 1)
+        return True
+
+    # ---------------------------------------------------------------------
+    # Trading surface (BinanceAdapter)
+    # ---------------------------------------------------------------------
+    async def place_market_buy(self, symbol: str, amount: float):
+        return self._submit(symbol, "market", "buy", amount)
+
+    async def place_market_sell(self, symbol: str, amount: float):
+        return self._submit(symbol, "market", "sell", amount)
+
+    async def place_limit_buy(self, symbol: str, amount: float, price: float):
+        return self._submit(symbol, "limit", "buy", amount, price)
+
+    async def place_limit_sell(self, symbol: str, amount: float, price: float):
+        return self._submit(symbol, "limit", "sell", amount, price)
+
+    async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
+        return self._order(order_id).to_ccxt()
+
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        order = self._order(order_id)
+        if order.status != "open":
+            raise ccxt.OrderNotFound(f"Order {order_id} is {order.status}")
+        order.status = "canceled"  # dropped from the queues when met
+        return order.to_ccxt()
+
+    async def fetch_balance(self) -> Dict[str, float]:
+        return dict(self.balances)
+
+    async def close(self):
+        pass
+
+    def amount_to_precision(self, amount: float) -> float:
+        """Rounded down to the lot step, like ccxt does for Binance"""
+        steps = math.floor(float(amount) / self.amount_step + 1e-9)
+        return round(steps * self.amount_step, 12)
+
+    def _order(self, order_id: str) -> SimulatedOrder:
+        try:
+            return self.orders[order_id]
+        except KeyError:
+            raise ccxt.OrderNotFound(f"Order {order_id} not found") from None
+
+    def _submit(self, symbol: str, type_: str, side: str, amount: float, price: float = None) -> Dict:
+        amount = self.amount_to_precision(amount)
+        reference = float(price) if price is not None else self.get_price(symbol)
+        if amount <= 0 or amount * reference < self.min_notional:
+            raise ccxt.InvalidOrder(f"{side} {amount} {symbol}: below the minimum notional of {self.min_notional}")
+
+        base, quote = symbol.split("/")
+        if side == "buy":
+            needed, currency = amount * reference * (1 + self.taker_fee), quote
+        else:
+            needed, currency = amount, base
+        if self.balances.get(currency, 0.0) < needed:
+            raise ccxt.InsufficientFunds(f"{side} {amount} {symbol}: {needed} {currency} needed, "
+                                         f"{self.balances.get(currency, 0.0)} available")
+
+        now = self.now_ms
+        order = SimulatedOrder(id=str(next(self._ids)), symbol=symbol, type=type_, side=side, amount=amount,
+                               price=float(price) if price is not None else None,
+                               timestamp=now, arrival=now + self.latency_ms)
+        self.orders[order.id] = order
+        heapq.heappush(self._in_flight, (order.arrival, next(self._sequence), order))
+        return order.to_ccxt()
+
+    # ---------------------------------------------------------------------
+    # Matching engine
+    # ---------------------------------------------------------------------
+    def _match(self, candle: int):
+        """Orders due on the candle just revealed: working market orders, arrivals, then the books"""
+        end = self.timestamps[candle] + self.timeframe_ms
+        open_ = float(self.columns["open"][candle])
+        high = float(self.columns["high"][candle])
+        low = float(self.columns["low"][candle])
+        self._liquidity = (float(self.columns["volume"][candle]) * self.participation
+                           if self.participation is not None else math.inf)
+
+        # Market orders not completed on the previous candles go first
+        for _ in range(len(self._working)):
+            order = self._working.popleft()
+            if order.status == "open":
+                self._fill_market(order, open_, end)
+
+        resting = []
+        while self._in_flight and self._in_flight[0][0] < end:
+            _, sequence, order = heapq.heappop(self._in_flight)
+            if order.status != "open":
+                continue
+            if order.type == "market":
+                self._fill_market(order, open_, end)
+            elif (order.side == "buy" and order.price >= open_) or (order.side == "sell" and order.price <= open_):
+                # Crossing the market on arrival: taker, at the better price
+                self._fill(order, open_, taker=True, timestamp=order.arrival)
+                if order.status == "open":
+                    resting.append((sequence, order))
+            else:
+                resting.append((sequence, order))
+
+        self._match_book(self._bids, lambda price: price >= low, sign=-1, timestamp=end)
+        self._match_book(self._asks, lambda price: price <= high, sign=1, timestamp=end)
+
+        # Arrived during the candle: the part of the candle before them is unknown, they rest from the next one
+        for sequence, order in resting:
+            book, sign = (self._bids, -1) if order.side == "buy" else (self._asks, 1)
+            heapq.heappush(book, (sign * order.price, sequence, order))
+
+    def _fill_market(self, order: SimulatedOrder, open_: float, end: int):
+        price = open_ * (1 + self.slippage) if order.side == "buy" else open_ * (1 - self.slippage)
+        self._fill(order, price, taker=True, timestamp=max(order.arrival, end - self.timeframe_ms))
+        if order.status == "open":
+            self._working.append(order)
+
+    def _match_book(self, book: list, reached, sign: int, timestamp: int):
+        """Resting limit orders whose price the candle reached, best price first"""
+        while book and self._liquidity > 0 and reached(sign * book[0][0]):
+            order = book[0][2]
+            if order.status == "open":
+                self._fill(order, order.price, taker=False, timestamp=timestamp)
+                if order.status == "open":
+                    return  # no liquidity left on this candle
+            heapq.heappop(book)
+
+    def _fill(self, order: SimulatedOrder, price: float, taker: bool, timestamp: int):
+        """Fill what the candle's liquidity and the balances allow; an order the balance can't pay is canceled"""
+        base, quote = order.symbol.split("/")
+        rate = self.taker_fee if taker else self.maker_fee
+        if order.side == "buy":
+            affordable = self.balances.get(quote, 0.0) / (price * (1 + rate))
+        else:
+            affordable = self.balances.get(base, 0.0)
+        quantity = min(order.remaining, self._liquidity)
+        capped = affordable < quantity
+        if capped:
+            quantity = self.amount_to_precision(affordable)
+            if quantity <= 0:
+                order.status = "canceled"
+                return
+        if quantity <= 0:
+            return
+
+        cost = price * quantity
+        fee = cost * rate
+        if order.side == "buy":
+            self.balances[quote] = self.balances.get(quote, 0.0) - cost - fee
+            self.balances[base] = self.balances.get(base, 0.0) + quantity
+        else:
+            self.balances[base] = self.balances.get(base, 0.0) - quantity
+            self.balances[quote] = self.balances.get(quote, 0.0) + cost - fee
+        self._liquidity -= quantity
+
+        order.filled += quantity
+        order.cost += cost
+        order.fee += fee
+        order.trades.append({"timestamp": timestamp, "price": price, "amount": quantity, "cost": cost,
+                             "fee": {"cost": fee, "currency": quote}, "takerOrMaker": "taker" if taker else "maker"})
+        if order.remaining <= self.amount_step * 1e-6:
+            order.status = "closed"
+        elif capped:
+            order.status = "canceled"  # the balance is spent: the rest can't be filled
@@ -0,0 +1,156 @@
+"""
+Sub-candle replay: the HistoricalExchange of aggregated trades (TradeStore) and 1s klines (CandleStore).
+
+On 1h / 4h candles, which of the stop-loss or the take-profit was reached first inside a candle
+is unknowable. Here the market is replayed event by event (a trade, or a 1s candle), and the
+strategies still see candles of their timeframe through MarketDataProviderInterface:
+the closed candles, plus the forming one built from the events replayed so far.
+So the intrabar exits of the strategies see the wicks in the order they happened.
+
+Reading is columnar and batched: the events are (memory-mapped) column arrays, the closed candles
+are aggregated once with NumPy reductions, and a tick() moves the cursor over a whole step of events
+(e.g. every event of the next second) with one search and one reduction per column, never a python
+loop over the events. iter_batches() gives the raw events to vectorized consumers.
+"""
+from typing import Dict, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.bots.scheduler import timeframe_seconds
+from .market_data_provider_interface import MarketDataProviderInterface
+
+OHLCV = ("timestamp", "open", "high", "low", "close", "volume")
+
+# Events scanned at once when aggregating the candles (bounds the temporaries on months of trades)
+BATCH_EVENTS = 1_000_000
+
+
+class TickReplayExchange(MarketDataProviderInterface):
+    """
+    Replays the events of one market as candles of `timeframe`.
+
+    events: timestamp (ms, sorted) / open / high / low / close / volume columns, one row per event
+    (see from_trades, from_candles).
+    step: what one tick() replays: the events of the next step ("1s", "1m"... or ms),
+    or a single event when None. With step == timeframe, every tick ends on a candle close and
+    the replay gives the same candles as a HistoricalExchange of the aggregated candles.
+    Like HistoricalExchange, the symbol and timeframe asked by the strategy are not checked.
+    """
+
+    exits_at_level = True
+
+    def __init__(self, events: Dict[str, np.ndarray], timeframe: str = "1h", step: Union[str, int, None] = "1s"):
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_seconds(timeframe) * 1000
+        self.step_ms = timeframe_seconds(step) * 1000 if isinstance(step, str) else step
+
+        self.timestamps = np.asarray(events["timestamp"], dtype=np.int64)
+        self.open = np.asarray(events["open"], dtype=np.float64)
+        self.high = np.asarray(events["high"], dtype=np.float64)
+        self.low = np.asarray(events["low"], dtype=np.float64)
+        self.close = np.asarray(events["close"], dtype=np.float64)
+        self.volume = np.asarray(events["volume"], dtype=np.float64)
+        self.length = len(self.timestamps)
+        self.cursor = 0  # events replayed
+
+        self._aggregate_candles()
+        self._forming: Optional[list] = None  # [candle, events aggregated up to, high, low, volume]
+
+    @classmethod
+    def from_trades(cls, trades: Dict[str, np.ndarray], timeframe: str = "1h",
+                    step: Union[str, int, None] = "1s") -> "TickReplayExchange":
+        """Aggregated trades (TradeStore columns): every trade is a candle at its price"""
+        price = trades["price"]
+        return cls({"timestamp": trades["timestamp"], "open": price, "high": price, "low": price,
+                    "close": price, "volume": trades["quantity"]}, timeframe, step)
+
+    @classmethod
+    def from_candles(cls, candles: Dict[str, np.ndarray], timeframe: str = "1h",
+                     step: Union[str, int, None] = "1s") -> "TickReplayExchange":
+        """Small candles (e.g. 1s klines from the CandleStore) replayed as larger ones"""
+        return cls({name: candles[name] for name in OHLCV}, timeframe, step)
+
+    def _aggregate_candles(self):
+        """Closed candles of the whole replay: one reduction per column over the candle boundaries"""
+        starts = []
+        previous = None
+        for first in range(0, self.length, BATCH_EVENTS):
+            candle_ids = self.timestamps[first:first + BATCH_EVENTS] // self.timeframe_ms
+            if candle_ids[0] != previous:
+                starts.append(np.array([first]))
+            starts.append(np.flatnonzero(np.diff(candle_ids)) + 1 + first)
+            previous = candle_ids[-1]
+        self.starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+        ends = np.append(self.starts[1:], self.length).astype(np.int64)
+
+        if len(self.starts):
+            block = np.vstack([
+                (self.timestamps[self.starts] // self.timeframe_ms * self.timeframe_ms).astype(np.float64),
+                self.open[self.starts],
+                np.maximum.reduceat(self.high, self.starts),
+                np.minimum.reduceat(self.low, self.starts),
+                self.close[ends - 1],
+                np.add.reduceat(self.volume, self.starts),
+            ])
+        else:
+            block = np.empty((len(OHLCV), 0))
+        block.flags.writeable = False
+        self.candles = {name: block[i] for i, name in enumerate(OHLCV)}
+
+    @property
+    def now_ms(self) -> Optional[int]:
+        """Time of the last replayed event"""
+        return int(self.timestamps[self.cursor - 1]) if self.cursor else None
+
+    def tick(self) -> bool:
+        if self.cursor >= self.length:
+            return False
+        if self.step_ms is None:
+            target = self.cursor + 1
+        else:
+            boundary = (int(self.timestamps[self.cursor]) // self.step_ms + 1) * self.step_ms
+            target = int(np.searchsorted(self.timestamps, boundary, side="left"))
+        self._advance(target)
+        return True
+
+    def _advance(self, target: int):
+        """Replay the events up to `target`: the forming candle is only updated with the new ones"""
+        candle = int(np.searchsorted(self.starts, target - 1, side="right")) - 1
+        if self._forming is not None and self._forming[0] == candle:
+            first = self._forming[1]
+            high, low, volume = self._forming[2:]
+        else:
+            first = int(self.starts[candle])
+            high, low, volume = -np.inf, np.inf, 0.0
+        if target > first:
+            high = max(high, float(self.high[first:target].max()))
+            low = min(low, float(self.low[first:target].min()))
+            volume += float(self.volume[first:target].sum())
+        self._forming = [candle, target, high, low, volume]
+        self.cursor = target
+
+    def iter_batches(self, batch_events: int = BATCH_EVENTS) -> Iterator[Dict[str, np.ndarray]]:
+        """The events of the replay, `batch_events` at a time, as column views (nothing is copied)"""
+        for first in range(0, self.length, batch_events):
+            last = first + batch_events
+            yield {"timestamp": self.timestamps[first:last], "open": self.open[first:last],
+                   "high": self.high[first:last], "low": self.low[first:last],
+                   "close": self.close[first:last], "volume": self.volume[first:last]}
+
+    async def get_arrays(self, symbol: str, timeframe: str, limit=None) -> Dict[str, np.ndarray]:
+        if self._forming is None:
+            return {name: np.empty(0) for name in OHLCV}
+        candle, _, high, low, volume = self._forming
+        start = max(0, candle + 1 - limit) if limit else 0
+        forming = (self.candles["timestamp"][candle], self.open[self.starts[candle]], high, low,
+                   self.close[self.cursor - 1], volume)
+        return {name: np.append(self.candles[name][start:candle], value) for name, value in zip(OHLCV, forming)}
+
+    async def get_history(self, symbol: str, timeframe: str, limit=None) -> pd.DataFrame:
+        arrays = await self.get_arrays(symbol, timeframe, limit)
+        last = self._forming[0] + 1 if self._forming else 0
+        return pd.DataFrame(arrays, index=pd.RangeIndex(last - len(arrays["close"]), last), copy=False)
+
+    def get_price(self, symbol: str) -> float:
+        return float(self.close[self.cursor - 1])
@@ -0,0 +1,185 @@
+"""
+Columnar on-disk store of Binance aggregated trades (aggTrades archives), the CandleStore of ticks.
+
+Daily or monthly aggTrades CSVs are parsed once, in chunks (a month of BTCUSDT is tens of
+millions of rows), and saved as one .npy file per column:
+
+    {root}/{symbol}/aggTrades/{YYYY-MM[-DD]}/timestamp.npy   int64 (ms)
+                                              price.npy       float64
+                                              quantity.npy    float64
+
+Reading is a memory map of the column files: a replay only loads the pages it goes through.
+
+Ingest from backend/:
+    python -m app.infrastructure.adapters.trade_store --data-dir data/aggTrades
+"""
+import argparse
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+from app.infrastructure.adapters.candle_store import TimeBound, _load_columns, _swap_dir, _time_bound_ms, to_milliseconds
+
+TRADE_STORE_DIR = os.getenv("TRADE_STORE_DIR", "data/trades")
+
+# Binance aggTrades CSV columns (recent files have them as a header row, older ones have none)
+AGG_TRADE_COLUMNS = [
+    "agg_trade_id", "price", "quantity", "first_trade_id", "last_trade_id",
+    "transact_time", "is_buyer_maker", "is_best_match",
+]
+
+# Stored columns and their type
+TRADE_COLUMNS = {
+    "timestamp": np.int64,
+    "price": np.float64,
+    "quantity": np.float64,
+}
+
+# BTCUSDT-aggTrades-2024-03.csv, BTCUSDT-aggTrades-2024-03-01.csv
+CSV_NAME_PATTERN = re.compile(r"^(?P<symbol>[A-Z0-9]+)-aggTrades-(?P<period>\d{4}-\d{2}(-\d{2})?)\.csv$")
+
+CSV_CHUNK_ROWS = 1_000_000
+
+
+def _count_rows(path: Path) -> int:
+    """Data rows of a CSV, without parsing it"""
+    rows = 0
+    with open(path, "rb") as file:
+        while chunk := file.read(1 << 24):
+            rows += chunk.count(b"\n")
+        if file.tell():
+            file.seek(-1, os.SEEK_END)
+            rows += file.read(1) != b"\n"  # no trailing newline
+    return rows - _has_header(path)
+
+
+def _has_header(path: Path) -> bool:
+    with open(path, "rb") as file:
+        first = file.read(1)
+    return bool(first) and not first.isdigit()
+
+
+class TradeStore:
+    """
+    Aggregated trades indexed by symbol and period (a day or a month, as in the Binance archive names).
+    """
+
+    def __init__(self, root: Union[str, Path] = TRADE_STORE_DIR):
+        self.root = Path(root)
+
+    def _period_dir(self, symbol: str, period: str) -> Path:
+        return self.root / symbol / "aggTrades" / period
+
+    # ---------------------------------------------------------------------
+    # Ingest
+    # ---------------------------------------------------------------------
+    def ingest_csv(self, path: Union[str, Path], symbol: str = None, period: str = None, force: bool = False) -> Path:
+        """
+        Ingest a Binance aggTrades CSV. symbol/period default to the ones in the file name.
+        The columns are filled chunk by chunk into pre-sized .npy memory maps: memory stays flat.
+        """
+        path = Path(path)
+        if symbol is None or period is None:
+            match = CSV_NAME_PATTERN.match(path.name)
+            if not match:
+                raise ValueError(f"Can't read symbol/period from file name {path.name}")
+            symbol = symbol or match["symbol"]
+            period = period or match["period"]
+
+        period_dir = self._period_dir(symbol, period)
+        if not force and period_dir.exists() and period_dir.stat().st_mtime >= path.stat().st_mtime:
+            return period_dir
+
+        # Write next to the final directory, then swap (_swap_dir): readers never see a half-written period
+        tmp_dir = period_dir.with_name(period_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        rows = _count_rows(path)
+        columns = {name: np.lib.format.open_memmap(tmp_dir / f"{name}.npy", mode="w+", dtype=dtype, shape=(rows,))
+                   for name, dtype in TRADE_COLUMNS.items()}
+        reader = pd.read_csv(path, names=AGG_TRADE_COLUMNS, header=0 if _has_header(path) else None,
+                             usecols=["price", "quantity", "transact_time"], chunksize=CSV_CHUNK_ROWS)
+        start = 0
+        for chunk in reader:
+            end = start + len(chunk)
+            columns["timestamp"][start:end] = to_milliseconds(chunk["transact_time"].to_numpy())
+            columns["price"][start:end] = chunk["price"].to_numpy(dtype=np.float64)
+            columns["quantity"][start:end] = chunk["quantity"].to_numpy(dtype=np.float64)
+            start = end
+        for column in columns.values():
+            column.flush()
+        del columns
+
+        _swap_dir(tmp_dir, period_dir)
+        return period_dir
+
+    def ingest_directory(self, data_dir: Union[str, Path], force: bool = False) -> List[Path]:
+        """Ingest every Binance aggTrades CSV found in data_dir"""
+        return [self.ingest_csv(path, force=force)
+                for path in sorted(Path(data_dir).glob("*.csv")) if CSV_NAME_PATTERN.match(path.name)]
+
+    # ---------------------------------------------------------------------
+    # Read
+    # ---------------------------------------------------------------------
+    def periods(self, symbol: str) -> List[str]:
+        """Stored periods ("2024-03", "2024-03-01"...), in chronological order"""
+        symbol_dir = self.root / symbol / "aggTrades"
+        if not symbol_dir.exists():
+            return []
+        # A period being re-ingested is only there as ".old" for a moment
+        return sorted({period_dir.name.removesuffix(".old") for period_dir in symbol_dir.iterdir()
+                       if period_dir.is_dir() and re.fullmatch(r"\d{4}-\d{2}(-\d{2})?(\.old)?", period_dir.name)})
+
+    def load_period(self, symbol: str, period: str) -> Dict[str, np.ndarray]:
+        """Memory-mapped, read-only columns of one period"""
+        columns = _load_columns(self._period_dir(symbol, period), TRADE_COLUMNS)
+        if columns is None:
+            raise ValueError(f"No trades stored for {symbol} {period}")
+        return columns
+
+    def iter_periods(self, symbol: str, start: TimeBound = None, end: TimeBound = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Period by period columns for [start, end), each one trimmed to the range (views on the memory maps)"""
+        start_ms = _time_bound_ms(start)
+        end_ms = _time_bound_ms(end)
+        for period in self.periods(symbol):
+            columns = self.load_period(symbol, period)
+            timestamps = columns["timestamp"]
+            if len(timestamps) == 0:
+                continue
+            first = int(np.searchsorted(timestamps, start_ms)) if start_ms is not None else 0
+            last = int(np.searchsorted(timestamps, end_ms)) if end_ms is not None else len(timestamps)
+            if last > first:
+                yield {name: values[first:last] for name, values in columns.items()}
+
+    def load(self, symbol: str, start: TimeBound = None, end: TimeBound = None) -> Dict[str, np.ndarray]:
+        """
+        Trades of [start, end). A range inside one period is returned as memory-mapped views,
+        longer ones are concatenated once.
+        """
+        chunks = list(self.iter_periods(symbol, start, end))
+        if not chunks:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in TRADE_COLUMNS.items()}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in TRADE_COLUMNS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest Binance aggTrades CSVs into the trade store")
+    parser.add_argument("--data-dir", type=Path, required=True, help="Directory of Binance aggTrades CSVs")
+    parser.add_argument("--store", type=Path, default=Path(TRADE_STORE_DIR), help="Trade store root directory")
+    parser.add_argument("--force", action="store_true", help="Re-ingest periods already stored")
+    args = parser.parse_args(argv)
+
+    ingested = TradeStore(args.store).ingest_directory(args.data_dir, force=args.force)
+    print(f"{len(ingested)} periods available in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Values fetched by an async function, kept `ttl` seconds.
+    Concurrent callers of a missing/expired key wait for a single fetch.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (fetched_at, value)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.fetch_count = 0
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._values.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            in_flight = asyncio.ensure_future(self._fetch(key, fetch))
+            self._in_flight[key] = in_flight
+            in_flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: a cancelled request must not cancel the fetch the others are waiting for
+        return await asyncio.shield(in_flight)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self.fetch_count += 1
+        value = await fetch()
+        self._values[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate(self, key: Hashable = None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
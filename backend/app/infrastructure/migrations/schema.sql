@@ -67,6 +67,17 @@ CREATE TABLE public.bots (
 );
 
 
+--
+-- Name: bot_states; Type: TABLE; Schema: public; Owner: -
+--
+
+CREATE TABLE public.bot_states (
+    bot_id text NOT NULL,
+    state jsonb NOT NULL,
+    updated_at timestamp with time zone
+);
+
+
 --
 -- Name: orders; Type: TABLE; Schema: public; Owner: -
 --
@@ -109,6 +120,14 @@ ALTER TABLE ONLY public.bots
     ADD CONSTRAINT bots_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: bot_states bot_states_pkey; Type: CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bot_states
+    ADD CONSTRAINT bot_states_pkey PRIMARY KEY (bot_id);
+
+
 --
 -- Name: orders trades_pkey; Type: CONSTRAINT; Schema: public; Owner: -
 --
@@ -117,6 +136,13 @@ ALTER TABLE ONLY public.orders
     ADD CONSTRAINT trades_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: ix_bot_logs_bot_id_created_at; Type: INDEX; Schema: public; Owner: -
+--
+
+CREATE INDEX IF NOT EXISTS ix_bot_logs_bot_id_created_at ON public.bot_logs USING btree (bot_id, created_at);
+
+
 --
 -- Name: bot_logs bot_logs_bot_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -125,6 +151,14 @@ ALTER TABLE ONLY public.bot_logs
     ADD CONSTRAINT bot_logs_bot_id_fkey FOREIGN KEY (bot_id) REFERENCES public.bots(id) ON DELETE CASCADE;
 
 
+--
+-- Name: bot_states bot_states_bot_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
+--
+
+ALTER TABLE ONLY public.bot_states
+    ADD CONSTRAINT bot_states_bot_id_fkey FOREIGN KEY (bot_id) REFERENCES public.bots(id) ON DELETE CASCADE;
+
+
 --
 -- Name: orders trades_bot_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: -
 --
@@ -1,12 +1,21 @@
+import asyncio
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from app.api.router import router
 from app.config import applicationSettings
-from app.infrastructure.adapters.binance_adapter import BinanceAdapter
+from app.infrastructure.adapters.adapter_registry import AdapterRegistry
+from app.services.bot_log_sink import BotLogSink
+from app.services.bot_state_store import BotStateStore
+from app.services.logging import bot_logger
+from app.services.order_journal import OrderJournal
 from app.services.order_service import OrderService
 from app.bots.bot_manager import BotManager
 
+# Seconds the running bot ticks get to finish on shutdown (keep it under the orchestrator's stop grace period)
+SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "10"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -14,24 +23,55 @@ async def lifespan(app: FastAPI):
     Lifespan context manager for startup and shutdown events.
     """
     # Startup
-    exchange = BinanceAdapter(
+    # One adapter (ccxt client, markets, caches) shared by the bots and the API requests
+    adapters = AdapterRegistry()
+    exchange = adapters.get(
         api_key=applicationSettings.binance_keys.api_key,
         secret=applicationSettings.binance_keys.secret,
         sandbox=applicationSettings.sandbox_mode
     )
-    order_service = OrderService(exchange=exchange)
-    bot_manager = BotManager(exchange=exchange, order_service=order_service)
+    # Orders are written to the DB in batches, in the background
+    order_journal = OrderJournal()
+    await order_journal.start()
+    # Logs of the bots also go to the bot_logs table (batched), for GET /bots/{bot_id}/logs
+    bot_log_sink = BotLogSink()
+    await bot_log_sink.start()
+    bot_logger.logger.addHandler(bot_log_sink)
+    # Open positions (strategy runtime state) are snapshotted to the DB, and restored below
+    state_store = BotStateStore()
+    await state_store.start()
+    order_service = OrderService(exchange=exchange, journal=order_journal)
+    # Market data of the bots: REST (polled on the candle closes) or the WebSocket streams; orders always go through REST
+    market_data = exchange
+    if applicationSettings.market_data_stream:
+        market_data = adapters.stream(
+            api_key=applicationSettings.binance_keys.api_key,
+            secret=applicationSettings.binance_keys.secret,
+            sandbox=applicationSettings.sandbox_mode
+        )
+    bot_manager = BotManager(exchange=market_data, order_service=order_service, state_store=state_store)
+    # Every bot running before the restart: one query, caches warmed concurrently
+    try:
+        await bot_manager.restore_running_bots()
+    except Exception as e:
+        # The API still starts: the bots can be restarted one by one (POST /bots/{bot_id}/restart)
+        bot_logger.error(f"Bots restore failed: {e}")
 
     # Store in app.state
     app.state.bot_manager = bot_manager
     app.state.exchange = exchange
+    app.state.adapters = adapters
 
     yield  # Application runs here
 
     # Shutdown (cleanup)
-    # e.g., close connections, stop bots gracefully
-    # await bot_manager.shutdown()
-    await exchange.close()
+    # Stop ticking and drain the running ticks first: they may still create orders / logs / state
+    await bot_manager.shutdown(timeout=SHUTDOWN_TIMEOUT)
+    # Then flush every pending write, concurrently
+    await asyncio.gather(order_journal.close(), state_store.close())
+    bot_logger.logger.removeHandler(bot_log_sink)
+    await bot_log_sink.close()
+    await adapters.close()
 
 
 app = FastAPI(title="Botox API", lifespan=lifespan, root_path=applicationSettings.root_path)
@@ -1,15 +1,20 @@
-from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from datetime import datetime
+
+from sqlalchemy import String, Text, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
-from app.db.base import Base
+from app.infrastructure.adapters.database import Base
 
 class BotLog(Base):
     __tablename__ = "bot_logs"
+    # Every query is "the logs of one bot, in a time range, newest first"
+    __table_args__ = (Index("ix_bot_logs_bot_id_created_at", "bot_id", "created_at"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     bot_id: Mapped[str] = mapped_column(ForeignKey("bots.id", ondelete="CASCADE"))
     level: Mapped[str] = mapped_column(String)
     message: Mapped[str] = mapped_column(Text)
-    created_at: Mapped = mapped_column(
-        DateTime(timezone=True),
+    # Time of the log record (written in batches, so not the insert time)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
         server_default=func.now()
     )
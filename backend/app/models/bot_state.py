@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.infrastructure.adapters.database import Base
+
+class BotState(Base):
+    """Last snapshot of a bot's runtime state (open position, SL/TP...), one row per bot"""
+    __tablename__ = "bot_states"
+
+    bot_id: Mapped[str] = mapped_column(ForeignKey("bots.id", ondelete="CASCADE"), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSON)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now)
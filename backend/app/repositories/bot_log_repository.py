@@ -0,0 +1,74 @@
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.adapters.database import AsyncSessionLocal
+from app.models.bot_log import BotLog
+
+Cursor = Tuple[datetime, int]  # (created_at, id) of the last log of a page
+
+
+def encode_cursor(log: BotLog) -> str:
+    return f"{log.created_at.isoformat()}_{log.id}"
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """:raises ValueError: If the cursor is malformed"""
+    created_at, _, log_id = cursor.rpartition("_")
+    return datetime.fromisoformat(created_at), int(log_id)
+
+
+class AsyncBotLogRepository:
+    """
+    bot_logs table: bulk inserts (from the BotLogSink) and per-bot pages, newest first.
+    """
+
+    def __init__(self, db: Optional[AsyncSession] = None, session_factory=AsyncSessionLocal):
+        self._external_db = db
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def _session(self):
+        if self._external_db is not None:
+            yield self._external_db
+        else:
+            async with self._session_factory() as db:
+                yield db
+
+    async def insert_logs(self, rows: List[Dict[str, Any]]) -> int:
+        """One multi-row INSERT for the whole batch"""
+        if not rows:
+            return 0
+        async with self._session() as db:
+            await db.execute(insert(BotLog), rows)
+            await db.commit()
+        return len(rows)
+
+    async def get_logs(self, bot_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       level: Optional[str] = None, limit: int = 100,
+                       cursor: Optional[Cursor] = None) -> List[BotLog]:
+        """
+        Logs of a bot in [start, end), newest first.
+        Keyset pagination: cursor is the (created_at, id) of the last log of the previous page,
+        so every page is a range scan of the (bot_id, created_at) index, however deep it is.
+        """
+        query = select(BotLog).where(BotLog.bot_id == bot_id)
+        if start is not None:
+            query = query.where(BotLog.created_at >= start)
+        if end is not None:
+            query = query.where(BotLog.created_at < end)
+        if level is not None:
+            query = query.where(BotLog.level == level.upper())
+        if cursor is not None:
+            created_at, log_id = cursor
+            query = query.where(or_(
+                BotLog.created_at < created_at,
+                and_(BotLog.created_at == created_at, BotLog.id < log_id),
+            ))
+        query = query.order_by(BotLog.created_at.desc(), BotLog.id.desc()).limit(limit)
+
+        async with self._session() as db:
+            return (await db.scalars(query)).all()
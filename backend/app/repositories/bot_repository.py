@@ -1,6 +1,11 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.bot import Bot
-from app.infrastructure.adapters.database import SessionLocal
+from app.models.bot_state import BotState
+from app.infrastructure.adapters.database import SessionLocal, AsyncSessionLocal
 
 
 class BotRepository:
@@ -38,3 +43,57 @@ class BotRepository:
         if not bot:
             raise ValueError(f"Bot {bot_id} not found")
         return bot
+
+
+class AsyncBotRepository:
+    """
+    Same operations as BotRepository on the async engine.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_bot(self, bot):
+        db_bot = Bot(
+            id=bot.bot_id,
+            strategy=bot.strategy.name,
+            params=bot.strategy.model_dump(),
+            status="R"
+        )
+        self.db.add(db_bot)
+        await self.db.commit()
+        await self.db.refresh(db_bot)  # created_at is set by the DB
+        return db_bot
+
+    async def get_all_bots(self):
+        return (await self.db.scalars(select(Bot))).all()
+
+    async def get_bot_by_id(self, bot_id: str) -> Bot:
+        """Retrieve a bot by its ID.
+        :param bot_id: The string ID of the bot
+        :return: a Bot object
+        :raises ValueError: If bot not found."""
+
+        bot = await self.db.get(Bot, bot_id)
+        if not bot:
+            raise ValueError(f"Bot {bot_id} not found")
+        return bot
+
+    async def get_running_bots_with_state(self) -> List[Tuple[Bot, Optional[dict]]]:
+        """Every running bot with its last state snapshot (None if it has none), in one query"""
+        query = (
+            select(Bot, BotState.state)
+            .outerjoin(BotState, BotState.bot_id == Bot.id)
+            .where(Bot.status == "R")
+            .order_by(Bot.id)
+        )
+        return [(bot, state) for bot, state in (await self.db.execute(query)).all()]
+
+    async def get_bot_state(self, bot_id: str) -> Optional[dict]:
+        state = await self.db.get(BotState, bot_id)
+        return state.state if state else None
+
+    async def update_status(self, bot_id: str, status: str):
+        """status: "R" running (restored at startup), "S" stopped"""
+        await self.db.execute(update(Bot).where(Bot.id == bot_id).values(status=status))
+        await self.db.commit()
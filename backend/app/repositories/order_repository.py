@@ -1,14 +1,17 @@
 import uuid
+from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any, List
 
 from pydantic import UUID4
 from pydantic.v1 import UUID1
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.bot import Bot
 from app.models.order import Order
-from app.infrastructure.adapters.database import get_db, SessionLocal
+from app.infrastructure.adapters.database import get_db, SessionLocal, AsyncSessionLocal
 from app.services.logging import bot_logger
 
 
@@ -92,4 +95,81 @@ class OrderRepository:
 
 
     def get_orders_by_bot_id(self, bot_id: str) -> list[type[Order]]:
-        return self.db.query(Order).filter(Order.bot_id == bot_id).all()
\ No newline at end of file
+        return self.db.query(Order).filter(Order.bot_id == bot_id).all()
+
+
+class AsyncOrderRepository:
+    """
+    Same operations as OrderRepository on the async engine: DB round-trips don't block the event loop.
+    """
+
+    def __init__(self, db: Optional[AsyncSession] = None, session_factory=AsyncSessionLocal):
+        # db: when coming from a FastApi request, injected with Depends(get_async_db)
+        # otherwise every operation borrows its own session (and connection) from the pool:
+        # an AsyncSession can't be shared by bots running concurrently
+        self._external_db = db
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def _session(self):
+        if self._external_db is not None:
+            yield self._external_db
+        else:
+            async with self._session_factory() as db:
+                yield db
+
+    async def create_order(self, order):
+        async with self._session() as db:
+            bot_exists = await db.get(Bot, order.bot_id)
+
+            if not bot_exists:
+                bot_logger.error(f"Bot {order.bot_id} not found, cant create associated order")
+
+            try:
+                db.add(order)
+                await db.commit()
+                return order
+
+            except IntegrityError:
+                await db.rollback()
+                raise
+
+    async def get_all_orders(self):
+        async with self._session() as db:
+            return (await db.scalars(select(Order))).all()
+
+    async def get_order_by_id(self, order_id: uuid.UUID) -> Order:
+        """Retrieve an order by its ID.
+        :param order_id: The UUID of the order
+        :return: an Order object
+        :raises ValueError: If order not found."""
+        async with self._session() as db:
+            order = await db.get(Order, order_id)
+            if not order:
+                raise ValueError(f"Order {order_id} not found")
+            return order
+
+    async def update_order(self, id: UUID4, updates: Dict[str, Any]) -> Optional[Order]:
+        """
+        Update an order with given fields, in a single UPDATE ... RETURNING round-trip.
+
+        :param id: ID of the order to update
+        :param updates: Dictionary of fields to update
+        :return: Updated Order or None if not found
+        """
+        values = {field: value for field, value in updates.items() if hasattr(Order, field)}
+        async with self._session() as db:
+            order = await db.scalar(
+                update(Order).where(Order.id == id).values(**values).returning(Order),
+                execution_options={"synchronize_session": False},
+            )
+            await db.commit()
+            return order
+
+    async def get_orders_by_bot_id(self, bot_id: str) -> list[Order]:
+        async with self._session() as db:
+            return (await db.scalars(select(Order).where(Order.bot_id == bot_id))).all()
+
+    async def close(self):
+        # Sessions are closed after every operation, nothing kept open
+        pass
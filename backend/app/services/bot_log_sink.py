@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.infrastructure.adapters.database import AsyncSessionLocal
+from app.repositories.bot_log_repository import AsyncBotLogRepository
+from app.services.logging import bot_logger
+
+
+class BotLogSink(logging.Handler):
+    """
+    Logging handler writing the records of the bots (records with a bot_id) to the bot_logs table.
+
+    emit() only appends a row to a bounded buffer; a background task writes the buffer
+    every flush_interval seconds (or as soon as max_batch rows are waiting) as one multi-row INSERT.
+    - over max_pending rows (DB down or too slow), new rows are dropped and counted
+    - rows of a bot the DB rejects (unknown bot id) are dropped, the rest of the batch is written
+    The rotating log files keep everything anyway: this table is the per-bot history served by the API.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval: float = 0.5,
+                 max_batch: int = 1000, max_pending: int = 50_000, level: int = logging.INFO):
+        super().__init__(level=level)
+        self.repository = AsyncBotLogRepository(session_factory=session_factory)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._rows: Deque[Dict[str, Any]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def emit(self, record: logging.LogRecord):
+        bot_id = getattr(record, "bot_id", "-")
+        if not bot_id or bot_id == "-":
+            return
+        if len(self._rows) >= self.max_pending:
+            self.dropped += 1
+            return
+        try:
+            self._rows.append({
+                "bot_id": bot_id,
+                "level": record.levelname,
+                "message": record.getMessage(),
+                "created_at": datetime.fromtimestamp(record.created),
+            })
+        except Exception:
+            self.handleError(record)
+            return
+
+        if len(self._rows) == self.max_batch and self._wake is not None:
+            # Records may come from another thread: the event is only touched from its loop
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    # ---------------------------------------------------------------------
+    # Background flush
+    # ---------------------------------------------------------------------
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._closing = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the background task and write what is still buffered"""
+        self._closing = True
+        if self._wake is not None:
+            self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+        super().close()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Not tagged with a bot_id: doesn't come back into this sink
+                bot_logger.error(f"Bot log flush error: {e}")
+
+    async def flush(self) -> int:
+        """Write the buffered rows, max_batch at a time. Returns the number of rows written."""
+        written = 0
+        while self._rows:
+            batch = [self._rows.popleft() for _ in range(min(self.max_batch, len(self._rows)))]
+            try:
+                try:
+                    written += await self.repository.insert_logs(batch)
+                except IntegrityError:
+                    rows, dropped = len(batch), self.dropped
+                    try:
+                        await self._write_per_bot(batch)
+                    finally:
+                        written += rows - len(batch) - (self.dropped - dropped)
+            except Exception:
+                # DB unreachable: keep the rows (in order) for the next flush. When it failed while
+                # writing bot by bot, the batch only holds the rows not written yet
+                self._rows.extendleft(reversed(batch))
+                self.written += written
+                raise
+        self.written += written
+        return written
+
+    async def _write_per_bot(self, batch: List[Dict[str, Any]]):
+        """
+        Write a rejected batch bot by bot, dropping the rows of the bots the DB rejects.
+        The rows written or dropped are removed from the batch: if the DB fails otherwise (connection,
+        timeout), the exception goes up and the batch holds what's left to write.
+        """
+        done = set()
+        try:
+            for bot_id, rows in groupby(sorted(batch, key=lambda row: row["bot_id"]), key=lambda row: row["bot_id"]):
+                rows = list(rows)
+                try:
+                    await self.repository.insert_logs(rows)
+                except IntegrityError as e:
+                    self.dropped += len(rows)
+                    bot_logger.error(f"{len(rows)} logs of bot {bot_id} rejected by the DB, dropped: {e.orig}")
+                done.update(id(row) for row in rows)
+        finally:
+            batch[:] = [row for row in batch if id(row) not in done]
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.infrastructure.adapters.database import AsyncSessionLocal
+from app.models.bot_state import BotState
+from app.services.logging import bot_logger
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class BotStateStore:
+    """
+    Snapshots of the bots' runtime state (open position, SL/TP) in the bot_states table.
+
+    record() is called after every tick: it is a dict comparison while the state is unchanged
+    (most ticks), and only a changed state is queued. Queued snapshots (latest one per bot)
+    are upserted every flush_interval seconds, all bots in one statement.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval: float = 1.0):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._saved: Dict[str, Dict[str, Any]] = {}  # bot_id -> last snapshot written (or restored)
+        self._dirty: Dict[str, Dict[str, Any]] = {}  # bot_id -> snapshot to write
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.flushed_rows = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def mark_saved(self, bot):
+        """
+        The bot's current state is already what the DB holds (restored from its snapshot,
+        or a new bot without any: no row = initial state). Nothing to write until it changes.
+        """
+        snapshot_state = getattr(bot.strategy, "snapshot_state", None)
+        if snapshot_state is not None:
+            self._saved[bot.bot_id] = snapshot_state()
+
+    def record(self, bot) -> bool:
+        """Queue the bot's snapshot if it changed since the last one. Returns True if queued."""
+        snapshot_state = getattr(bot.strategy, "snapshot_state", None)
+        if snapshot_state is None:
+            return False
+        state = snapshot_state()
+        if self._dirty.get(bot.bot_id, self._saved.get(bot.bot_id)) == state:
+            return False
+        self._dirty[bot.bot_id] = state
+        return True
+
+    def forget(self, bot_id: str):
+        self._saved.pop(bot_id, None)
+        self._dirty.pop(bot_id, None)
+
+    # ---------------------------------------------------------------------
+    # Background flush
+    # ---------------------------------------------------------------------
+    async def start(self):
+        self._closing = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bot_logger.error(f"Bot state flush error: {e}")
+
+    async def flush(self) -> int:
+        """Upsert the queued snapshots. On failure they stay queued (unless a newer one replaced them)."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        now = datetime.now()
+        rows = [{"bot_id": bot_id, "state": state, "updated_at": now} for bot_id, state in dirty.items()]
+        try:
+            async with self.session_factory() as db:
+                insert = UPSERT_DIALECTS[db.bind.dialect.name]
+                statement = insert(BotState).values(rows)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[BotState.bot_id],
+                    set_={"state": statement.excluded.state, "updated_at": statement.excluded.updated_at},
+                )
+                await db.execute(statement)
+                await db.commit()
+        except BaseException:
+            self._dirty = {**dirty, **self._dirty}
+            raise
+
+        self._saved.update(dirty)
+        self.flushed_rows += len(rows)
+        return len(rows)
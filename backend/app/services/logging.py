@@ -1,32 +1,218 @@
+import copy
+import json
 import logging
 import os
 import sys
-from logging.handlers import TimedRotatingFileHandler
+import threading
+from collections import deque
+from logging.handlers import BaseRotatingHandler, TimedRotatingFileHandler
+from typing import Deque, List
+
+from app.services.metrics import current_bot_id
 
 LOG_DIR = os.getenv("LOG_DIR", "logs")
+# "async": records are written by a background thread (no disk I/O in the event loop), "sync": written by the caller
+LOG_MODE = os.getenv("LOG_MODE", "async")
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "10000"))
+# "drop": INFO records are dropped when the buffer is full, "block": the caller waits for room
+LOG_OVERFLOW = os.getenv("LOG_OVERFLOW", "drop")
 
 class BotLoggerAdapter(logging.LoggerAdapter):
     def process(self, msg, kwargs):
         # Ensure 'bot_id' exists in extra to avoid KeyError
+        # (inside a bot tick: the bot being ticked, so strategy / order logs are attributed to it)
         extra = kwargs.get("extra", {})
         if "bot_id" not in extra:
-            extra["bot_id"] = "-"
+            extra["bot_id"] = current_bot_id.get()
         kwargs["extra"] = extra
         return msg, kwargs
 
-def setup_logger(name="botox_app"):
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (messages with quotes, newlines or tracebacks stay valid JSON)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "module": record.module,
+            "bot_id": getattr(record, "bot_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class AsyncLogHandler(logging.Handler):
+    """
+    Hands the records over to a background thread, which formats and writes them to `handlers`.
+
+    The caller only appends the record to a bounded buffer. The writer thread takes up to
+    max_batch records at a time and writes them with one flush per handler and per batch.
+    When the buffer is full (the disk can't keep up):
+    - overflow="drop": INFO/DEBUG records are dropped (and counted, a warning tells how many)
+    - overflow="block": the caller waits for room, at most block_timeout seconds
+    WARNING and above always wait for room rather than be dropped.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], capacity: int = LOG_BUFFER_SIZE,
+                 max_batch: int = 500, flush_interval: float = 0.2, overflow: str = LOG_OVERFLOW,
+                 block_timeout: float = 1.0):
+        super().__init__()
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown log overflow policy: {overflow}")
+        self.handlers = handlers
+        self.capacity = capacity
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0  # records lost since the start
+        self.written = 0
+        self._reset()
+        # Threads don't survive a fork (e.g. backtest worker processes): start a new writer in the child
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._buffer: Deque[logging.LogRecord] = deque()
+        self._condition = threading.Condition()
+        self._writing = 0  # records taken from the buffer, not written yet
+        self._unreported_drops = 0
+        self._closing = False
+        self._thread: threading.Thread | None = None
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            record = self._prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+            if len(self._buffer) >= self.capacity:
+                if self.overflow == "drop" and record.levelno < logging.WARNING:
+                    self._drop()
+                    return
+                # Backpressure: wait for the writer to make room
+                self._condition.wait_for(lambda: len(self._buffer) < self.capacity, timeout=self.block_timeout)
+                if len(self._buffer) >= self.capacity:
+                    self._drop()
+                    return
+
+            self._buffer.append(record)
+            if len(self._buffer) >= self.max_batch:
+                self._condition.notify_all()
+
+    def _drop(self):
+        self.dropped += 1
+        self._unreported_drops += 1
+
+    @staticmethod
+    def _prepare(record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze a copy now: the args may be mutated once the caller moves on,
+        # and the other handlers of the record (propagation) must see it unchanged
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._buffer and not self._closing:
+                    self._condition.wait(self.flush_interval)
+                batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+                self._writing = len(batch)
+                dropped, self._unreported_drops = self._unreported_drops, 0
+                closing = self._closing
+                # Room was made: wake up the blocked callers
+                self._condition.notify_all()
+
+            if dropped:
+                batch.append(self._dropped_record(dropped))
+            if batch:
+                self._write(batch)
+
+            with self._condition:
+                self._writing = 0
+                self._condition.notify_all()
+                if closing and not self._buffer:
+                    return
+
+    def _write(self, batch: List[logging.LogRecord]):
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level]
+            if isinstance(handler, logging.StreamHandler):
+                self._write_stream(handler, records)
+            else:
+                for record in records:
+                    handler.handle(record)
+        self.written += len(batch)
+
+    @staticmethod
+    def _write_stream(handler: logging.StreamHandler, records: List[logging.LogRecord]):
+        """Formats and writes the records, with a single flush"""
+        with handler.lock:
+            for record in records:
+                try:
+                    if isinstance(handler, BaseRotatingHandler) and handler.shouldRollover(record):
+                        handler.doRollover()
+                    handler.stream.write(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def _dropped_record(self, count: int) -> logging.LogRecord:
+        record = logging.LogRecord(
+            name="botox_app", level=logging.WARNING, pathname=__file__, lineno=0,
+            msg=f"{count} log records dropped: the log buffer was full", args=None, exc_info=None,
+        )
+        record.bot_id = "-"
+        return record
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until the records emitted so far are written"""
+        with self._condition:
+            if self._thread is None:
+                return
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: not self._buffer and not self._writing, timeout=timeout)
+
+    def close(self):
+        with self._condition:
+            thread = self._thread
+            self._closing = True
+            self._condition.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
+def setup_logger(name="botox_app", mode: str = LOG_MODE):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter(
-        '{"time": "%(asctime)s", "level": "%(levelname)s", "module": "%(module)s", '
-        '"bot_id": "%(bot_id)s", "message": "%(message)s"}'
-    )
+    formatter = JsonFormatter()
 
     # Stdout handler (always on)
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setFormatter(formatter)
-    logger.addHandler(stdout_handler)
 
     # Daily rotating file handler
     os.makedirs(LOG_DIR, exist_ok=True)
@@ -39,10 +225,16 @@ def setup_logger(name="botox_app"):
     )
     file_handler.suffix = "%Y-%m-%d"
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    if mode == "async":
+        # The event loop only appends to a buffer: stdout and disk are written by a background thread
+        logger.addHandler(AsyncLogHandler([stdout_handler, file_handler]))
+    else:
+        logger.addHandler(stdout_handler)
+        logger.addHandler(file_handler)
 
     # Wrap logger in adapter to safely handle 'bot_id'
     return BotLoggerAdapter(logger, extra={})
 
 # central logger instance
-bot_logger = setup_logger()
\ No newline at end of file
+bot_logger = setup_logger()
@@ -0,0 +1,164 @@
+"""
+In-process latency histograms of the bot hot paths, exported in the Prometheus text format.
+
+    with metrics.span("fetch"):
+        history = await market_data.get_history(...)
+
+Every span is recorded in the `botox_span_seconds` histogram, labelled with its name and the
+bot it ran for: BaseBot.tick sets the current bot (a context variable, so concurrent ticks
+don't mix), and every span below it (strategy, OrderService, BinanceAdapter) is attributed
+to that bot. Spans outside a bot (API requests, journal flushes) get bot_id="-".
+
+A span costs two perf_counter_ns() calls, a dict lookup and a bisect over the buckets:
+about a microsecond, against milliseconds for a tick. METRICS_ENABLED=false turns them off.
+"""
+import contextvars
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Upper bounds (seconds): from a cache hit (100µs) to a slow exchange call (10s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SPAN_METRIC = "botox_span_seconds"
+
+current_bot_id: contextvars.ContextVar[str] = contextvars.ContextVar("current_bot_id", default="-")
+
+HistogramKey = Tuple[str, str]  # (span, bot_id)
+
+
+class Histogram:
+    """Fixed buckets, like a Prometheus histogram: counts per bucket, sum and count (plus the max)"""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one: over the largest bucket (+Inf)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimated from the buckets (linear within the bucket, like histogram_quantile in PromQL)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - cumulative) / count, self.max)
+            cumulative += count
+        return self.max
+
+
+class _Span:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry: "Metrics", name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, (time.perf_counter_ns() - self.start) / 1e9)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = METRICS_ENABLED, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms: Dict[HistogramKey, Histogram] = {}
+
+    def span(self, name: str):
+        """Context manager timing its block into the `name` histogram of the current bot"""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float, bot_id: Optional[str] = None):
+        key = (name, bot_id or current_bot_id.get())
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def histogram(self, name: str, bot_id: str = "-") -> Optional[Histogram]:
+        return self._histograms.get((name, bot_id))
+
+    def bot_summary(self, bot_id: str) -> Dict[str, Dict[str, float]]:
+        """Per-span latencies of a bot, in milliseconds"""
+        return {
+            name: {
+                "count": histogram.count,
+                "mean_ms": histogram.sum / histogram.count * 1000,
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+                "max_ms": histogram.max * 1000,
+            }
+            for (name, bot), histogram in sorted(self._histograms.items())
+            if bot == bot_id and histogram.count
+        }
+
+    def render_prometheus(self) -> str:
+        """Text exposition format (version 0.0.4)"""
+        lines: List[str] = [
+            f"# HELP {SPAN_METRIC} Duration of the bot hot path spans (tick, fetch, indicators, orders, exchange calls)",
+            f"# TYPE {SPAN_METRIC} histogram",
+        ]
+        for (name, bot_id), histogram in sorted(self._histograms.items()):
+            labels = f'span="{_escape(name)}",bot_id="{_escape(bot_id)}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{SPAN_METRIC}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{SPAN_METRIC}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{SPAN_METRIC}_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"{SPAN_METRIC}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def discard_bot(self, bot_id: str):
+        for key in [key for key in self._histograms if key[1] == bot_id]:
+            del self._histograms[key]
+
+    def clear(self):
+        self._histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# central registry, like bot_logger
+metrics = Metrics()
@@ -0,0 +1,310 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app.infrastructure.adapters.database import AsyncSessionLocal
+from app.models.order import Order
+from app.services.logging import bot_logger
+from app.services.metrics import metrics
+
+# Local append-only file holding the batches the DB could not take yet
+ORDER_JOURNAL_PATH = os.getenv("ORDER_JOURNAL_PATH", "data/order_journal.jsonl")
+
+ORDER_COLUMNS = [column.key for column in Order.__table__.columns]
+DATETIME_COLUMNS = {"created_at", "executed_at"}
+
+
+def _encode(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    decoded = dict(values)
+    if decoded.get("id") is not None:
+        decoded["id"] = uuid.UUID(decoded["id"])
+    for column in DATETIME_COLUMNS:
+        if decoded.get(column) is not None:
+            decoded[column] = datetime.fromisoformat(decoded[column])
+    return decoded
+
+
+class OrderJournal:
+    """
+    Write-behind buffer between OrderService and the orders table.
+
+    create / status updates return immediately and are written by a background task,
+    many bots at once, as one multi-row INSERT and grouped UPDATEs per flush:
+    - a flush runs every flush_interval seconds, or as soon as max_batch writes are pending
+    - an update of an order still pending is merged into its INSERT (one row, no UPDATE)
+    - if the DB fails or is too slow (flush_timeout), the batch is appended to a local file
+      (fsync'ed) and replayed, in order, before the next batches: no order is lost
+    - after a failed flush the next one waits twice as long (up to max_retry_delay), so an
+      outage doesn't turn into a busy loop of failed writes
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, path: str = ORDER_JOURNAL_PATH,
+                 flush_interval: float = 0.05, max_batch: int = 500, flush_timeout: float = 5.0,
+                 max_retry_delay: float = 5.0):
+        self.session_factory = session_factory
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.flush_timeout = flush_timeout
+        self.max_retry_delay = max_retry_delay
+
+        self._inserts: Dict[uuid.UUID, Dict[str, Any]] = {}  # insertion ordered
+        self._updates: List[Tuple[uuid.UUID, Dict[str, Any]]] = []
+        # Orders not yet confirmed in the DB: execute_order reads them from here
+        self._orders: Dict[uuid.UUID, Order] = {}
+        # Batches held in the local file, read from it once (None: not read yet)
+        self._spilled: Optional[List[Tuple[list, list]]] = None
+        self.retry_delay = 0.0  # wait before the next flush after a failure, 0 when the DB is fine
+
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.flushed_rows = 0
+        self.spilled_rows = 0  # rows currently waiting in the local file
+        self.dropped_rows = 0  # rows the DB rejected (integrity errors), not retried
+
+    @property
+    def pending(self) -> int:
+        return len(self._inserts) + len(self._updates)
+
+    # ---------------------------------------------------------------------
+    # Writes (called by OrderService)
+    # ---------------------------------------------------------------------
+    def record_created(self, order: Order) -> Order:
+        """Queue the INSERT of a new order. The order gets its id and created_at right away."""
+        if order.id is None:
+            order.id = uuid.uuid4()
+        if order.created_at is None:
+            order.created_at = datetime.now()
+
+        self._inserts[order.id] = {column: getattr(order, column) for column in ORDER_COLUMNS}
+        self._orders[order.id] = order
+        self._on_write()
+        return order
+
+    def record_update(self, order_id: uuid.UUID, updates: Dict[str, Any]):
+        """Queue an UPDATE of an order (merged into its INSERT if that one is still pending)"""
+        values = {field: value for field, value in updates.items() if field in ORDER_COLUMNS and field != "id"}
+        if order_id in self._inserts:
+            self._inserts[order_id].update(values)
+        else:
+            self._updates.append((order_id, values))
+        self._on_write()
+
+    def get(self, order_id: uuid.UUID) -> Optional[Order]:
+        """Order written through the journal and not yet confirmed in the DB"""
+        return self._orders.get(order_id)
+
+    def _on_write(self):
+        if self.pending >= self.max_batch:
+            self._wake.set()
+
+    # ---------------------------------------------------------------------
+    # Background flush
+    # ---------------------------------------------------------------------
+    async def start(self):
+        self._closing = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the background task and write everything still pending (to the DB or to the local file)"""
+        # Not cancelled: a batch being written must not be lost half way
+        self._closing = True
+        self._wake.set()
+        if self._task:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._closing:
+            deadline = loop.time() + (self.retry_delay or self.flush_interval)
+            while not self._closing:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                self._wake.clear()
+                # While backing off, a full batch doesn't cut the wait short (close() does)
+                if not self.retry_delay:
+                    break
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bot_logger.error(f"Order journal flush error: {e}")
+
+    async def flush(self) -> int:
+        """Write the spilled batches then the pending ones. Returns the number of rows written to the DB."""
+        async with self._lock:
+            inserts = list(self._inserts.values())
+            updates = self._updates
+            self._inserts = {}
+            self._updates = []
+            if self._spilled is None:
+                self._spilled = self._read_spilled()
+                self.spilled_rows = sum(len(i) + len(u) for i, u in self._spilled)
+            if not inserts and not updates and not self._spilled:
+                return 0
+
+            # Replay what the DB missed first: an update must never reach the DB before its insert
+            batches = list(self._spilled)
+            if inserts or updates:
+                batches.append((inserts, updates))
+
+            written = 0
+            isolating = False
+            for i, (batch_inserts, batch_updates) in enumerate(batches):
+                try:
+                    try:
+                        with metrics.span("order_journal_write"):
+                            written += await asyncio.wait_for(self._write(batch_inserts, batch_updates),
+                                                              self.flush_timeout)
+                    except IntegrityError as e:
+                        # Rows the DB will never take (e.g. unknown bot): isolate them instead of retrying forever
+                        bot_logger.error(f"Order journal batch rejected, writing rows one by one: {e}")
+                        rows, dropped = len(batch_inserts) + len(batch_updates), self.dropped_rows
+                        isolating = True
+                        try:
+                            await self._write_one_by_one(batch_inserts, batch_updates)
+                        finally:
+                            written += rows - len(batch_inserts) - len(batch_updates) - (self.dropped_rows - dropped)
+                except Exception as e:
+                    # batches[i] only holds the rows not written yet when the DB failed while isolating
+                    bot_logger.error(f"Order journal flush failed, {len(batches) - i} batches kept in {self.path}: {e}")
+                    if i == 0 and not isolating:
+                        # Nothing reached the DB: the file is still right, only the new batch is added
+                        self._spill(batches[len(self._spilled):], append=True)
+                    else:
+                        self._spill(batches[i:], append=False)
+                    self._spilled = batches[i:]
+                    self.flushed_rows += written
+                    self.retry_delay = min(self.max_retry_delay, max(self.retry_delay, self.flush_interval) * 2)
+                    return written
+
+            self.path.unlink(missing_ok=True)
+            self._spilled = []
+            self.spilled_rows = 0
+            self.retry_delay = 0.0
+            for batch_inserts, _ in batches:
+                for row in batch_inserts:
+                    self._orders.pop(row["id"], None)
+            self.flushed_rows += written
+            return written
+
+    async def _write(self, inserts: List[Dict[str, Any]], updates: List[Tuple[uuid.UUID, Dict[str, Any]]]) -> int:
+        async with self.session_factory() as db:
+            if inserts:
+                # executemany: one multi-row INSERT ... VALUES (insertmanyvalues)
+                await db.execute(insert(Order), inserts)
+
+            # Bulk UPDATE by primary key, one executemany per set of updated columns
+            grouped: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for order_id, values in updates:
+                grouped.setdefault(tuple(sorted(values)), []).append({"id": order_id, **values})
+            for rows in grouped.values():
+                await db.execute(update(Order), rows)
+
+            await db.commit()
+        return len(inserts) + len(updates)
+
+    async def _write_one_by_one(self, inserts, updates):
+        """
+        Write the rows of a rejected batch one by one, dropping the ones the DB rejects.
+        The rows written or dropped are removed from the lists: if the DB fails otherwise (connection,
+        timeout), the exception goes up and the lists hold what's left to write.
+        """
+        done = 0
+        try:
+            for row in inserts:
+                try:
+                    await asyncio.wait_for(self._write([row], []), self.flush_timeout)
+                except IntegrityError as e:
+                    bot_logger.error(f"Order {row['id']} rejected by the DB, dropped: {e}")
+                    self._orders.pop(row["id"], None)
+                    self.dropped_rows += 1
+                done += 1
+        finally:
+            del inserts[:done]
+
+        done = 0
+        try:
+            for order_id, values in updates:
+                try:
+                    await asyncio.wait_for(self._write([], [(order_id, values)]), self.flush_timeout)
+                except IntegrityError as e:
+                    bot_logger.error(f"Update of order {order_id} rejected by the DB, dropped: {e}")
+                    self.dropped_rows += 1
+                done += 1
+        finally:
+            del updates[:done]
+
+    # ---------------------------------------------------------------------
+    # Local fallback
+    # ---------------------------------------------------------------------
+    def _spill(self, batches, append: bool):
+        """
+        Append the batches to the local file, or replace it with them once part of it reached the DB.
+        Replaced through a temporary file: a crash never leaves a file missing rows already spilled.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not append:
+            self.spilled_rows = 0
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(self.path if append else tmp_path, "a" if append else "w") as f:
+            for inserts, updates in batches:
+                for row in inserts:
+                    f.write(json.dumps({"op": "insert", "values": {k: _encode(v) for k, v in row.items()}}) + "\n")
+                for order_id, values in updates:
+                    f.write(json.dumps({"op": "update", "id": str(order_id),
+                                        "values": {k: _encode(v) for k, v in values.items()}}) + "\n")
+                f.write(json.dumps({"op": "commit"}) + "\n")
+                self.spilled_rows += len(inserts) + len(updates)
+            f.flush()
+            os.fsync(f.fileno())
+        if not append:
+            os.replace(tmp_path, self.path)
+
+    def _read_spilled(self) -> List[Tuple[list, list]]:
+        if not self.path.exists():
+            return []
+        batches = []
+        inserts, updates = [], []
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["op"] == "insert":
+                    inserts.append(_decode_values(entry["values"]))
+                elif entry["op"] == "update":
+                    updates.append((uuid.UUID(entry["id"]), _decode_values(entry["values"])))
+                else:
+                    batches.append((inserts, updates))
+                    inserts, updates = [], []
+        # A batch without its "commit" line was cut by a crash while spilling: still replay it
+        if inserts or updates:
+            batches.append((inserts, updates))
+        return batches
@@ -1,10 +1,20 @@
+import inspect
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from app.infrastructure.adapters.binance_adapter import BinanceAdapter
 from app.models.order import Order
-from app.repositories.order_repository import OrderRepository
+from app.repositories.order_repository import AsyncOrderRepository, OrderRepository
+from app.services.order_journal import OrderJournal
 from app.services.logging import bot_logger
+from app.services.metrics import metrics
+
+
+async def _resolve(result):
+    """Repositories are async (AsyncOrderRepository) or sync (OrderRepository): accept both"""
+    if inspect.isawaitable(result):
+        return await result
+    return result
 
 
 class OrderService:
@@ -12,25 +22,42 @@ class OrderService:
     Handles order execution.
     """
 
-    def __init__(self, exchange: BinanceAdapter = None, repository: OrderRepository | None = None):
-        self.repository = repository or OrderRepository() # creates its own session internally
+    def __init__(self, exchange: BinanceAdapter = None,
+                 repository: AsyncOrderRepository | OrderRepository | None = None,
+                 journal: OrderJournal | None = None):
+        # Async by default: a sync DB call would freeze the event loop, and every running bot with it
+        self.repository = repository or AsyncOrderRepository() # borrows pooled sessions internally
         self.exchange = exchange  # Can be None if no exchange configured
+        # Write-behind: orders are written to the DB in batches by the journal, no round-trip per order
+        self.journal = journal
 
 
     async def create_order(self, order: Order) -> Order:
         """Create and persist order to DB"""
+        with metrics.span("create_order"):
+            return await self._create_order(order)
+
+    async def _create_order(self, order: Order) -> Order:
         bot_logger.info(f"Creating order {order.side} {order.amount} {order.symbol}")
 
-        db_order = self.repository.create_order(order)
-        self.repository.close()
+        if self.journal is not None:
+            return self.journal.record_created(order)
+
+        db_order = await _resolve(self.repository.create_order(order))
+        await _resolve(self.repository.close())
         return db_order
 
     async def execute_order(self, order_id) -> Order:
         """
         Execute an order if a broker is configured.
         """
+        with metrics.span("execute_order"):
+            return await self._execute_order(order_id)
 
-        order = self.repository.get_order_by_id(order_id)
+    async def _execute_order(self, order_id) -> Order:
+        order = self.journal.get(order_id) if self.journal is not None else None
+        if order is None:
+            order = await _resolve(self.repository.get_order_by_id(order_id))
 
         bot_logger.info(f"Executing order {order.side} {order.amount} {order.symbol}")
 
@@ -45,15 +72,20 @@ class OrderService:
                 status = "FAILED"
                 bot_logger.error(f"Binance Order Execution failed: {e}")
 
-            updated_order = self.repository.update_order(
-                id=order.id,
-                updates={
-                    "status": status,
-                    "executed_at": datetime.now()
-                    # "external_order_id": exchange_order.get("id")
-                }
-            )
+            updates = {
+                "status": status,
+                "executed_at": datetime.now()
+                # "external_order_id": exchange_order.get("id")
+            }
+            if self.journal is not None:
+                self.journal.record_update(order.id, updates)
+                for field, value in updates.items():
+                    setattr(order, field, value)
+                updated_order = order
+            else:
+                with metrics.span("update_order"):
+                    updated_order = await _resolve(self.repository.update_order(id=order.id, updates=updates))
 
-        self.repository.close()
+        await _resolve(self.repository.close())
 
         return updated_order
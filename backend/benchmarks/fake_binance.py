@@ -0,0 +1,385 @@
+"""
+Local Binance stand-in: the subset of the spot REST API ccxt uses for the bots, served from
+recorded or synthetic candles, with configurable latency, errors and rate limits.
+
+Endpoints (under /api/v3): ping, time, exchangeInfo, klines, ticker/24hr, ticker/price,
+order (POST new order, GET query, DELETE cancel). Private endpoints only check that an API key
+header is sent: the signature is not verified.
+
+The candles of each market are put on the real clock when the server starts: the candle covering
+"now" is candle `warmup` of the dataset, the ones before it are the history, and the next ones
+are revealed as time goes by (the last one stays current once the dataset is exhausted).
+Market orders fill at once at the current close (taker fee), limit orders crossing the
+current close fill at it, the others rest (NEW) until canceled.
+
+- latency_ms / jitter_ms: delay of every response (exponential jitter: a tail, like a real network)
+- error_rate: fraction of requests answered 503 / -1001 "Internal error"
+- weight_limit: request weight per minute before 429 / -1003, like Binance (6000 on spot)
+
+Point the bots (or the app) at it with BINANCE_API_URL (see BinanceAdapter):
+    python -m benchmarks.fake_binance --port 8900 --latency-ms 20 --error-rate 0.01
+    BINANCE_API_URL=http://127.0.0.1:8900 uvicorn app.main:app
+The load generator (benchmarks.load_test) starts one in-process.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from app.bots.scheduler import timeframe_seconds
+from app.infrastructure.adapters.candle_store import load_candles, to_milliseconds
+from benchmarks.synthetic import synthetic_candles
+
+# Request weights of the endpoints (Binance API docs), default 1
+WEIGHTS = {"exchangeInfo": 20, "klines": 2, "ticker/24hr": 2, "ticker/price": 2, "order": 1}
+WEIGHT_LIMIT = 6000  # per minute
+TAKER_FEE = MAKER_FEE = 0.001
+MAX_KLINES = 1000
+
+Market = Tuple[str, str]  # (Binance symbol "BTCUSDT", interval "1h")
+
+
+class FakeBinance:
+    """
+    markets: {("BTCUSDT", "1h"): candles} (timestamp / open / high / low / close / volume columns)
+    warmup: candles of history before the current one when the server starts
+    """
+
+    def __init__(self, markets: Dict[Market, pd.DataFrame], warmup: int = MAX_KLINES,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 weight_limit: Optional[int] = WEIGHT_LIMIT, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.weight_limit = weight_limit
+        self._random = random.Random(seed)
+
+        now = self.milliseconds()
+        self.markets: Dict[Market, Dict[str, np.ndarray]] = {}
+        for (symbol, interval), candles in markets.items():
+            interval_ms = timeframe_seconds(interval) * 1000
+            start = min(warmup, len(candles) - 1)
+            # Candles re-stamped on the clock: candle `start` is the one covering now
+            origin = now // interval_ms * interval_ms - start * interval_ms
+            self.markets[(symbol, interval)] = {
+                "timestamp": origin + np.arange(len(candles), dtype=np.int64) * interval_ms,
+                **{name: np.asarray(candles[name], dtype=np.float64)
+                   for name in ("open", "high", "low", "close", "volume")},
+            }
+        self.symbols = sorted({symbol for symbol, _ in self.markets})
+
+        self.orders: Dict[int, Dict] = {}
+        self._order_ids = itertools.count(1)
+        self._weights: Deque[Tuple[float, int]] = deque()  # (time, weight) of the last minute
+        self._used_weight = 0
+        self.requests = 0
+        self.rejected = 0  # errors injected + rate limited
+
+    @staticmethod
+    def milliseconds() -> int:
+        return int(time.time() * 1000)
+
+    # ---------------------------------------------------------------------
+    # Market data
+    # ---------------------------------------------------------------------
+    def _current(self, market: Market) -> int:
+        """Index of the candle covering now"""
+        timestamps = self.markets[market]["timestamp"]
+        return max(0, min(len(timestamps) - 1, int(np.searchsorted(timestamps, self.milliseconds(), side="right")) - 1))
+
+    def _market_of(self, symbol: str) -> Market:
+        """Smallest interval of the symbol: the freshest price"""
+        markets = [market for market in self.markets if market[0] == symbol]
+        if not markets:
+            raise BinanceError(400, -1121, "Invalid symbol.")
+        return min(markets, key=lambda market: timeframe_seconds(market[1]))
+
+    def price(self, symbol: str) -> float:
+        market = self._market_of(symbol)
+        return float(self.markets[market]["close"][self._current(market)])
+
+    def klines(self, symbol: str, interval: str, start_time: int = None, end_time: int = None,
+               limit: int = 500) -> list:
+        if (symbol, interval) not in self.markets:
+            raise BinanceError(400, -1121 if symbol not in self.symbols else -1120,
+                               "Invalid symbol." if symbol not in self.symbols else "Invalid interval.")
+        columns = self.markets[(symbol, interval)]
+        timestamps = columns["timestamp"]
+        interval_ms = int(timestamps[1] - timestamps[0]) if len(timestamps) > 1 else timeframe_seconds(interval) * 1000
+        last = self._current((symbol, interval)) + 1
+        if end_time is not None:
+            last = min(last, int(np.searchsorted(timestamps, end_time, side="right")))
+        limit = min(limit, MAX_KLINES)
+        if start_time is not None:
+            first = int(np.searchsorted(timestamps, start_time))
+            last = min(last, first + limit)
+        else:
+            first = max(0, last - limit)
+        return [
+            [int(timestamps[i]), repr(columns["open"][i]), repr(columns["high"][i]), repr(columns["low"][i]),
+             repr(columns["close"][i]), repr(columns["volume"][i]), int(timestamps[i]) + interval_ms - 1,
+             repr(columns["close"][i] * columns["volume"][i]), 1, "0", "0", "0"]
+            for i in range(first, last)
+        ]
+
+    def ticker(self, symbol: str) -> Dict:
+        market = self._market_of(symbol)
+        columns = self.markets[market]
+        i = self._current(market)
+        first = max(0, i - 24 * 3600 * 1000 // max(1, int(timeframe_seconds(market[1]) * 1000)) + 1)
+        last_price = columns["close"][i]
+        open_price = columns["open"][first]
+        return {
+            "symbol": symbol,
+            "priceChange": repr(last_price - open_price),
+            "priceChangePercent": repr((last_price / open_price - 1) * 100),
+            "weightedAvgPrice": repr(last_price),
+            "prevClosePrice": repr(columns["close"][i - 1] if i else open_price),
+            "lastPrice": repr(last_price),
+            "lastQty": "0",
+            "bidPrice": repr(last_price),
+            "bidQty": "1",
+            "askPrice": repr(last_price),
+            "askQty": "1",
+            "openPrice": repr(open_price),
+            "highPrice": repr(columns["high"][first:i + 1].max()),
+            "lowPrice": repr(columns["low"][first:i + 1].min()),
+            "volume": repr(columns["volume"][first:i + 1].sum()),
+            "quoteVolume": repr(float((columns["close"] * columns["volume"])[first:i + 1].sum())),
+            "openTime": int(columns["timestamp"][first]),
+            "closeTime": self.milliseconds(),
+            "firstId": 0,
+            "lastId": 0,
+            "count": i + 1 - first,
+        }
+
+    def exchange_info(self) -> Dict:
+        return {
+            "timezone": "UTC",
+            "serverTime": self.milliseconds(),
+            "rateLimits": [{"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1,
+                            "limit": self.weight_limit or WEIGHT_LIMIT}],
+            "exchangeFilters": [],
+            "symbols": [self._symbol_info(symbol) for symbol in self.symbols],
+        }
+
+    @staticmethod
+    def _symbol_info(symbol: str) -> Dict:
+        base, quote = (symbol[:-4], symbol[-4:]) if symbol.endswith(("USDT", "USDC")) else (symbol[:-3], symbol[-3:])
+        return {
+            "symbol": symbol,
+            "status": "TRADING",
+            "baseAsset": base,
+            "baseAssetPrecision": 8,
+            "quoteAsset": quote,
+            "quotePrecision": 8,
+            "quoteAssetPrecision": 8,
+            "baseCommissionPrecision": 8,
+            "quoteCommissionPrecision": 8,
+            "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT", "TAKE_PROFIT_LIMIT"],
+            "icebergAllowed": True,
+            "ocoAllowed": True,
+            "quoteOrderQtyMarketAllowed": True,
+            "isSpotTradingAllowed": True,
+            "isMarginTradingAllowed": False,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01000000", "maxPrice": "1000000.00000000",
+                 "tickSize": "0.01000000"},
+                {"filterType": "LOT_SIZE", "minQty": "0.00001000", "maxQty": "9000.00000000",
+                 "stepSize": "0.00001000"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00000000", "applyMinToMarket": True,
+                 "maxNotional": "9000000.00000000", "applyMaxToMarket": False, "avgPriceMins": 5},
+            ],
+            "permissions": [],
+            "permissionSets": [["SPOT"]],
+            "defaultSelfTradePreventionMode": "EXPIRE_MAKER",
+            "allowedSelfTradePreventionModes": ["EXPIRE_TAKER", "EXPIRE_MAKER", "EXPIRE_BOTH"],
+        }
+
+    # ---------------------------------------------------------------------
+    # Orders
+    # ---------------------------------------------------------------------
+    def new_order(self, params: Dict[str, str]) -> Dict:
+        symbol = params.get("symbol")
+        side, type_ = params.get("side"), params.get("type")
+        if side not in ("BUY", "SELL") or type_ not in ("MARKET", "LIMIT"):
+            raise BinanceError(400, -1102, "Mandatory parameter 'side' / 'type' was not sent, was empty/null, or malformed.")
+        price = self.price(symbol)
+        try:
+            quantity = float(params["quantity"]) if "quantity" in params else float(params["quoteOrderQty"]) / price
+            limit_price = float(params["price"]) if type_ == "LIMIT" else None
+        except (KeyError, ValueError):
+            raise BinanceError(400, -1102, "Mandatory parameter 'quantity' was not sent, was empty/null, or malformed.")
+        if quantity <= 0 or quantity * (limit_price or price) < 5.0:
+            raise BinanceError(400, -1013, "Filter failure: NOTIONAL")
+
+        now = self.milliseconds()
+        order = {
+            "symbol": symbol,
+            "orderId": next(self._order_ids),
+            "orderListId": -1,
+            "clientOrderId": params.get("newClientOrderId", f"fake{now}"),
+            "transactTime": now,
+            "price": repr(limit_price or 0.0),
+            "origQty": repr(quantity),
+            "executedQty": "0.0",
+            "cummulativeQuoteQty": "0.0",
+            "status": "NEW",
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "type": type_,
+            "side": side,
+            "workingTime": now,
+            "fills": [],
+        }
+        crossing = limit_price is not None and (limit_price >= price if side == "BUY" else limit_price <= price)
+        if type_ == "MARKET" or crossing:
+            quote, fee = price * quantity, price * quantity * TAKER_FEE
+            order.update(executedQty=repr(quantity), cummulativeQuoteQty=repr(quote), status="FILLED",
+                         fills=[{"price": repr(price), "qty": repr(quantity), "commission": repr(fee),
+                                 "commissionAsset": self._symbol_info(symbol)["quoteAsset"], "tradeId": order["orderId"]}])
+        self.orders[order["orderId"]] = order
+        return order
+
+    def get_order(self, params: Dict[str, str]) -> Dict:
+        try:
+            return self.orders[int(params["orderId"])]
+        except (KeyError, ValueError):
+            raise BinanceError(400, -2013, "Order does not exist.")
+
+    def cancel_order(self, params: Dict[str, str]) -> Dict:
+        order = self.get_order(params)
+        if order["status"] != "NEW":
+            raise BinanceError(400, -2011, "Unknown order sent.")
+        order["status"] = "CANCELED"
+        return order
+
+    # ---------------------------------------------------------------------
+    # HTTP
+    # ---------------------------------------------------------------------
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        routes = {
+            "ping": lambda request: {},
+            "time": lambda request: {"serverTime": self.milliseconds()},
+            "exchangeInfo": lambda request: self.exchange_info(),
+            "klines": lambda request: self.klines(
+                request.query.get("symbol"), request.query.get("interval"),
+                _int(request.query.get("startTime")), _int(request.query.get("endTime")),
+                _int(request.query.get("limit")) or 500),
+            "ticker/24hr": lambda request: self.ticker(request.query.get("symbol")),
+            "ticker/price": lambda request: {"symbol": request.query.get("symbol"),
+                                             "price": repr(self.price(request.query.get("symbol")))},
+        }
+        for path, handler in routes.items():
+            app.router.add_get(f"/api/v3/{path}", self._json(handler))
+        app.router.add_post("/api/v3/order", self._json(self.new_order, private=True))
+        app.router.add_get("/api/v3/order", self._json(self.get_order, private=True))
+        app.router.add_delete("/api/v3/order", self._json(self.cancel_order, private=True))
+        return app
+
+    def _json(self, handler, private: bool = False):
+        async def route(request: web.Request) -> web.Response:
+            if private:
+                if "X-MBX-APIKEY" not in request.headers:
+                    raise BinanceError(401, -2014, "API-key format invalid.")
+                params = {**request.query, **(await request.post())}
+                return web.json_response(handler(params))
+            return web.json_response(handler(request))
+        return route
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests += 1
+        delay = self.latency_ms + (self._random.expovariate(1 / self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        weight = WEIGHTS.get(request.path.split("/api/v3/", 1)[-1], 1)
+        used = self._use_weight(weight)
+        headers = {"X-MBX-USED-WEIGHT-1M": str(used)}
+        try:
+            if self.weight_limit is not None and used > self.weight_limit:
+                raise BinanceError(429, -1003, f"Too much request weight used; current limit is "
+                                               f"{self.weight_limit} request weight per 1 MINUTE.",
+                                   {"Retry-After": "60"})
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise BinanceError(503, -1001, "Internal error; unable to process your request. Please try again.")
+            response = await handler(request)
+        except BinanceError as e:
+            self.rejected += e.status in (429, 503)
+            return web.json_response({"code": e.code, "msg": e.msg}, status=e.status, headers={**headers, **e.headers})
+        response.headers.update(headers)
+        return response
+
+    def _use_weight(self, weight: int) -> int:
+        now = time.monotonic()
+        while self._weights and now - self._weights[0][0] >= 60:
+            self._used_weight -= self._weights.popleft()[1]
+        self._weights.append((now, weight))
+        self._used_weight += weight
+        return self._used_weight
+
+
+class BinanceError(Exception):
+    def __init__(self, status: int, code: int, msg: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(msg)
+        self.status = status
+        self.code = code
+        self.msg = msg
+        self.headers = headers or {}
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+async def start_server(fake: FakeBinance, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+    """Serve `fake` from the running event loop; port 0 picks a free one. Returns (runner, base URL)."""
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+def markets_from_args(csv_paths, symbol: str, interval: str, rows: int) -> Dict[Market, pd.DataFrame]:
+    """Recorded candles (Binance kline CSVs, concatenated in order) or synthetic ones"""
+    if csv_paths:
+        candles = pd.concat([load_candles(Path(path)) for path in csv_paths], ignore_index=True)
+        candles["timestamp"] = to_milliseconds(candles["timestamp"].to_numpy())
+    else:
+        candles = synthetic_candles(rows, timeframe=interval)
+    return {(symbol, interval): candles}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Binance REST stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--csv", nargs="*", help="Binance kline CSVs to serve (default: synthetic candles)")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1h")
+    parser.add_argument("--rows", type=int, default=20_000, help="Synthetic candles")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--weight-limit", type=int, default=WEIGHT_LIMIT, help="Request weight per minute (0: none)")
+    args = parser.parse_args(argv)
+
+    fake = FakeBinance(markets_from_args(args.csv, args.symbol, args.interval, args.rows),
+                       latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                       weight_limit=args.weight_limit or None)
+    web.run_app(fake.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Benchmark suite of the strategy, replay and order hot paths.
+
+Every case reports candles (or calls) per second, per-call latency percentiles and the
+peak memory allocated while it runs (tracemalloc, measured on a separate run so it
+doesn't slow the timed one). Results can be saved as a JSON baseline, and later runs
+compared to it: the run fails when a case got slower than the threshold allows.
+
+From backend/:
+    python -m benchmarks.suite                        # run and print
+    python -m benchmarks.suite --save                 # run and write benchmarks/baseline.json
+    python -m benchmarks.suite --check                # run and fail (exit 1) on regressions
+    python -m benchmarks.suite --cases get_history backtest --rows 5000
+
+Baselines are only comparable on the same machine: save them where --check runs.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.backtesting.sweep import build_grid, run_sweep
+from app.bots.base import BaseBot
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from app.infrastructure.adapters.simulated_exchange import SimulatedExchange
+from app.infrastructure.adapters.tick_replay_exchange import TickReplayExchange
+from app.models.bot import Bot
+from app.models.order import Base, Order
+from app.services.order_journal import OrderJournal
+from app.services.order_service import OrderService
+from benchmarks.synthetic import synthetic_candles, synthetic_trades
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.25  # 25% slower than the baseline = regression
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    candles_per_s: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    peak_memory_mb: float
+    calls: int
+
+
+@dataclass
+class Timings:
+    """Filled by a case: one latency per call, and the number of candles processed"""
+    latencies_ns: List[int]
+    candles: int
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))] / 1000
+
+
+# ---------------------------------------------------------------------------
+# Cases: async (rows) -> Timings
+# ---------------------------------------------------------------------------
+async def bench_calculate_indicators(rows: int) -> Timings:
+    strategy = MovingAverageCrossoverStrategy()
+    candles = synthetic_candles(rows)
+    window = strategy.history_limit()
+    latencies = []
+    # Same window as a live tick: the last history_limit() candles
+    for end in range(window, len(candles), max(1, (len(candles) - window) // 500)):
+        frame = candles.iloc[end - window:end].copy()
+        start = time.perf_counter_ns()
+        strategy.calculate_indicators(frame)
+        latencies.append(time.perf_counter_ns() - start)
+    return Timings(latencies, candles=len(latencies) * window)
+
+
+async def bench_get_history(rows: int) -> Timings:
+    exchange = HistoricalExchange(synthetic_candles(rows))
+    latencies = []
+    while exchange.tick():
+        start = time.perf_counter_ns()
+        await exchange.get_history("BTC/USDT", "1h", limit=250)
+        latencies.append(time.perf_counter_ns() - start)
+    return Timings(latencies, candles=rows)
+
+
+async def _replay(rows: int, indicator_mode: str) -> Timings:
+    exchange = HistoricalExchange(synthetic_candles(rows))
+    strategy = MovingAverageCrossoverStrategy(indicator_mode=indicator_mode)
+    latencies = []
+    while exchange.tick():
+        start = time.perf_counter_ns()
+        await strategy.generate_signals(exchange)
+        latencies.append(time.perf_counter_ns() - start)
+    return Timings(latencies, candles=rows)
+
+
+async def bench_generate_signals_pandas(rows: int) -> Timings:
+    return await _replay(rows, "pandas")
+
+
+async def bench_generate_signals_incremental(rows: int) -> Timings:
+    return await _replay(rows, "incremental")
+
+
+async def bench_generate_signals_shared(rows: int) -> Timings:
+    return await _replay(rows, "shared")
+
+
+async def bench_tick_replay(rows: int) -> Timings:
+    # rows trades (~200ms apart) replayed second by second as 1m candles
+    exchange = TickReplayExchange.from_trades(synthetic_trades(rows), timeframe="1m", step="1s")
+    strategy = MovingAverageCrossoverStrategy(timeframe="1m", indicator_mode="incremental")
+    latencies = []
+    while exchange.tick():
+        start = time.perf_counter_ns()
+        await strategy.generate_signals(exchange)
+        latencies.append(time.perf_counter_ns() - start)
+    return Timings(latencies, candles=rows)
+
+
+async def bench_backtest(rows: int) -> Timings:
+    candles = synthetic_candles(rows)
+    latencies = []
+    for _ in range(5):
+        start = time.perf_counter_ns()
+        MovingAverageCrossoverStrategy().backtest(candles)
+        latencies.append(time.perf_counter_ns() - start)
+    return Timings(latencies, candles=rows * 5)
+
+
+async def bench_sweep(rows: int) -> Timings:
+    candles = synthetic_candles(rows)
+    grid = build_grid(["1h"], [5, 9, 20], [21, 50, 100], [0.02], [0.04])
+    start = time.perf_counter_ns()
+    run_sweep({"synthetic": candles}, grid, processes=2)
+    return Timings([time.perf_counter_ns() - start], candles=rows * len(grid))
+
+
+async def bench_create_order(rows: int) -> Timings:
+    """OrderService.create_order + execute_order through the write-behind journal on SQLite"""
+    class Exchange:
+        async def place_market_buy(self, symbol, amount):
+            return {}
+
+        async def place_market_sell(self, symbol, amount):
+            return {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/orders.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as db:
+            db.add(Bot(id="bench", strategy="bench", params={}, status="R"))
+            await db.commit()
+
+        journal = OrderJournal(session_factory=factory, path=f"{tmp}/journal.jsonl")
+        await journal.start()
+        service = OrderService(exchange=Exchange(), journal=journal)
+
+        count = min(rows, 5000)
+        latencies = []
+        for i in range(count):
+            start = time.perf_counter_ns()
+            order = await service.create_order(Order(bot_id="bench", symbol="BTC/USDT", side="BUY" if i % 2 else "SELL",
+                                                     price=40000.0, amount=0.001, status="PENDING"))
+            await service.execute_order(order.id)
+            latencies.append(time.perf_counter_ns() - start)
+        await journal.close()
+        await engine.dispose()
+    return Timings(latencies, candles=count)
+
+
+async def bench_bot_tick_simulated(rows: int) -> Timings:
+    """BaseBot.tick end to end: strategy, OrderService through the journal on SQLite, simulated exchange fills"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/orders.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with factory() as db:
+            db.add(Bot(id="bench", strategy="bench", params={}, status="R"))
+            await db.commit()
+
+        journal = OrderJournal(session_factory=factory, path=f"{tmp}/journal.jsonl")
+        await journal.start()
+        exchange = SimulatedExchange(synthetic_candles(rows), balances={"USDT": 100_000.0}, latency_ms=150)
+        service = OrderService(exchange=exchange, journal=journal)
+        bot = BaseBot("bench", MovingAverageCrossoverStrategy(indicator_mode="incremental"), capital=10_000.0)
+
+        latencies = []
+        while exchange.tick():
+            start = time.perf_counter_ns()
+            await bot.tick(exchange, service)
+            latencies.append(time.perf_counter_ns() - start)
+        await journal.close()
+        await engine.dispose()
+    return Timings(latencies, candles=rows)
+
+
+CASES: Dict[str, Callable] = {
+    "calculate_indicators": bench_calculate_indicators,
+    "get_history": bench_get_history,
+    "generate_signals_pandas": bench_generate_signals_pandas,
+    "generate_signals_incremental": bench_generate_signals_incremental,
+    "generate_signals_shared": bench_generate_signals_shared,
+    "tick_replay": bench_tick_replay,
+    "backtest": bench_backtest,
+    "sweep": bench_sweep,
+    "create_order": bench_create_order,
+    "bot_tick_simulated": bench_bot_tick_simulated,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def run_case(name: str, rows: int) -> BenchmarkResult:
+    case = CASES[name]
+
+    # Peak memory on its own run: tracemalloc slows allocations down
+    tracemalloc.start()
+    asyncio.run(case(rows))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    timings = asyncio.run(case(rows))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(timings.latencies_ns)
+    timed = sum(latencies) / 1e9 or elapsed
+    return BenchmarkResult(
+        name=name,
+        candles_per_s=timings.candles / timed,
+        p50_us=statistics.median(latencies) / 1000 if latencies else 0.0,
+        p95_us=_percentile(latencies, 0.95),
+        p99_us=_percentile(latencies, 0.99),
+        peak_memory_mb=peak / 1024 / 1024,
+        calls=len(latencies),
+    )
+
+
+def run_suite(names: Optional[Sequence[str]] = None, rows: int = 20_000) -> List[BenchmarkResult]:
+    # One log line per trade / order is noise (and I/O) here
+    logging.disable(logging.INFO)
+    results = []
+    try:
+        for name in names or CASES:
+            try:
+                results.append(run_case(name, rows))
+            except ModuleNotFoundError as e:
+                # e.g. aiosqlite (dev requirement) for create_order
+                print(f"  {name} skipped: {e}")
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def load_baseline(path: Path) -> Dict[str, Dict]:
+    if not Path(path).exists():
+        return {}
+    return json.loads(Path(path).read_text())
+
+
+def save_baseline(results: List[BenchmarkResult], path: Path):
+    baseline = load_baseline(path)
+    baseline.update({result.name: asdict(result) for result in results})
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def find_regressions(results: List[BenchmarkResult], baseline: Dict[str, Dict],
+                     threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    A case regressed when its throughput dropped, or its median latency grew, by more than threshold.
+    (p99 is too noisy on a shared machine to fail a run on)
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if not reference:
+            continue
+        if result.candles_per_s < reference["candles_per_s"] * (1 - threshold):
+            regressions.append(f"{result.name}: {result.candles_per_s:,.0f} candles/s "
+                               f"(baseline {reference['candles_per_s']:,.0f})")
+        if reference["p50_us"] and result.p50_us > reference["p50_us"] * (1 + threshold):
+            regressions.append(f"{result.name}: p50 {result.p50_us:,.1f}µs (baseline {reference['p50_us']:,.1f}µs)")
+    return regressions
+
+
+def format_results(results: List[BenchmarkResult], baseline: Dict[str, Dict]) -> str:
+    lines = [
+        f"  {'Case':<30} {'Candles/s':>12} {'vs base':>8} {'p50':>10} {'p95':>10} {'p99':>10} {'Peak mem':>10}",
+        f"  {'-'*30} {'-'*12} {'-'*8} {'-'*10} {'-'*10} {'-'*10} {'-'*10}",
+    ]
+    for r in results:
+        reference = baseline.get(r.name)
+        change = f"{r.candles_per_s / reference['candles_per_s'] - 1:+.0%}" if reference else "-"
+        lines.append(
+            f"  {r.name:<30} {r.candles_per_s:>12,.0f} {change:>8} {r.p50_us:>8,.1f}µs {r.p95_us:>8,.1f}µs "
+            f"{r.p99_us:>8,.1f}µs {r.peak_memory_mb:>8,.1f}MB"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the strategy, replay and order hot paths")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    parser.add_argument("--rows", type=int, default=20_000, help="Synthetic candles per case")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a case regressed against the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results = run_suite(args.cases, args.rows)
+    print(format_results(results, baseline))
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if args.check:
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions (threshold {args.threshold:.0%}):")
+            print("\n".join(f"  {line}" for line in regressions))
+            return 1
+        print("\nNo regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Synthetic candles for benchmarks: no downloaded CSV needed.
+
+A geometric random walk with some volatility regimes, so the MA crossover strategy
+actually trades (crossovers, SL/TP hits) like on real BTC candles.
+"""
+import numpy as np
+import pandas as pd
+
+from app.bots.scheduler import timeframe_seconds
+
+# 2024-01-01 00:00 UTC
+DEFAULT_START_MS = 1_704_067_200_000
+
+
+def synthetic_candles(rows: int, timeframe: str = "1h", seed: int = 0, start_price: float = 40000.0,
+                      volatility: float = 0.006, start_ms: int = DEFAULT_START_MS) -> pd.DataFrame:
+    """OHLCV candles (timestamp in ms), same columns as the Binance kline files the strategies read"""
+    rng = np.random.default_rng(seed)
+
+    # Volatility switches regime every ~200 candles: trends and ranges alternate
+    regimes = rng.uniform(0.5, 2.0, size=rows // 200 + 1).repeat(200)[:rows]
+    returns = rng.normal(0.0, volatility, size=rows) * regimes
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+
+    wick = np.abs(rng.normal(0.0, volatility / 2, size=(2, rows))) * regimes
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+
+    return pd.DataFrame({
+        "timestamp": start_ms + np.arange(rows, dtype=np.int64) * timeframe_seconds(timeframe) * 1000,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": rng.gamma(2.0, 50.0, size=rows),
+    })
+
+
+def synthetic_trades(rows: int, seed: int = 0, start_price: float = 40000.0, volatility: float = 0.0002,
+                     mean_interval_ms: float = 200.0, start_ms: int = DEFAULT_START_MS) -> dict:
+    """Aggregated trades (TradeStore columns): a random walk of prices at random intervals"""
+    rng = np.random.default_rng(seed)
+    intervals = rng.exponential(mean_interval_ms, size=rows).astype(np.int64)
+    return {
+        "timestamp": start_ms + np.cumsum(intervals),
+        "price": start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, size=rows))),
+        "quantity": rng.gamma(1.0, 0.05, size=rows),
+    }
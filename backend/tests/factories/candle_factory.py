@@ -0,0 +1,36 @@
+# tests/factories/candle_factory.py
+from pathlib import Path
+
+import pandas as pd
+
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+BINANCE_KLINE_COLUMNS = [
+    "timestamp", "open", "high", "low", "close", "volume",
+    "close_time", "quote_volume", "trades", "taker_base", "taker_quote", "ignore",
+]
+
+
+def load_candles(filename: str) -> pd.DataFrame:
+    return pd.read_csv(DATA_DIR / filename, names=BINANCE_KLINE_COLUMNS)
+
+
+def chunks_of(candles: pd.DataFrame, size: int):
+    for start in range(0, len(candles), size):
+        yield candles.iloc[start:start + size]
+
+
+async def replay_signals(candles: pd.DataFrame, strategy):
+    exchange = HistoricalExchange(candles)
+    orders = []
+    while exchange.tick():
+        signal = await strategy.generate_signals(exchange)
+        if signal:
+            orders.append(signal)
+    return orders
+
+
+def as_tuples(orders):
+    return [(o.side, float(o.price), float(o.amount), o.stop_loss, o.take_profit) for o in orders]
@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.infrastructure.adapters.adapter_registry import AdapterRegistry
+from app.infrastructure.adapters.binance_stream_adapter import BINANCE_SANDBOX_STREAM_URL, BINANCE_STREAM_URL
+from app.infrastructure.adapters.ttl_cache import AsyncTTLCache
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_coalesces_concurrent_fetches_and_expires():
+    cache = AsyncTTLCache(ttl=0.05)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    assert await asyncio.gather(*(cache.get("k", fetch) for _ in range(10))) == [1] * 10
+    assert await cache.get("k", fetch) == 1
+
+    await asyncio.sleep(0.06)
+    assert await cache.get("k", fetch) == 2
+    assert cache.fetch_count == 2
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_one_adapter_and_its_caches():
+    registry = AdapterRegistry()
+    adapter = registry.get("key", "secret", sandbox=True)
+    try:
+        assert registry.get("key", "secret", sandbox=True) is adapter
+        assert registry.get("key", "secret", sandbox=False) is not adapter
+
+        adapter.client.fetch_ticker = AsyncMock(return_value={"last": 50000.0})
+        adapter.client.load_markets = AsyncMock(return_value={"BTC/USDT": {}})
+        adapter.client.amount_to_precision = lambda symbol, amount: amount
+        adapter.client.create_market_buy_order = AsyncMock(return_value={"id": "1"})
+
+        prices = await asyncio.gather(*(adapter.get_price("BTC/USDT") for _ in range(20)))
+        assert prices == [50000.0] * 20
+        adapter.client.fetch_ticker.assert_awaited_once_with("BTC/USDT")
+
+        # Markets are downloaded once, not before every order
+        for _ in range(5):
+            await adapter.place_market_buy("BTC/USDT", 0.001)
+        adapter.client.load_markets.assert_awaited_once_with(reload=True)
+    finally:
+        await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_registry_streams_the_market_data_of_the_network():
+    registry = AdapterRegistry()
+    try:
+        testnet = registry.stream("key", "secret", sandbox=True)
+        production = registry.stream("key", "secret", sandbox=False)
+
+        assert registry.stream("key", "secret", sandbox=True) is testnet
+        assert testnet.url == BINANCE_SANDBOX_STREAM_URL and production.url == BINANCE_STREAM_URL
+        # Older candles are backfilled through the shared REST adapter
+        assert testnet.rest is registry.get("key", "secret", sandbox=True)
+    finally:
+        await registry.close()
@@ -0,0 +1,149 @@
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from app.services.logging import AsyncLogHandler, BotLoggerAdapter, JsonFormatter
+
+
+class SlowStream(io.StringIO):
+    """A disk that takes its time, and counts the flushes"""
+
+    def __init__(self, delay=0.0, gate: threading.Event = None):
+        super().__init__()
+        self.delay = delay
+        self.gate = gate
+        self.flushes = 0
+
+    def write(self, text):
+        if self.gate is not None:
+            self.gate.wait()
+        time.sleep(self.delay)
+        return super().write(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def make_logger(handler: logging.Handler, name: str) -> BotLoggerAdapter:
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return BotLoggerAdapter(logger, extra={})
+
+
+def stream_handler(stream) -> logging.StreamHandler:
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_messages_with_quotes_and_tracebacks_are_valid_json():
+    stream = io.StringIO()
+    logger = make_logger(stream_handler(stream), "test_json_formatter")
+
+    logger.info('Order "BUY" rejected: {"code": -2010}', extra={"bot_id": "bot-1"})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Unexpected\nerror")
+
+    first, second = lines(stream)
+    assert first["message"] == 'Order "BUY" rejected: {"code": -2010}'
+    assert first["bot_id"] == "bot-1"
+    assert first["level"] == "INFO"
+    assert second["message"] == "Unexpected\nerror"
+    assert second["bot_id"] == "-"
+    assert "ValueError: boom" in second["exception"]
+
+
+def test_records_are_written_in_batches_by_the_writer_thread():
+    stream = SlowStream(delay=0.001)
+    handler = AsyncLogHandler([stream_handler(stream)], max_batch=100)
+    logger = make_logger(handler, "test_async_batches")
+
+    start = time.perf_counter()
+    for i in range(300):
+        logger.info("tick %s", i, extra={"bot_id": f"bot-{i % 3}"})
+    elapsed = time.perf_counter() - start
+    handler.flush()
+
+    # The caller never waited for the (slow) writes
+    assert elapsed < 0.3
+    written = lines(stream)
+    assert [entry["message"] for entry in written] == [f"tick {i}" for i in range(300)]
+    assert written[4]["bot_id"] == "bot-1"
+    # One flush per batch, not per record
+    assert stream.flushes <= 10
+    handler.close()
+
+
+def test_full_buffer_drops_info_records_and_reports_them():
+    gate = threading.Event()
+    stream = SlowStream(gate=gate)
+    handler = AsyncLogHandler([stream_handler(stream)], capacity=10, max_batch=5, overflow="drop")
+    logger = make_logger(handler, "test_async_drop")
+
+    logger.info("first")
+    time.sleep(0.3)  # the writer is now stuck writing "first"
+    for i in range(30):
+        logger.info("record %s", i)
+    assert handler.dropped == 20
+
+    gate.set()
+    handler.flush()
+    written = lines(stream)
+    assert [e["message"] for e in written if e["level"] == "INFO"] == ["first"] + [f"record {i}" for i in range(10)]
+    assert [e["message"] for e in written if e["level"] == "WARNING"] == [
+        "20 log records dropped: the log buffer was full"
+    ]
+    handler.close()
+
+
+def test_full_buffer_blocks_the_caller_with_backpressure():
+    gate = threading.Event()
+    stream = SlowStream(gate=gate)
+    handler = AsyncLogHandler([stream_handler(stream)], capacity=5, max_batch=5, overflow="block",
+                              block_timeout=5.0)
+    logger = make_logger(handler, "test_async_block")
+
+    logger.info("first")
+    time.sleep(0.3)
+    for i in range(5):
+        logger.info("record %s", i)
+
+    threading.Timer(0.2, gate.set).start()
+    start = time.perf_counter()
+    logger.info("waits for room")
+    assert time.perf_counter() - start >= 0.1
+
+    handler.flush()
+    assert handler.dropped == 0
+    assert lines(stream)[-1]["message"] == "waits for room"
+    handler.close()
+
+
+def test_close_writes_the_pending_records():
+    stream = SlowStream(delay=0.001)
+    handler = AsyncLogHandler([stream_handler(stream)], flush_interval=10)
+    logger = make_logger(handler, "test_async_close")
+    for i in range(50):
+        logger.warning("record %s", i)
+
+    handler.close()
+
+    assert len(lines(stream)) == 50
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AsyncLogHandler([], overflow="ignore")
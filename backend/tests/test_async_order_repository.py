@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.bot import Bot
+from app.models.order import Base
+from app.repositories.order_repository import AsyncOrderRepository
+from app.services.order_service import OrderService
+from tests.factories.order_factory import build_order
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Async engine on a throwaway SQLite file (same repository code as with asyncpg)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'orders.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Bot(id="async-bot", strategy="test-strategy", params={}, status="R"))
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+class _Exchange:
+    async def place_market_buy(self, symbol, amount):
+        return {"id": "1"}
+
+    async def place_market_sell(self, symbol, amount):
+        return {"id": "2"}
+
+
+@pytest.mark.asyncio
+async def test_create_get_and_update_order(session_factory):
+    repository = AsyncOrderRepository(session_factory=session_factory)
+
+    order = await repository.create_order(build_order(bot_id="async-bot", status="PENDING"))
+    assert order.id is not None
+
+    fetched = await repository.get_order_by_id(order.id)
+    assert fetched.side == "BUY"
+
+    updated = await repository.update_order(order.id, {"status": "EXECUTED", "not_a_column": 1})
+    assert updated.status == "EXECUTED"
+    assert [o.id for o in await repository.get_orders_by_bot_id("async-bot")] == [order.id]
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_order_raises(session_factory):
+    repository = AsyncOrderRepository(session_factory=session_factory)
+    with pytest.raises(ValueError):
+        await repository.get_order_by_id(uuid.uuid4())
+
+
+@pytest.mark.asyncio
+async def test_order_service_runs_concurrent_bots_on_async_repository(session_factory):
+    service = OrderService(exchange=_Exchange(), repository=AsyncOrderRepository(session_factory=session_factory))
+
+    async def bot(side):
+        order = await service.create_order(build_order(bot_id="async-bot", side=side, status="PENDING"))
+        return await service.execute_order(order.id)
+
+    executed = await asyncio.gather(*(bot("BUY" if i % 2 else "SELL") for i in range(10)))
+
+    assert all(order.status == "EXECUTED" for order in executed)
+    assert len(await service.repository.get_all_orders()) == 10
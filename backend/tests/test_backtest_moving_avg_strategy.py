@@ -23,9 +23,6 @@ async def run_backtest(candles: pd.DataFrame, strategy: MovingAverageCrossoverSt
     Returns the list of Order signals generated.
     If the backtest ends with an open position, it is closed at the last candle price.
     """
-    from app.models.order import Order
-    from datetime import datetime
-
     exchange = HistoricalExchange(candles)
     orders = []
 
@@ -34,7 +31,16 @@ async def run_backtest(candles: pd.DataFrame, strategy: MovingAverageCrossoverSt
         if signal:
             orders.append(signal)
 
-    # Close any open position at the final candle price so it is included in P&L
+    return close_open_position(orders, candles)
+
+
+def close_open_position(orders, candles: pd.DataFrame):
+    """
+    Close any open position at the final candle price so it is included in P&L
+    """
+    from app.models.order import Order
+    from datetime import datetime
+
     buys = [o for o in orders if o.side == "BUY"]
     sells = [o for o in orders if o.side == "SELL"]
     if len(buys) > len(sells):
@@ -172,3 +178,23 @@ async def test_backtest_1h_february_2026():
     assert len(buys) > 0
     for i in range(len(orders) - 1):
         assert orders[i].side != orders[i + 1].side
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename, params", [
+    ("BTCUSDT-1h-2024-03.csv", {}),
+    ("BTCUSDT-1h-2025-10.csv", {"short_window": 9, "long_window": 21, "stop_loss_pct": 0.01}),
+    ("BTCUSDT-1h-2026-02.csv", {"stop_loss_pct": 0.015, "take_profit_pct": 0.06}),
+    ("BTCUSDT-4h-2025-12.csv", {"timeframe": "4h", "short_window": 9, "long_window": 21}),
+])
+async def test_vectorized_backtest_matches_tick_replay(filename, params):
+    candles = load_candles(filename)
+
+    tick_orders = await run_backtest(candles, MovingAverageCrossoverStrategy(**params))
+    batch_orders = close_open_position(MovingAverageCrossoverStrategy(**params).backtest(candles), candles)
+
+    def as_tuples(orders):
+        return [(o.side, float(o.price), float(o.amount), o.stop_loss, o.take_profit) for o in orders]
+
+    assert len(tick_orders) > 0
+    assert as_tuples(batch_orders) == as_tuples(tick_orders)
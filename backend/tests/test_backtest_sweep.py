@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+
+from app.backtesting.datasets import load_year
+from app.backtesting.sweep import backtest_config, build_grid, run_sweep
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def test_build_grid_skips_short_windows_not_shorter_than_long():
+    grid = build_grid(["1h"], [9, 20, 50], [21, 50], [0.02], [0.04, 0.06])
+
+    # (9,21) (9,50) (20,21) (20,50) x 2 take profits, 50 is never shorter than the long window
+    assert len(grid) == 8
+    assert all(c["short_window"] < c["long_window"] for c in grid)
+
+
+def test_parallel_sweep_matches_sequential_backtests():
+    datasets = {}
+    timeframes = {}
+    for timeframe, year in [("1h", 2024), ("4h", 2025)]:
+        candles, _ = load_year(DATA_DIR, "BTCUSDT", timeframe, year)
+        datasets[f"{timeframe} {year}"] = candles
+        timeframes[f"{timeframe} {year}"] = timeframe
+
+    grid = build_grid(["1h", "4h"], [9, 20], [21, 50], [0.01, 0.02], [0.04])
+    results = run_sweep(datasets, grid, timeframes, processes=2)
+
+    expected_count = sum(1 for label in datasets for c in grid if c["timeframe"] == timeframes[label])
+    assert len(results) == expected_count
+    # Ranked best first
+    assert [r["pnl"] for r in results] == sorted((r["pnl"] for r in results), reverse=True)
+
+    for result in results:
+        config = next(c for c in grid if c["name"] == result["config"])
+        expected = backtest_config(datasets[result["dataset"]], config)
+        assert result["pnl"] == pytest.approx(expected["pnl"], abs=1e-9)
+        assert result["buys"] == expected["buys"]
+        assert result["sells"] == expected["sells"]
@@ -0,0 +1,50 @@
+from benchmarks.suite import (BenchmarkResult, find_regressions, load_baseline, run_suite,
+                              save_baseline)
+from benchmarks.synthetic import synthetic_candles
+
+
+def result(name="backtest", candles_per_s=1000.0, p50_us=100.0):
+    return BenchmarkResult(name=name, candles_per_s=candles_per_s, p50_us=p50_us, p95_us=p50_us,
+                           p99_us=p50_us, peak_memory_mb=1.0, calls=10)
+
+
+def test_synthetic_candles_are_deterministic_ohlcv():
+    candles = synthetic_candles(1000, timeframe="4h", seed=3)
+
+    assert candles.equals(synthetic_candles(1000, timeframe="4h", seed=3))
+    assert (candles["high"] >= candles[["open", "close"]].max(axis=1)).all()
+    assert (candles["low"] <= candles[["open", "close"]].min(axis=1)).all()
+    assert (candles["timestamp"].diff().dropna() == 4 * 3600 * 1000).all()
+
+
+def test_suite_runs_the_selected_cases():
+    results = run_suite(["get_history", "backtest"], rows=500)
+
+    assert [r.name for r in results] == ["get_history", "backtest"]
+    for r in results:
+        assert r.candles_per_s > 0
+        assert 0 < r.p50_us <= r.p95_us <= r.p99_us
+        assert r.peak_memory_mb > 0
+    assert results[0].calls == 500
+
+
+def test_baseline_round_trip_keeps_other_cases(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline([result("backtest"), result("sweep")], path)
+    save_baseline([result("backtest", candles_per_s=2000.0)], path)
+
+    baseline = load_baseline(path)
+    assert baseline["backtest"]["candles_per_s"] == 2000.0
+    assert baseline["sweep"]["candles_per_s"] == 1000.0
+    assert load_baseline(tmp_path / "missing.json") == {}
+
+
+def test_regressions_over_the_threshold_are_reported():
+    baseline = {"backtest": {"candles_per_s": 1000.0, "p50_us": 100.0}}
+
+    assert find_regressions([result(candles_per_s=800.0, p50_us=120.0)], baseline, threshold=0.25) == []
+    assert find_regressions([result("unknown", candles_per_s=1.0)], baseline) == []
+
+    regressions = find_regressions([result(candles_per_s=700.0, p50_us=130.0)], baseline, threshold=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("backtest: 700 candles/s")
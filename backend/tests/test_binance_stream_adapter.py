@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from app.bots.base import BaseBot, BotStatus
+from app.infrastructure.adapters.binance_stream_adapter import BinanceStreamAdapter
+
+HOUR_MS = 3600 * 1000
+
+
+def kline_message(open_time: int, close: float, closed: bool, symbol="BTCUSDT", interval="1h"):
+    return json.dumps({
+        "stream": f"{symbol.lower()}@kline_{interval}",
+        "data": {
+            "e": "kline", "E": open_time, "s": symbol,
+            "k": {
+                "t": open_time, "T": open_time + HOUR_MS - 1, "s": symbol, "i": interval,
+                "o": str(close), "h": str(close + 10), "l": str(close - 10), "c": str(close),
+                "v": "1.5", "x": closed,
+            },
+        },
+    })
+
+
+class FakeBinanceStreamServer:
+    """Local WebSocket server: acknowledges SUBSCRIBE, then pushes whatever the test queues"""
+
+    def __init__(self):
+        self.subscriptions = []
+        self.outgoing = asyncio.Queue()
+        self.subscribed = asyncio.Event()
+        self.ws = None
+
+    async def handler(self, ws, *args):
+        self.ws = ws
+        async def push():
+            while True:
+                await ws.send(await self.outgoing.get())
+
+        pusher = asyncio.create_task(push())
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                self.subscriptions.extend(request["params"])
+                await ws.send(json.dumps({"result": None, "id": request["id"]}))
+                self.subscribed.set()
+        finally:
+            pusher.cancel()
+
+
+@pytest_asyncio.fixture
+async def stream_server():
+    server = FakeBinanceStreamServer()
+    async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        server.url = f"ws://127.0.0.1:{port}"
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_streamed_klines_build_the_candle_buffer(stream_server):
+    adapter = BinanceStreamAdapter(url=stream_server.url)
+    try:
+        await adapter.subscribe("BTC/USDT", "1h")
+        await asyncio.wait_for(stream_server.subscribed.wait(), 5)
+        assert set(stream_server.subscriptions) == {"btcusdt@kline_1h", "btcusdt@miniTicker"}
+
+        await stream_server.outgoing.put(kline_message(0, 100.0, closed=False))
+        await stream_server.outgoing.put(kline_message(0, 101.0, closed=True))
+        await stream_server.outgoing.put(kline_message(HOUR_MS, 102.0, closed=False))
+
+        closed = await adapter.wait_for_candle_close("BTC/USDT", "1h", timeout=5)
+        assert closed
+        await asyncio.sleep(0.05)
+
+        history = await adapter.get_history("BTC/USDT", "1h", limit=10)
+        # The forming candle update replaced it, the next open time started a new one
+        assert history["close"].tolist() == [101.0, 102.0]
+        assert await adapter.get_price("BTC/USDT") == 102.0
+    finally:
+        await adapter.close()
+
+
+class FakeRest:
+    """REST side of the exchange: the closed candles, whatever the stream delivered"""
+
+    def __init__(self, closes):
+        self.ohlcv = [[i * HOUR_MS, close, close + 10, close - 10, close, 1.5] for i, close in enumerate(closes)]
+        self.calls = []
+
+    def parse_timeframe(self, timeframe):
+        return 3600
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((since, limit))
+        return [candle for candle in self.ohlcv if candle[0] >= since][:limit]
+
+
+@pytest.mark.asyncio
+async def test_candles_missed_while_disconnected_are_fetched_after_the_reconnect(stream_server):
+    rest = FakeRest([101.0, 110.0, 120.0])
+    adapter = BinanceStreamAdapter(rest=rest, url=stream_server.url)
+    try:
+        await adapter.subscribe("BTC/USDT", "1h")
+        await asyncio.wait_for(stream_server.subscribed.wait(), 5)
+        await stream_server.outgoing.put(kline_message(0, 100.0, closed=False))
+        await asyncio.sleep(0.05)
+
+        # Disconnected while the first candle was forming, back two candles later
+        stream_server.subscribed.clear()
+        await stream_server.ws.close()
+        await asyncio.wait_for(stream_server.subscribed.wait(), 5)
+        await stream_server.outgoing.put(kline_message(3 * HOUR_MS, 130.0, closed=False))
+        await asyncio.sleep(0.05)
+
+        history = await adapter.get_history("BTC/USDT", "1h", limit=4)
+        assert rest.calls == [(0, 3)]
+        # The stale forming candle got its final values, the missed ones are back
+        assert history["close"].tolist() == [101.0, 110.0, 120.0, 130.0]
+    finally:
+        await adapter.close()
+
+
+@pytest.mark.asyncio
+async def test_wait_for_candle_close_times_out_without_close(stream_server):
+    adapter = BinanceStreamAdapter(url=stream_server.url)
+    try:
+        assert not await adapter.wait_for_candle_close("BTC/USDT", "1h", timeout=0.1)
+    finally:
+        await adapter.close()
+
+
+@pytest.mark.asyncio
+async def test_bot_ticks_on_candle_close(stream_server):
+    adapter = BinanceStreamAdapter(url=stream_server.url)
+    ticks = []
+
+    class Strategy:
+        symbol = "BTC/USDT"
+        timeframe = "1h"
+
+        async def generate_signals(self, exchange, capital):
+            ticks.append(len(await exchange.get_history(self.symbol, self.timeframe, limit=10)))
+            return None
+
+    # One hour check interval: only a candle close can wake the bot up in time
+    bot = BaseBot(bot_id="stream-bot", strategy=Strategy(), check_interval=3600)
+    bot.status = BotStatus.RUNNING
+    try:
+        bot._task = asyncio.create_task(bot.run(adapter))
+        await asyncio.wait_for(stream_server.subscribed.wait(), 5)
+        await stream_server.outgoing.put(kline_message(0, 100.0, closed=True))
+
+        for _ in range(100):
+            if len(ticks) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert ticks == [0, 1]
+    finally:
+        await bot.stop()
+        await adapter.close()
@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.queries.bots import get_bot_logs
+from app.bots.base import BaseBot
+from app.models.bot import Bot
+from app.models.bot_log import BotLog
+from app.models.order import Base
+from app.repositories.bot_log_repository import AsyncBotLogRepository
+from app.services.bot_log_sink import BotLogSink
+from app.services.logging import BotLoggerAdapter
+
+pytest.importorskip("aiosqlite")
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'logs.db'}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def enforce_foreign_keys(connection, _):
+        # Like PostgreSQL: a log of an unknown bot is rejected
+        connection.execute("PRAGMA foreign_keys=ON")
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add_all([Bot(id=bot_id, strategy="test-strategy", params={}, status="R") for bot_id in ("bot-1", "bot-2")])
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("test_bot_log_sink")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield BotLoggerAdapter(logger, extra={})
+    logger.handlers.clear()
+
+
+async def seed(factory, count=25):
+    rows = [{"bot_id": "bot-1", "level": "ERROR" if i % 5 == 0 else "INFO", "message": f"log {i}",
+             "created_at": T0 + timedelta(minutes=i)} for i in range(count)]
+    await AsyncBotLogRepository(session_factory=factory).insert_logs(rows)
+
+
+@pytest.mark.asyncio
+async def test_bot_records_are_written_in_batches(session_factory, logger):
+    sink = BotLogSink(session_factory=session_factory, flush_interval=10)
+    logger.logger.addHandler(sink)
+    await sink.start()
+
+    for i in range(10):
+        logger.info("tick %s", i, extra={"bot_id": "bot-1"})
+    logger.info("not a bot record")
+    logger.warning("unknown bot", extra={"bot_id": "deleted-bot"})
+    logger.error("order failed", extra={"bot_id": "bot-2"})
+    assert sink.pending == 12
+
+    await sink.close()
+
+    # The batch with the unknown bot is split per bot: only its rows are lost
+    assert sink.written == 11
+    assert sink.dropped == 1
+    logs = await AsyncBotLogRepository(session_factory=session_factory).get_logs("bot-1")
+    assert [log.message for log in logs] == [f"tick {i}" for i in reversed(range(10))]
+    errors = await AsyncBotLogRepository(session_factory=session_factory).get_logs("bot-2", level="error")
+    assert [(log.level, log.message) for log in errors] == [("ERROR", "order failed")]
+
+
+class _FailingAfter:
+    """Session factory of a DB that goes down after `sessions` sessions"""
+
+    def __init__(self, session_factory, sessions: int):
+        self.session_factory = session_factory
+        self.sessions = sessions
+
+    def __call__(self):
+        self.sessions -= 1
+        if self.sessions < 0:
+            raise ConnectionError("database unavailable")
+        return self.session_factory()
+
+
+@pytest.mark.asyncio
+async def test_db_failing_while_splitting_a_rejected_batch_keeps_the_rest(session_factory, logger):
+    sink = BotLogSink(session_factory=session_factory)
+    logger.logger.addHandler(sink)
+    for i in range(3):
+        logger.info("tick %s", i, extra={"bot_id": "bot-1"})
+    logger.warning("unknown bot", extra={"bot_id": "deleted-bot"})
+    logger.error("order failed", extra={"bot_id": "bot-2"})
+    logger.info("retrying", extra={"bot_id": "bot-2"})
+
+    # Batch rejected (unknown bot), then the DB goes down after the logs of bot-1 written alone
+    sink.repository._session_factory = _FailingAfter(session_factory, sessions=2)
+    with pytest.raises(ConnectionError):
+        await sink.flush()
+    assert sink.written == 3
+    assert [row["message"] for row in sink._rows] == ["unknown bot", "order failed", "retrying"]
+
+    sink.repository._session_factory = session_factory
+    assert await sink.flush() == 2
+    assert (sink.written, sink.dropped) == (5, 1)
+    logs = await AsyncBotLogRepository(session_factory=session_factory).get_logs("bot-2")
+    assert [log.message for log in logs] == ["retrying", "order failed"]
+
+
+@pytest.mark.asyncio
+async def test_logs_inside_a_tick_are_attributed_to_the_bot(session_factory, logger):
+    class LoggingStrategy:
+        async def generate_signals(self, exchange, capital):
+            logger.info("BUY signal skipped")  # strategies don't know their bot
+            return None
+
+    sink = BotLogSink(session_factory=session_factory)
+    logger.logger.addHandler(sink)
+    await BaseBot("bot-2", LoggingStrategy()).tick(None, None)
+    await sink.flush()
+
+    logs = await AsyncBotLogRepository(session_factory=session_factory).get_logs("bot-2")
+    assert [log.message for log in logs] == ["BUY signal skipped"]
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_each_other_within_the_time_range(session_factory):
+    await seed(session_factory)
+    async with session_factory() as db:
+        start, end = T0 + timedelta(minutes=3), T0 + timedelta(minutes=20)
+        messages = []
+        cursor = None
+        while True:
+            page = await get_bot_logs("bot-1", start=start, end=end, level=None, limit=5, cursor=cursor, db=db)
+            messages += [log.message for log in page.logs]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert messages == [f"log {i}" for i in range(19, 2, -1)]
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_a_bad_request(session_factory):
+    async with session_factory() as db:
+        with pytest.raises(HTTPException) as error:
+            await get_bot_logs("bot-1", start=None, end=None, level=None, limit=5, cursor="yesterday", db=db)
+    assert error.value.status_code == 400
+
+
+def test_logs_are_indexed_by_bot_and_time():
+    indexes = {index.name: [column.name for column in index.columns] for index in BotLog.__table__.indexes}
+    assert indexes["ix_bot_logs_bot_id_created_at"] == ["bot_id", "created_at"]
@@ -0,0 +1,103 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from unittest.mock import AsyncMock, MagicMock
+
+from app.bots.bot_manager import BotManager
+from app.bots.strategies.base import BUY, HOLD
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.models.bot import Bot
+from app.models.bot_state import BotState
+from app.models.order import Base
+from app.services.bot_state_store import BotStateStore
+
+pytest.importorskip("aiosqlite")
+
+OPEN_POSITION = {"is_position_open": True, "entry_price": 40000.0, "position_size": 0.00025,
+                 "stop_loss": 39200.0, "take_profit": 41600.0, "last_signal": "BUY"}
+
+
+def params(**kwargs):
+    return MovingAverageCrossoverStrategy(**kwargs).model_dump()
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bots.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add_all([
+            Bot(id="btc-open", strategy="MovingAverageCrossoverStrategy", params=params(), status="R"),
+            Bot(id="btc-flat", strategy="MovingAverageCrossoverStrategy", params=params(long_window=100), status="R"),
+            Bot(id="eth", strategy="MovingAverageCrossoverStrategy",
+                params=params(symbol="ETH/USDT", timeframe="4h"), status="R"),
+            Bot(id="stopped", strategy="MovingAverageCrossoverStrategy", params=params(), status="S"),
+            Bot(id="unknown", strategy="MACDStrategy", params={}, status="R"),
+        ])
+        await db.flush()
+        db.add(BotState(bot_id="btc-open", state=OPEN_POSITION))
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+def make_manager(session_factory):
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    store = BotStateStore(session_factory=session_factory)
+    return BotManager(exchange, order_service=None, state_store=store, session_factory=session_factory)
+
+
+@pytest.mark.asyncio
+async def test_running_bots_are_restored_with_their_open_position(session_factory):
+    manager = make_manager(session_factory)
+
+    restored = await manager.restore_running_bots()
+    await manager.scheduler.shutdown()
+
+    assert restored == ["btc-flat", "btc-open", "eth"]
+    strategy = manager._get_bot("btc-open").strategy
+    # A snapshot without the intrabar exit marker: the exits are checked from the current candle
+    assert strategy.snapshot_state() == {**OPEN_POSITION, "exit_checked_timestamp": None}
+    assert strategy._stop_loss == 39200.0
+    assert manager._get_bot("btc-flat").strategy._is_position_open is False
+    assert manager.scheduler.markets() == {("BTC/USDT", "1h"): 2, ("ETH/USDT", "4h"): 1}
+
+    # One fetch per market, sized for its most demanding bot
+    fetched = sorted((call.args, call.kwargs["limit"]) for call in manager.exchange.get_history.await_args_list)
+    assert fetched == [(("BTC/USDT", "1h"), 500), (("ETH/USDT", "4h"), 250)]
+
+    # The restored snapshot is not written back
+    assert manager.state_store.record(manager._get_bot("btc-open")) is False
+
+
+@pytest.mark.asyncio
+async def test_changed_states_are_upserted_and_survive_a_restart(session_factory):
+    manager = make_manager(session_factory)
+    await manager.restore_running_bots()
+    await manager.scheduler.shutdown()
+
+    # btc-open hits its take profit, btc-flat opens a position
+    closed = manager._get_bot("btc-open")
+    closed.strategy._evaluate_candle(42000.0, HOLD, capital=1000)
+    opened = manager._get_bot("btc-flat")
+    opened.strategy._evaluate_candle(50000.0, BUY, capital=1000)
+    unchanged = manager._get_bot("eth")
+    store = manager.state_store
+    assert [store.record(bot) for bot in (closed, opened, unchanged)] == [True, True, False]
+    assert await store.flush() == 2
+    assert store.record(opened) is False
+
+    restarted = make_manager(session_factory)
+    await restarted.restore_running_bots()
+    await restarted.scheduler.shutdown()
+
+    assert restarted._get_bot("btc-open").strategy._is_position_open is False
+    flat = restarted._get_bot("btc-flat").strategy
+    assert flat._is_position_open is True
+    assert flat._entry_price == 50000.0
+    assert flat._take_profit == pytest.approx(52000.0)
@@ -0,0 +1,202 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.bots.base import BaseBot, BotStatus
+from app.bots.scheduler import BotScheduler, seconds_until_next_close, timeframe_seconds
+from app.bots.strategies.base import BUY
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from app.infrastructure.adapters.market_data_provider_interface import MarketDataProviderInterface
+
+
+class SlowStrategy:
+    """Records the ticks, each one taking a little while"""
+
+    def __init__(self, symbol="BTC/USDT", timeframe="1h", long_window=50):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.long_window = long_window
+        self.calls = 0
+
+    async def generate_signals(self, exchange, capital):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return None
+
+
+def make_bot(bot_id, **kwargs) -> BaseBot:
+    bot = BaseBot(bot_id=bot_id, strategy=SlowStrategy(**kwargs))
+    bot.status = BotStatus.RUNNING
+    return bot
+
+
+def test_next_candle_close():
+    assert timeframe_seconds("15m") == 900
+    assert timeframe_seconds("4h") == 14400
+    # 10:20 -> 1h candle closes at 11:00, 4h candle at 12:00
+    now = 10 * 3600 + 20 * 60
+    assert seconds_until_next_close("1h", now) == 40 * 60
+    assert seconds_until_next_close("4h", now) == 3600 + 40 * 60
+
+
+def test_weeks_close_on_monday_and_months_on_the_calendar():
+    def at(*args):
+        return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+    # Wednesday 2024-02-14 12:00 -> Monday 2024-02-19
+    assert seconds_until_next_close("1w", at(2024, 2, 14, 12)) == at(2024, 2, 19) - at(2024, 2, 14, 12)
+    assert seconds_until_next_close("1w", at(2024, 2, 19)) == 7 * 86400
+    # February 2024 has 29 days, December rolls over the year
+    assert seconds_until_next_close("1M", at(2024, 2, 10)) == at(2024, 3, 1) - at(2024, 2, 10)
+    assert seconds_until_next_close("1M", at(2024, 12, 31, 23)) == 3600
+    assert seconds_until_next_close("3M", at(2024, 2, 10)) == at(2024, 4, 1) - at(2024, 2, 10)
+    assert timeframe_seconds("1M") == 30 * 86400
+
+
+@pytest.mark.asyncio
+async def test_market_is_fetched_once_for_all_its_bots():
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    scheduler = BotScheduler(exchange, order_service=None)
+    bots = [make_bot(f"bot-{i}", long_window=21 + i) for i in range(10)]
+    for bot in bots:
+        scheduler._groups.setdefault(("BTC/USDT", "1h"), {})[bot.bot_id] = bot
+
+    await scheduler.tick_market(("BTC/USDT", "1h"))
+
+    # Sized for the most demanding bot of the group
+    exchange.get_history.assert_awaited_once_with("BTC/USDT", "1h", limit=30 * 5)
+    assert all(bot.strategy.calls == 1 for bot in bots)
+
+
+@pytest.mark.asyncio
+async def test_ticks_are_bounded_by_max_concurrency():
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    scheduler = BotScheduler(exchange, order_service=None, max_concurrency=3)
+
+    running = 0
+    peak = 0
+
+    async def tick(exchange, order_service):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    bots = [make_bot(f"bot-{i}") for i in range(12)]
+    for bot in bots:
+        bot.tick = tick
+        scheduler._groups.setdefault(("BTC/USDT", "1h"), {})[bot.bot_id] = bot
+
+    await scheduler.tick_market(("BTC/USDT", "1h"))
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_bots_are_grouped_by_market_and_ticked_on_candle_close():
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    scheduler = BotScheduler(exchange, order_service=None)
+
+    async def candle_close(symbol, timeframe):
+        await asyncio.sleep(0.01)
+
+    scheduler._wait_candle_close = candle_close
+
+    scheduler.add(make_bot("btc-1"))
+    scheduler.add(make_bot("btc-2"))
+    scheduler.add(make_bot("eth-1", symbol="ETH/USDT", timeframe="4h"))
+    assert scheduler.markets() == {("BTC/USDT", "1h"): 2, ("ETH/USDT", "4h"): 1}
+
+    await asyncio.sleep(0.05)
+    scheduler.remove("btc-1")
+    scheduler.remove("btc-2")
+    scheduler.remove("eth-1")
+    await asyncio.sleep(0.05)
+
+    assert exchange.get_history.await_count >= 2
+    assert scheduler.markets() == {}
+    await scheduler.shutdown()
+
+
+class PushedCandles(MarketDataProviderInterface):
+    """Streamed market data: a candle of every market closes every 10ms"""
+
+    pushes_candle_closes = True
+
+    def __init__(self):
+        self.waits = 0
+
+    async def wait_for_candle_close(self, symbol, timeframe, timeout=None):
+        self.waits += 1
+        await asyncio.sleep(0.01)
+        return True
+
+    async def get_history(self, symbol, timeframe, limit=None):
+        return pd.DataFrame()
+
+    async def get_price(self, symbol):
+        return None
+
+    def tick(self):
+        return True
+
+
+@pytest.mark.asyncio
+async def test_streamed_market_data_ticks_on_the_pushed_candle_closes():
+    exchange = PushedCandles()
+    scheduler = BotScheduler(exchange, order_service=None)
+    bot = make_bot("btc-1")
+    scheduler.add(bot)
+
+    # A 1h market: polled, the first tick would wait for the next hour
+    await asyncio.sleep(0.1)
+    await scheduler.shutdown()
+
+    assert exchange.waits >= 2
+    assert bot.strategy.calls >= 2
+
+
+@pytest.mark.asyncio
+async def test_open_positions_check_their_exits_between_candle_closes(monkeypatch):
+    # Opened at 100 (SL 98): the candle still forming trades at 97
+    candles = pd.DataFrame({"timestamp": [1, 2], "open": [100.0, 100.0], "high": [100.0, 100.0],
+                            "low": [100.0, 97.0], "close": [100.0, 97.0], "volume": [1.0, 1.0]})
+    exchange = HistoricalExchange(candles)
+    exchange.tick()
+    exchange.tick()
+    order_service = MagicMock()
+    order_service.create_order = AsyncMock(side_effect=lambda order: order)
+    order_service.execute_order = AsyncMock(return_value=None)
+    scheduler = BotScheduler(exchange, order_service=order_service, close_delay=0, max_jitter=0)
+
+    holding = BaseBot("holding", MovingAverageCrossoverStrategy(short_window=1, long_window=2), check_interval=0.01)
+    holding.strategy._evaluate_candle(100.0, BUY, capital=1000)
+    flat = BaseBot("flat", MovingAverageCrossoverStrategy(short_window=1, long_window=2), check_interval=0.01)
+    for bot in (holding, flat):
+        bot.status = BotStatus.RUNNING
+        scheduler._groups.setdefault(("BTC/USDT", "1h"), {})[bot.bot_id] = bot
+    checked = []
+    check_exit = MovingAverageCrossoverStrategy.check_exit
+
+    async def counting_check_exit(strategy, market_data):
+        checked.append(strategy)
+        return await check_exit(strategy, market_data)
+
+    monkeypatch.setattr(MovingAverageCrossoverStrategy, "check_exit", counting_check_exit)
+    monkeypatch.setattr("app.bots.scheduler.seconds_until_next_close", lambda timeframe, now: 0.05)
+
+    await scheduler._wait_candle_close("BTC/USDT", "1h")
+
+    # Sold on the first check, then nothing left to check until the close
+    assert checked == [holding.strategy]
+    assert holding.strategy._is_position_open is False
+    sold = order_service.create_order.await_args.args[0]
+    assert (sold.bot_id, sold.side, sold.price) == ("holding", "SELL", 97.0)
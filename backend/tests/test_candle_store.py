@@ -0,0 +1,114 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtesting.datasets import load_year
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters import candle_store
+from app.infrastructure.adapters.candle_store import CandleStore, load_candles
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandleStore(tmp_path / "candles")
+    store.ingest_directory(DATA_DIR)
+    return store
+
+
+def test_ingest_indexes_months_by_symbol_and_timeframe(store):
+    assert store.months("BTCUSDT", "1h") == [(2024, 3), (2025, 10), (2026, 2)]
+    assert store.months("BTCUSDT", "4h") == [(2025, 9), (2025, 12)]
+    assert store.months("ETHUSDT", "1h") == []
+
+
+def test_month_is_memory_mapped_with_typed_columns(store):
+    columns = store.load_month("BTCUSDT", "1h", 2025, 10)
+    csv = load_candles(DATA_DIR / "BTCUSDT-1h-2025-10.csv")
+
+    assert isinstance(columns["close"], np.memmap)
+    assert columns["timestamp"].dtype == np.int64
+    assert columns["close"].dtype == np.float64
+    np.testing.assert_array_equal(columns["close"], csv["close"].to_numpy())
+    # 2025 files are in µs, the store keeps ms
+    np.testing.assert_array_equal(columns["timestamp"], csv["timestamp"].to_numpy() // 1000)
+
+
+def test_month_being_re_ingested_is_read_once_in_place(store):
+    month_dir = store._month_dir("BTCUSDT", "1h", 2024, 3)
+    candles = load_candles(DATA_DIR / "BTCUSDT-1h-2024-03.csv")
+
+    # Between the two renames of the swap: only the previous version is there
+    month_dir.rename(month_dir.with_name("2024-03.old"))
+    assert store.months("BTCUSDT", "1h") == [(2024, 3), (2025, 10), (2026, 2)]
+    swap = threading.Timer(0.05, store.ingest_frame, args=(candles.iloc[:100], "BTCUSDT", "1h", 2024, 3))
+    swap.start()
+    columns = store.load_month("BTCUSDT", "1h", 2024, 3)
+    swap.join()
+
+    assert len(columns["close"]) == 100
+    assert not month_dir.with_name("2024-03.old").exists()
+
+
+def test_month_swapped_while_loading_is_read_again(store, monkeypatch):
+    candles = load_candles(DATA_DIR / "BTCUSDT-1h-2024-03.csv")
+    np_load = np.load
+    swapped = []
+
+    def load(path, **kwargs):
+        # Re-ingested right after the first column file of the month was opened
+        columns = np_load(path, **kwargs)
+        if not swapped:
+            swapped.append(path)
+            store.ingest_frame(candles.iloc[:100], "BTCUSDT", "1h", 2024, 3)
+        return columns
+
+    monkeypatch.setattr(candle_store.np, "load", load)
+    columns = store.load_month("BTCUSDT", "1h", 2024, 3)
+
+    assert swapped
+    assert {len(values) for values in columns.values()} == {100}
+
+
+def test_load_time_range_across_months(store):
+    columns = store.load("BTCUSDT", "4h", start="2025-09-30", end="2025-12-02")
+
+    timestamps = pd.to_datetime(columns["timestamp"], unit="ms")
+    assert timestamps[0] == pd.Timestamp("2025-09-30 00:00")
+    assert timestamps[-1] == pd.Timestamp("2025-12-01 20:00")
+    assert len(columns["close"]) == 6 + 6  # last day of September + first day of December
+
+
+def test_load_year_from_store_gives_the_same_backtest(store):
+    csv_candles, csv_months = load_year(DATA_DIR, "BTCUSDT", "1h", 2024)
+    store_candles, store_months = load_year(DATA_DIR, "BTCUSDT", "1h", 2024, store=store)
+
+    assert store_months == csv_months
+    csv_orders = MovingAverageCrossoverStrategy().backtest(csv_candles)
+    store_orders = MovingAverageCrossoverStrategy().backtest(store_candles)
+    assert [(o.side, o.price) for o in store_orders] == [(o.side, o.price) for o in csv_orders]
+
+
+@pytest.mark.asyncio
+async def test_historical_exchange_from_store(store):
+    exchange = store.historical_exchange("BTCUSDT", "1h", start="2024-03-10", end="2024-03-11")
+
+    assert exchange.length == 24
+    exchange.tick()
+    assert exchange.get_price("BTCUSDT") == float(store.load_month("BTCUSDT", "1h", 2024, 3)["close"][9 * 24])
+
+
+@pytest.mark.asyncio
+async def test_streaming_exchange_from_store_replays_month_by_month(store):
+    in_memory = store.historical_exchange("BTCUSDT", "1h", start="2024-02-25", end="2024-03-05")
+    streaming = store.streaming_exchange("BTCUSDT", "1h", tail=50, start="2024-02-25", end="2024-03-05")
+
+    closes = []
+    while streaming.tick():
+        closes.append(streaming.get_price("BTCUSDT"))
+        assert streaming.length <= 5 * 24 + 50
+    np.testing.assert_array_equal(closes, in_memory.columns["close"])
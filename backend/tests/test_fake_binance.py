@@ -0,0 +1,88 @@
+import ccxt
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_asyncio
+
+from app.infrastructure.adapters.binance_adapter import BinanceAdapter
+from benchmarks.fake_binance import FakeBinance, start_server
+from benchmarks.load_test import run_load_test
+from benchmarks.synthetic import synthetic_candles
+
+
+@pytest_asyncio.fixture
+async def serve():
+    servers = []
+
+    async def serve(fake: FakeBinance) -> BinanceAdapter:
+        runner, url = await start_server(fake)
+        adapter = BinanceAdapter(api_key="key", secret="secret", api_url=url)
+        servers.append((runner, adapter))
+        return adapter
+
+    yield serve
+    for runner, adapter in servers:
+        await adapter.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_adapter_reads_the_candles_up_to_now(serve):
+    candles = synthetic_candles(500)
+    fake = FakeBinance({("BTCUSDT", "1h"): candles}, warmup=300)
+    adapter = await serve(fake)
+
+    history = await adapter.get_history("BTC/USDT", "1h", limit=250)
+
+    # Candle 300 of the dataset is the current one
+    np.testing.assert_array_equal(history["close"].to_numpy(), candles["close"].to_numpy()[51:301])
+    now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+    assert history["timestamp"].iloc[-1] <= now < history["timestamp"].iloc[-1] + pd.Timedelta(hours=1)
+    assert await adapter.get_price("BTC/USDT") == candles["close"].iloc[300]
+
+
+@pytest.mark.asyncio
+async def test_orders_through_the_adapter(serve):
+    fake = FakeBinance({("BTCUSDT", "1h"): synthetic_candles(100)})
+    adapter = await serve(fake)
+    price = fake.price("BTCUSDT")
+
+    order = await adapter.place_market_buy("BTC/USDT", 0.0123456)
+    assert (order["status"], order["filled"]) == ("closed", 0.01234)
+    assert order["average"] == pytest.approx(price)
+    assert order["fee"]["cost"] == pytest.approx(0.01234 * price * 0.001)
+
+    resting = await adapter.place_limit_sell("BTC/USDT", 0.01, price * 2)
+    assert resting["status"] == "open"
+    assert (await adapter.client.cancel_order(resting["id"], "BTC/USDT"))["status"] == "canceled"
+
+    with pytest.raises(ccxt.BadRequest):
+        await adapter.place_market_sell("BTC/USDT", 0.00001)  # below the minimum notional
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_and_rate_limits_are_ccxt_errors(serve):
+    adapter = await serve(FakeBinance({("BTCUSDT", "1h"): synthetic_candles(100)}, error_rate=1.0))
+    with pytest.raises(ccxt.OperationFailed):  # retryable, like Binance's -1001 / 503
+        await adapter.load_markets()
+
+    fake = FakeBinance({("BTCUSDT", "1h"): synthetic_candles(100)}, weight_limit=25)
+    adapter = await serve(fake)
+    await adapter.load_markets()  # weight 20
+    await adapter.fetch_ohlcv("BTC/USDT", "1h")  # 22
+    await adapter.fetch_ohlcv("BTC/USDT", "1h")  # 24
+    with pytest.raises(ccxt.DDoSProtection):
+        await adapter.fetch_ohlcv("BTC/USDT", "1h")
+    assert fake.rejected == 1
+
+
+@pytest.mark.asyncio
+async def test_load_test_runs_bots_end_to_end():
+    fake = FakeBinance({("BTCUSDT", "1h"): synthetic_candles(500)}, latency_ms=1)
+    result = await run_load_test(bots=3, duration=1.0, interval=0.05, order_every=2, fake=fake)
+
+    assert result["ticks"] > 10
+    assert result["executed"] == result["order_ticks"]["count"] > 0
+    assert result["failed"] == result["errors"] == 0
+    assert fake.requests >= result["executed"]
+    assert len(fake.orders) == result["executed"]
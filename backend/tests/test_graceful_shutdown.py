@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from unittest.mock import AsyncMock, MagicMock
+
+from app.bots.base import BaseBot, BotStatus
+from app.bots.bot_manager import BotManager
+from app.bots.scheduler import BotScheduler
+from app.bots.strategies.base import BUY
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.models.bot import Bot
+from app.models.bot_state import BotState
+from app.models.order import Base
+from app.services.bot_state_store import BotStateStore
+from app.services.metrics import metrics
+
+MARKET = ("BTC/USDT", "1h")
+
+
+class SlowStrategy:
+    symbol, timeframe, long_window = MARKET[0], MARKET[1], 50
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.started = 0
+        self.finished = 0
+
+    async def generate_signals(self, exchange, capital):
+        self.started += 1
+        await asyncio.sleep(self.delay)
+        self.finished += 1
+        return None
+
+
+def make_scheduler(bots, max_concurrency=50):
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    scheduler = BotScheduler(exchange, order_service=None, max_concurrency=max_concurrency)
+    for bot in bots:
+        bot.status = BotStatus.RUNNING
+        scheduler._groups.setdefault(MARKET, {})[bot.bot_id] = bot
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_running_ticks_are_drained_concurrently_and_no_new_tick_starts():
+    bots = [BaseBot(f"bot-{i}", SlowStrategy(0.2)) for i in range(300)]
+    scheduler = make_scheduler(bots, max_concurrency=300)
+    market_loop = asyncio.create_task(scheduler.tick_market(MARKET))
+    scheduler._tasks[MARKET] = market_loop
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    cancelled = await scheduler.shutdown(timeout=5)
+    elapsed = time.perf_counter() - start
+
+    # The market loop was cancelled, not the ticks it started
+    assert market_loop.cancelled()
+    assert cancelled == 0
+    assert all(bot.strategy.finished == 1 for bot in bots)
+    assert elapsed < 1
+
+    await scheduler.tick_market(MARKET)
+    assert all(bot.strategy.started == 1 for bot in bots)
+    with pytest.raises(RuntimeError):
+        scheduler.add(BaseBot("late", SlowStrategy(0)))
+
+
+@pytest.mark.asyncio
+async def test_queued_ticks_are_skipped_and_stuck_ones_cancelled_at_the_deadline():
+    stuck = BaseBot("stuck", SlowStrategy(60))
+    queued = BaseBot("queued", SlowStrategy(0))
+    scheduler = make_scheduler([stuck, queued], max_concurrency=1)
+    scheduler._tasks[MARKET] = asyncio.create_task(scheduler.tick_market(MARKET))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    assert await scheduler.shutdown(timeout=0.2) == 1
+    assert time.perf_counter() - start < 1
+
+    assert stuck.strategy.finished == 0
+    assert queued.strategy.started == 0
+    assert scheduler._ticks == {}
+
+
+@pytest.mark.asyncio
+async def test_a_bot_is_not_ticked_again_while_its_tick_is_running():
+    bot = BaseBot("slow", SlowStrategy(0.1))
+    scheduler = make_scheduler([bot])
+
+    await asyncio.gather(scheduler.tick_market(MARKET), scheduler.tick_market(MARKET))
+
+    assert bot.strategy.started == 1
+
+
+# ---------------------------------------------------------------------------
+# BotManager
+# ---------------------------------------------------------------------------
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'bots.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Bot(id="btc", strategy="MovingAverageCrossoverStrategy",
+                   params=MovingAverageCrossoverStrategy().model_dump(), status="R"))
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+def make_manager(session_factory):
+    exchange = MagicMock()
+    exchange.get_history = AsyncMock()
+    return BotManager(exchange, order_service=None, state_store=BotStateStore(session_factory=session_factory),
+                      session_factory=session_factory)
+
+
+@pytest.mark.asyncio
+async def test_stopped_bot_keeps_its_position_and_is_not_restored(session_factory):
+    manager = make_manager(session_factory)
+    await manager.restore_running_bots()
+    bot = manager._get_bot("btc")
+    bot.strategy._evaluate_candle(40000.0, BUY, capital=1000)  # opens a position
+    metrics.observe("tick", 0.01, bot_id="btc")
+
+    await manager.stop_bot("btc")
+
+    assert manager.list_running_bots() == []
+    assert metrics.histogram("tick", "btc") is None
+    assert manager.scheduler.markets() == {}
+    async with session_factory() as db:
+        assert (await db.get(Bot, "btc")).status == "S"
+        assert (await db.get(BotState, "btc")).state["is_position_open"] is True
+    assert await make_manager(session_factory).restore_running_bots() == []
+
+    # Restarted: running again, with its position, and restored by the next start
+    await manager.restart_db_bot("btc")
+    assert manager._get_bot("btc").strategy._is_position_open is True
+    await manager.shutdown(timeout=1)
+    restarted = make_manager(session_factory)
+    assert await restarted.restore_running_bots() == ["btc"]
+    await restarted.shutdown(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_shutdown_snapshots_every_bot(session_factory):
+    manager = make_manager(session_factory)
+    await manager.restore_running_bots()
+    manager._get_bot("btc").strategy._evaluate_candle(40000.0, BUY, capital=1000)
+
+    await manager.shutdown(timeout=1)
+    await manager.state_store.close()
+
+    async with session_factory() as db:
+        assert (await db.get(Bot, "btc")).status == "R"
+        assert (await db.get(BotState, "btc")).state["entry_price"] == 40000.0
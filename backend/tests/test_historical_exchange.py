@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from tests.factories.candle_factory import load_candles
+
+
+@pytest.mark.asyncio
+async def test_get_history_returns_the_rows_before_the_cursor():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    exchange = HistoricalExchange(candles)
+    for _ in range(300):
+        exchange.tick()
+
+    history = await exchange.get_history("BTC/USDT", "1h", limit=250)
+
+    expected = candles.iloc[:300].tail(250)
+    assert list(history.index) == list(expected.index)
+    np.testing.assert_array_equal(history["close"].to_numpy(), expected["close"].to_numpy())
+    np.testing.assert_array_equal(history["timestamp"].to_numpy(), expected["timestamp"].to_numpy())
+    assert exchange.get_price("BTC/USDT") == float(candles.iloc[299]["close"])
+
+
+@pytest.mark.asyncio
+async def test_get_history_is_a_read_only_view():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    exchange = HistoricalExchange(candles)
+    for _ in range(100):
+        exchange.tick()
+
+    history = await exchange.get_history("BTC/USDT", "1h", limit=50)
+    arrays = await exchange.get_arrays("BTC/USDT", "1h", limit=50)
+
+    assert np.shares_memory(history["close"].to_numpy(), exchange.block)
+    assert np.shares_memory(arrays["close"], exchange.block)
+
+    with pytest.raises(ValueError):
+        history.loc[history.index[0], "close"] = 0.0
+    with pytest.raises(ValueError):
+        arrays["close"][0] = 0.0
+
+    # Strategies can still add their own indicator columns
+    history["short_ma"] = history["close"].rolling(window=5).mean()
+    assert exchange.columns["close"][50] == candles["close"].iloc[50]
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from app.backtesting.sweep import backtest_config, build_grid
+from app.bots.indicator_cache import IndicatorCache
+from app.bots.indicators import rolling_mean
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from tests.factories.candle_factory import as_tuples, load_candles, replay_signals
+
+
+def test_rolling_means_match_rolling_mean_and_are_computed_once():
+    close = load_candles("BTCUSDT-1h-2024-03.csv")["close"].to_numpy()
+    cache = IndicatorCache()
+
+    means = cache.rolling_means(close, [9, 21, 50])
+    for window, values in means.items():
+        np.testing.assert_array_equal(values, rolling_mean(close, window))
+        assert not values.flags.writeable
+
+    again = cache.rolling_means(close, [21, 50, 100])
+    assert again[21] is means[21]
+    assert cache.computations == 4
+
+
+def test_window_grid_costs_one_computation_per_window():
+    close = load_candles("BTCUSDT-1h-2025-10.csv")["close"].to_numpy()
+    cache = IndicatorCache()
+
+    # 50 x 50 grid: 2500 configs, 100 distinct windows
+    for short_window in range(1, 51):
+        for long_window in range(51, 101):
+            cache.rolling_means(close, (short_window, long_window), fingerprint="BTCUSDT 1h 2025-10")
+
+    assert cache.computations == 100
+
+
+def test_least_recently_used_series_are_evicted_by_bytes():
+    close = np.arange(1000, dtype=np.float64)
+    one_series = close.nbytes
+    cache = IndicatorCache(max_bytes=4 * one_series)
+
+    cache.rolling_means(close, [5], fingerprint="a")  # cumsum + sma 5
+    cache.rolling_means(close, [10], fingerprint="b")  # cumsum + sma 10
+    cache.rolling_means(close, [5], fingerprint="a")  # a used again
+    cache.rolling_means(close, [20], fingerprint="c")
+
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.get("a", "sma", 5) is not None
+    assert cache.get("b", "sma", 10) is None
+
+
+def test_sweep_configs_give_the_same_results_with_the_cache():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    cache = IndicatorCache()
+
+    for config in build_grid(["1h"], [9, 20], [21, 50], [0.02], [0.04]):
+        assert backtest_config(candles, config, indicators=cache, fingerprint="dataset") == \
+               backtest_config(candles, config)
+    assert cache.computations == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename, params", [
+    ("BTCUSDT-1h-2024-03.csv", {}),
+    ("BTCUSDT-1h-2025-10.csv", {"short_window": 9, "long_window": 21}),
+])
+async def test_shared_mode_matches_pandas_mode(filename, params):
+    candles = load_candles(filename)
+
+    pandas_orders = await replay_signals(candles, MovingAverageCrossoverStrategy(**params))
+    shared_orders = await replay_signals(candles, MovingAverageCrossoverStrategy(indicator_mode="shared", **params))
+
+    assert len(pandas_orders) > 0
+    assert as_tuples(shared_orders) == as_tuples(pandas_orders)
+
+
+def test_new_history_of_a_scope_replaces_the_previous_one():
+    cache = IndicatorCache()
+    history = np.arange(1000, dtype=np.float64)
+
+    cache.rolling_means(history[:-1], [5, 10], scope=("BTC/USDT", "1h"))
+    cache.rolling_means(history[1:], [5, 10], scope=("BTC/USDT", "1h"))
+    cache.rolling_means(history, [5, 10], scope=("ETH/USDT", "1h"))
+
+    # Only the latest history of each market is kept: cumsum + 2 averages each
+    btc = (999 + 1) * 8 + 2 * 999 * 8
+    eth = (1000 + 1) * 8 + 2 * 1000 * 8
+    assert cache.nbytes == btc + eth
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bots.exits import STOP_LOSS, TAKE_PROFIT, candle_exit, first_exit, live_exit
+from app.bots.strategies.base import BUY
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.bots.strategies.rsi_strategy import RSIStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from tests.factories.candle_factory import as_tuples, load_candles, replay_signals
+
+
+def test_candle_exit_fills_at_the_level_or_at_the_open_of_a_gap():
+    assert candle_exit(100.0, 101.0, 97.0, stop_loss=98.0, take_profit=110.0) == (STOP_LOSS, 98.0)
+    assert candle_exit(95.0, 96.0, 94.0, stop_loss=98.0, take_profit=110.0) == (STOP_LOSS, 95.0)
+    assert candle_exit(100.0, 111.0, 99.0, stop_loss=98.0, take_profit=110.0) == (TAKE_PROFIT, 110.0)
+    assert candle_exit(112.0, 113.0, 111.0, stop_loss=98.0, take_profit=110.0) == (TAKE_PROFIT, 112.0)
+    # Both levels in the same candle: the worst case
+    assert candle_exit(100.0, 111.0, 97.0, stop_loss=98.0, take_profit=110.0) == (STOP_LOSS, 98.0)
+    assert candle_exit(100.0, 101.0, 99.0, stop_loss=98.0, take_profit=110.0) is None
+
+
+def test_first_exit_finds_the_first_touch_across_chunks():
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, 5000))
+    opens, highs, lows = close, close + 0.2, close - 0.2
+
+    for start in (0, 10, 1000):
+        stop_loss, take_profit = close[start] - 8, close[start] + 8
+        expected = next(i for i in range(start, len(close)) if lows[i] <= stop_loss or highs[i] >= take_profit)
+        hit = first_exit(opens, highs, lows, start, len(close), stop_loss, take_profit)
+        assert hit[0] == expected
+    assert first_exit(opens, highs, lows, 0, len(close), stop_loss=0.0, take_profit=1e9) is None
+
+
+def test_live_exit_checks_the_candles_since_the_last_check():
+    history = {"timestamp": np.array([1, 2, 3, 4]), "open": np.full(4, 100.0),
+               "high": np.array([101.0, 101.0, 101.0, 101.0]), "low": np.array([90.0, 97.0, 99.0, 99.5])}
+
+    # Position opened on candle 1: the wick of candle 2 is seen even if 3 and 4 closed above the stop
+    assert live_exit(history, 1, stop_loss=98.0, take_profit=110.0) == ((STOP_LOSS, 98.0), 3)
+    # Already checked up to candle 2: only 3 and 4 are left
+    assert live_exit(history, 2, stop_loss=98.0, take_profit=110.0) == (None, 3)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename, params", [
+    ("BTCUSDT-1h-2024-03.csv", {"short_window": 9, "long_window": 21, "stop_loss_pct": 0.01, "exit_mode": "intrabar"}),
+    ("BTCUSDT-4h-2025-12.csv", {"timeframe": "4h", "short_window": 9, "long_window": 21, "stop_loss_pct": 0.01,
+                                "exit_mode": "intrabar"}),
+])
+@pytest.mark.parametrize("indicator_mode", ["pandas", "incremental", "shared"])
+async def test_intrabar_backtest_matches_every_live_mode(filename, params, indicator_mode):
+    candles = load_candles(filename)
+
+    backtest_orders = MovingAverageCrossoverStrategy(**params).backtest(candles)
+    replay_orders = await replay_signals(candles, MovingAverageCrossoverStrategy(indicator_mode=indicator_mode, **params))
+
+    assert as_tuples(replay_orders) == as_tuples(backtest_orders)
+
+
+@pytest.mark.parametrize("strategy", [
+    MovingAverageCrossoverStrategy(short_window=9, long_window=21, stop_loss_pct=0.01, exit_mode="intrabar"),
+    RSIStrategy(stop_loss_pct=0.01, take_profit_pct=0.02, exit_mode="intrabar"),
+])
+def test_exits_are_filled_at_their_level_on_the_touching_candle(strategy):
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    orders = strategy.backtest(candles)
+
+    prices = set(candles["close"].tolist()) | set(candles["open"].tolist())
+    at_level = 0
+    for buy, sell in zip(orders[::2], orders[1::2]):
+        price = float(sell.price)
+        if price in (pytest.approx(buy.stop_loss), pytest.approx(buy.take_profit)):
+            at_level += 1
+        else:
+            assert price in prices  # sell signal at the close, or a gap filled at the open
+    assert at_level > 0
+
+
+def test_close_mode_keeps_the_close_exits():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    params = {"short_window": 9, "long_window": 21, "stop_loss_pct": 0.01}
+
+    intrabar = MovingAverageCrossoverStrategy(exit_mode="intrabar", **params).backtest(candles)
+    close = MovingAverageCrossoverStrategy(**params).backtest(candles)
+
+    closes = set(candles["close"].tolist())
+    assert all(float(order.price) in closes for order in close)
+    assert as_tuples(intrabar) != as_tuples(close)
+
+
+class LiveExchange(HistoricalExchange):
+    """Candles replayed like a live exchange: the exits are market orders"""
+    exits_at_level = False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("exchange_class, price", [(HistoricalExchange, 98.0), (LiveExchange, 100.0)])
+async def test_stop_touched_between_two_checks_is_not_missed(exchange_class, price):
+    # Opened at 100 (SL 98): the next candle wicks to 97 and closes back at 100
+    candles = pd.DataFrame({
+        "timestamp": [1, 2, 3, 4],
+        "open": [100.0, 100.0, 100.0, 100.0],
+        "high": [100.0, 100.5, 100.5, 100.5],
+        "low": [100.0, 97.0, 99.5, 99.5],
+        "close": [100.0, 100.0, 100.0, 100.0],
+        "volume": [1.0] * 4,
+    })
+    exchange = exchange_class(candles)
+    strategy = MovingAverageCrossoverStrategy(short_window=1, long_window=2, indicator_mode="incremental",
+                                              exit_mode="intrabar")
+    exchange.tick()
+    await strategy.generate_signals(exchange)
+    buy = strategy._evaluate_candle(100.0, BUY, capital=1000)
+    strategy._mark_entry(buy, await exchange.get_arrays("BTC/USDT", "1h"))
+
+    # Next check only two candles later: the close never went below the stop
+    exchange.tick()
+    exchange.tick()
+    order = await strategy.generate_signals(exchange)
+
+    # Backtest: at the stop. Live: a market order, at the current price
+    assert (order.side, float(order.price)) == ("SELL", price)
+    assert await strategy.generate_signals(exchange) is None
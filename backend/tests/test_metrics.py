@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.api.queries import metrics as metrics_api
+from app.bots.base import BaseBot
+from app.services.metrics import Histogram, Metrics, metrics
+from app.services.order_service import OrderService
+from tests.factories.order_factory import build_order
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+class SleepyStrategy:
+    symbol = "BTC/USDT"
+    timeframe = "1h"
+
+    def __init__(self, delay, order=None):
+        self.delay = delay
+        self.order = order
+
+    async def generate_signals(self, exchange, capital):
+        with metrics.span("fetch"):
+            await asyncio.sleep(self.delay)
+        return self.order
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+    for seconds in [0.0005] * 50 + [0.005] * 45 + [0.05] * 5:
+        histogram.observe(seconds)
+
+    assert histogram.counts == [50, 45, 5, 0]
+    assert histogram.count == 100
+    assert histogram.max == 0.05
+    # Linear within the bucket: the median is the top of the first one
+    assert histogram.quantile(0.5) == pytest.approx(0.001)
+    assert histogram.quantile(0.95) == pytest.approx(0.01)
+    assert histogram.quantile(0.99) <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_spans_of_concurrent_ticks_are_attributed_to_their_bot():
+    fast = BaseBot("fast", SleepyStrategy(0.001))
+    slow = BaseBot("slow", SleepyStrategy(0.05))
+
+    await asyncio.gather(fast.tick(None, None), slow.tick(None, None), fast.tick(None, None))
+
+    assert metrics.histogram("tick", "fast").count == 2
+    assert metrics.histogram("fetch", "fast").max < 0.05
+    assert metrics.histogram("fetch", "slow").count == 1
+    assert metrics.histogram("fetch", "slow").max >= 0.05
+    # Nothing recorded outside the bots
+    assert metrics.histogram("fetch") is None
+
+    summary = metrics.bot_summary("slow")
+    assert set(summary) == {"tick", "generate_signals", "fetch"}
+    assert summary["tick"]["count"] == 1
+    assert summary["tick"]["max_ms"] >= 50
+
+
+@pytest.mark.asyncio
+async def test_order_spans_are_recorded_under_the_bot():
+    order = build_order(side="BUY")
+    repository = MagicMock()
+    repository.create_order = AsyncMock(return_value=order)
+    repository.get_order_by_id = AsyncMock(return_value=order)
+    repository.update_order = AsyncMock(return_value=order)
+    repository.close = AsyncMock()
+    exchange = MagicMock()
+    exchange.place_market_buy = AsyncMock(return_value={})
+
+    bot = BaseBot("trader", SleepyStrategy(0, order=order))
+    await bot.tick(exchange, OrderService(exchange=exchange, repository=repository))
+
+    assert set(metrics.bot_summary("trader")) == {"tick", "generate_signals", "fetch", "create_order",
+                                                  "execute_order", "update_order"}
+
+
+def test_disabled_metrics_record_nothing():
+    registry = Metrics(enabled=False)
+    with registry.span("tick"):
+        pass
+    assert registry.bot_summary("-") == {}
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    metrics.observe("tick", 0.003, bot_id="bot-1")
+    metrics.observe("tick", 2.0, bot_id="bot-1")
+    response = metrics_api.get_metrics()
+
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    lines = response.body.decode().splitlines()
+    assert "# TYPE botox_span_seconds histogram" in lines
+    assert 'botox_span_seconds_bucket{span="tick",bot_id="bot-1",le="0.0025"} 0' in lines
+    assert 'botox_span_seconds_bucket{span="tick",bot_id="bot-1",le="0.005"} 1' in lines
+    assert 'botox_span_seconds_bucket{span="tick",bot_id="bot-1",le="+Inf"} 2' in lines
+    assert 'botox_span_seconds_count{span="tick",bot_id="bot-1"} 2' in lines
+    assert 'botox_span_seconds_sum{span="tick",bot_id="bot-1"} 2.003' in lines
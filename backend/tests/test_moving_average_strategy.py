@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bots.indicators import RollingMean, rolling_mean
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from benchmarks.synthetic import synthetic_candles
+from tests.factories.candle_factory import as_tuples, load_candles, replay_signals
+
+@pytest.mark.parametrize("window", [9, 20, 50])
+def test_rolling_mean_state_matches_pandas(window):
+    close = load_candles("BTCUSDT-1h-2024-03.csv")["close"]
+    expected = close.rolling(window=window).mean().to_numpy()
+
+    state = RollingMean(window)
+    peeked = []
+    pushed = []
+    for value in close.tolist():
+        peeked.append(state.peek(value))
+        pushed.append(state.push(value))
+
+    np.testing.assert_allclose(pushed, expected, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(peeked, expected, rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [9, 21, 50])
+def test_vectorized_rolling_mean_matches_pandas(window):
+    close = load_candles("BTCUSDT-1h-2025-10.csv")["close"]
+    expected = close.rolling(window=window).mean().to_numpy()
+
+    np.testing.assert_allclose(rolling_mean(close.to_numpy(), window), expected, rtol=1e-12, equal_nan=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename, params", [
+    ("BTCUSDT-1h-2024-03.csv", {}),
+    ("BTCUSDT-1h-2025-10.csv", {"short_window": 9, "long_window": 21}),
+    ("BTCUSDT-4h-2025-09.csv", {"timeframe": "4h", "short_window": 9, "long_window": 21}),
+])
+async def test_incremental_mode_matches_pandas_mode(filename, params):
+    candles = load_candles(filename)
+
+    pandas_orders = await replay_signals(candles, MovingAverageCrossoverStrategy(**params))
+    incremental_orders = await replay_signals(
+        candles, MovingAverageCrossoverStrategy(indicator_mode="incremental", **params)
+    )
+
+    assert len(pandas_orders) > 0
+    assert as_tuples(incremental_orders) == as_tuples(pandas_orders)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("indicator_mode", ["pandas", "incremental", "shared"])
+async def test_flat_market_gives_the_same_orders_in_every_mode(indicator_mode):
+    # 300 identical candles: both averages end up equal, up to the last bits of each mode's sums
+    candles = synthetic_candles(1000, seed=4)
+    candles.loc[400:700, ["open", "high", "low", "close"]] = float(candles.loc[400, "close"])
+
+    orders = await replay_signals(candles, MovingAverageCrossoverStrategy(indicator_mode=indicator_mode))
+
+    assert len(orders) > 0
+    assert as_tuples(orders) == as_tuples(MovingAverageCrossoverStrategy().backtest(candles))
+
+
+@pytest.mark.asyncio
+async def test_incremental_mode_rebuilds_windows_after_missed_candles():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    exchange = HistoricalExchange(candles)
+    strategy = MovingAverageCrossoverStrategy(indicator_mode="incremental")
+
+    for _ in range(100):
+        exchange.tick()
+    await strategy.generate_signals(exchange)
+
+    # Skip more candles than the small delta fetch can cover
+    for _ in range(10):
+        exchange.tick()
+    await strategy.generate_signals(exchange)
+
+    expected = candles["close"].iloc[:exchange.cursor - 1].rolling(window=strategy.long_window).mean().iloc[-1]
+    assert strategy._streams[("sma", strategy.long_window)].value == pytest.approx(expected, rel=1e-12)
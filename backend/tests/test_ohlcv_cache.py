@@ -0,0 +1,103 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.infrastructure.adapters.binance_adapter import BinanceAdapter
+from app.infrastructure.adapters.ohlcv_cache import OHLCVCache
+
+HOUR_MS = 3600 * 1000
+
+
+class FakeMarket:
+    """Hourly candles up to `now` (the last one still forming), close = candle index"""
+
+    def __init__(self, now_ms: int):
+        self.now_ms = now_ms
+        self.calls = []
+
+    async def fetch(self, symbol, timeframe, since, limit):
+        self.calls.append((symbol, timeframe, since, limit))
+        await asyncio.sleep(0.01)  # let concurrent callers pile up
+        first = -(-since // HOUR_MS) * HOUR_MS  # candles opening at or after since
+        candles = []
+        for ts in range(first, self.now_ms + 1, HOUR_MS):
+            candles.append([ts, 1.0, 1.0, 1.0, float(ts // HOUR_MS), 1.0])
+        return candles[:limit]
+
+
+def make_cache(market: FakeMarket, **kwargs) -> OHLCVCache:
+    return OHLCVCache(fetch=market.fetch, timeframe_seconds=lambda tf: 3600, now_ms=lambda: market.now_ms, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced_into_one_fetch():
+    market = FakeMarket(now_ms=1000 * HOUR_MS + HOUR_MS // 2)
+    cache = make_cache(market)
+
+    results = await asyncio.gather(*[cache.get("BTC/USDT", "1h", 250) for _ in range(10)])
+
+    assert len(market.calls) == 1
+    assert all(len(candles) == 250 for candles in results)
+    assert results[0][-1, 0] == 1000 * HOUR_MS
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_fetches_the_new_candles():
+    market = FakeMarket(now_ms=1000 * HOUR_MS + HOUR_MS // 2)
+    cache = make_cache(market, max_age=0)
+    await cache.get("BTC/USDT", "1h", 250)
+
+    market.now_ms += 3 * HOUR_MS
+    candles = await cache.get("BTC/USDT", "1h", 250)
+
+    # From the last cached candle (it may have been still forming) to now
+    assert market.calls[-1] == ("BTC/USDT", "1h", 1000 * HOUR_MS, 4)
+    assert len(candles) == 250
+    assert candles[-1, 0] == 1003 * HOUR_MS
+    assert list(candles[:, 0][-5:]) == [ts * HOUR_MS for ts in range(999, 1004)]
+
+
+@pytest.mark.asyncio
+async def test_recent_candles_are_served_without_fetching():
+    market = FakeMarket(now_ms=1000 * HOUR_MS + HOUR_MS // 2)
+    cache = make_cache(market, max_age=60)
+    await cache.get("BTC/USDT", "1h", 250)
+    await cache.get("BTC/USDT", "1h", 100)
+
+    assert len(market.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_markets_are_evicted_over_budget():
+    market = FakeMarket(now_ms=1000 * HOUR_MS + HOUR_MS // 2)
+    # 250 candles * 6 float64 = 12000 bytes per market
+    cache = make_cache(market, max_bytes=25_000)
+
+    await cache.get("BTC/USDT", "1h", 250)
+    await cache.get("ETH/USDT", "1h", 250)
+    await cache.get("BTC/USDT", "1h", 250)  # BTC used more recently than ETH
+    await cache.get("SOL/USDT", "1h", 250)
+
+    assert cache.nbytes <= 25_000
+    assert set(cache._entries) == {("BTC/USDT", "1h"), ("SOL/USDT", "1h")}
+
+
+@pytest.mark.asyncio
+async def test_binance_adapter_history_goes_through_the_cache():
+    market = FakeMarket(now_ms=1000 * HOUR_MS + HOUR_MS // 2)
+    adapter = BinanceAdapter(api_key="key", secret="secret", sandbox=True)
+    adapter.client = MagicMock()
+    adapter.client.milliseconds.return_value = market.now_ms
+    adapter.client.parse_timeframe.return_value = 3600
+    adapter.client.fetch_ohlcv = AsyncMock(side_effect=market.fetch)
+
+    frames = await asyncio.gather(*[adapter.get_history("BTC/USDT", "1h", limit=250) for _ in range(5)])
+
+    assert adapter.client.fetch_ohlcv.await_count == 1
+    assert all(len(df) == 250 for df in frames)
+    assert frames[0]["timestamp"].iloc[-1] == pd.Timestamp(1000 * HOUR_MS, unit="ms")
+    # Each bot gets its own frame to add indicator columns to
+    frames[0]["short_ma"] = frames[0]["close"].rolling(20).mean()
+    assert "short_ma" not in frames[1]
@@ -0,0 +1,219 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.bot import Bot
+from app.models.order import Base, Order
+from app.services.order_journal import OrderJournal
+from app.services.order_service import OrderService
+from tests.factories.order_factory import build_order
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'orders.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Bot(id="journal-bot", strategy="test-strategy", params={}, status="R"))
+        await db.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _orders(session_factory):
+    async with session_factory() as db:
+        return (await db.scalars(select(Order))).all()
+
+
+class _Exchange:
+    async def place_market_buy(self, symbol, amount):
+        return {"id": "1"}
+
+    async def place_market_sell(self, symbol, amount):
+        return {"id": "2"}
+
+
+class _DownSession:
+    """Session factory of a DB that doesn't answer"""
+
+    def __call__(self):
+        raise ConnectionError("database unavailable")
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_inserts_and_merges_pending_updates(session_factory, tmp_path):
+    journal = OrderJournal(session_factory=session_factory, path=tmp_path / "journal.jsonl")
+
+    orders = [journal.record_created(build_order(bot_id="journal-bot", status="PENDING")) for _ in range(20)]
+    journal.record_update(orders[0].id, {"status": "EXECUTED"})
+
+    # 20 inserts, the update was merged into its insert
+    assert journal.pending == 20
+    assert await journal.flush() == 20
+
+    journal.record_update(orders[1].id, {"status": "FAILED"})
+    assert await journal.flush() == 1
+
+    statuses = {o.id: o.status for o in await _orders(session_factory)}
+    assert len(statuses) == 20
+    assert statuses[orders[0].id] == "EXECUTED"
+    assert statuses[orders[1].id] == "FAILED"
+    assert statuses[orders[2].id] == "PENDING"
+
+
+@pytest.mark.asyncio
+async def test_batches_are_kept_locally_while_the_db_is_down(session_factory, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = OrderJournal(session_factory=_DownSession(), path=path)
+
+    order = journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+    assert await journal.flush() == 0
+    journal.record_update(order.id, {"status": "EXECUTED"})
+    assert await journal.flush() == 0
+    assert path.exists()
+    assert journal.spilled_rows == 2
+    # Still readable by execute_order while not in the DB
+    assert journal.get(order.id) is order
+
+    # DB back (or app restarted): the spilled batches are replayed in order
+    journal = OrderJournal(session_factory=session_factory, path=path)
+    assert await journal.flush() == 2
+    assert not path.exists()
+
+    [saved] = await _orders(session_factory)
+    assert saved.id == order.id
+    assert saved.status == "EXECUTED"
+
+
+@pytest.mark.asyncio
+async def test_outage_appends_the_new_batches_and_backs_off(session_factory, tmp_path, monkeypatch):
+    path = tmp_path / "journal.jsonl"
+    journal = OrderJournal(session_factory=_DownSession(), path=path, flush_interval=0.05, max_retry_delay=0.3)
+    reads = []
+    read_spilled = journal._read_spilled
+    monkeypatch.setattr(journal, "_read_spilled", lambda: reads.append(1) or read_spilled())
+
+    delays = []
+    for _ in range(4):
+        journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+        assert await journal.flush() == 0
+        delays.append(journal.retry_delay)
+
+    assert delays == [0.1, 0.2, 0.3, 0.3]
+    # Read once, then only appended to
+    assert len(reads) == 1
+    assert path.read_text().count('"op": "commit"') == 4
+    assert journal.spilled_rows == 4
+
+    journal.session_factory = session_factory
+    assert await journal.flush() == 4
+    assert journal.retry_delay == 0
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_background_flush_backs_off_while_the_db_is_down(tmp_path):
+    attempts = []
+
+    def down():
+        attempts.append(1)
+        raise ConnectionError("database unavailable")
+
+    journal = OrderJournal(session_factory=down, path=tmp_path / "journal.jsonl", flush_interval=0.01,
+                           max_batch=1, max_retry_delay=0.1)
+    await journal.start()
+    for _ in range(25):
+        # Full batches don't cut the backoff short
+        journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+        await asyncio.sleep(0.02)
+    await journal.close()
+
+    # 50 flushes without a backoff
+    assert len(attempts) < 12
+    assert journal.spilled_rows == 25
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_do_not_block_the_batch(session_factory, tmp_path):
+    journal = OrderJournal(session_factory=session_factory, path=tmp_path / "journal.jsonl")
+
+    first = journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+    journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+    await journal.flush()
+
+    # Same id again: the DB refuses this insert, the other one of the batch goes through
+    duplicate = build_order(bot_id="journal-bot", status="PENDING")
+    duplicate.id = first.id
+    journal.record_created(duplicate)
+    journal.record_created(build_order(bot_id="journal-bot", status="PENDING"))
+
+    assert await journal.flush() == 1
+    assert len(await _orders(session_factory)) == 3
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+class _FailingAfter:
+    """Session factory of a DB that goes down after `sessions` sessions"""
+
+    def __init__(self, session_factory, sessions: int):
+        self.session_factory = session_factory
+        self.sessions = sessions
+
+    def __call__(self):
+        self.sessions -= 1
+        if self.sessions < 0:
+            raise ConnectionError("database unavailable")
+        return self.session_factory()
+
+
+@pytest.mark.asyncio
+async def test_db_failing_while_isolating_rejected_rows_keeps_the_rest(session_factory, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    first = build_order(bot_id="journal-bot", status="PENDING")
+    journal = OrderJournal(session_factory=session_factory, path=path)
+    journal.record_created(first)
+    await journal.flush()
+
+    # Batch rejected (duplicate id), then the DB goes down after the first row written alone
+    journal.session_factory = _FailingAfter(session_factory, sessions=2)
+    duplicate = build_order(bot_id="journal-bot", status="PENDING")
+    duplicate.id = first.id
+    journal.record_created(duplicate)
+    kept = [journal.record_created(build_order(bot_id="journal-bot", status="PENDING")) for _ in range(2)]
+
+    assert await journal.flush() == 0
+    assert journal.spilled_rows == 2  # the duplicate was dropped, the two others are kept
+
+    journal.session_factory = session_factory
+    assert await journal.flush() == 2
+    assert {order.id for order in await _orders(session_factory)} == {first.id, *(order.id for order in kept)}
+
+
+@pytest.mark.asyncio
+async def test_order_service_with_journal_batches_concurrent_bots(session_factory, tmp_path):
+    journal = OrderJournal(session_factory=session_factory, path=tmp_path / "journal.jsonl",
+                           flush_interval=0.01, max_batch=50)
+    await journal.start()
+    service = OrderService(exchange=_Exchange(), journal=journal)
+
+    async def bot(i):
+        order = await service.create_order(build_order(bot_id="journal-bot", side="BUY" if i % 2 else "SELL"))
+        return await service.execute_order(order.id)
+
+    executed = await asyncio.gather(*(bot(i) for i in range(200)))
+    assert all(order.status == "EXECUTED" for order in executed)
+
+    await journal.close()
+    saved = await _orders(session_factory)
+    assert len(saved) == 200
+    assert all(order.status == "EXECUTED" and order.executed_at is not None for order in saved)
+    assert journal.get(executed[0].id) is None
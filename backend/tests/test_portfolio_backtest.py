@@ -0,0 +1,135 @@
+import pandas as pd
+import pytest
+
+from app.backtesting.portfolio import PortfolioBacktester, PortfolioExchange
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange, StreamingHistoricalExchange
+from tests.factories.candle_factory import chunks_of, load_candles, replay_signals
+
+OHLCV = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def four_hour_candles(hourly: pd.DataFrame) -> pd.DataFrame:
+    """4h candles built from 1h ones (open of the first hour, close of the last one)"""
+    groups = hourly[OHLCV].groupby(hourly.index // 4)
+    return pd.DataFrame({
+        "timestamp": groups["timestamp"].first(),
+        "open": groups["open"].first(),
+        "high": groups["high"].max(),
+        "low": groups["low"].min(),
+        "close": groups["close"].last(),
+        "volume": groups["volume"].sum(),
+    }).reset_index(drop=True)
+
+
+def test_markets_are_merged_on_their_close_times():
+    hourly = load_candles("BTCUSDT-1h-2025-10.csv")[OHLCV]
+    exchange = PortfolioExchange({
+        ("BTC/USDT", "1h"): HistoricalExchange(hourly),
+        ("ETH/USDT", "4h"): HistoricalExchange(four_hour_candles(hourly)),
+    })
+
+    steps = []
+    while exchange.tick():
+        steps.append((exchange.now, exchange.current))
+
+    assert len(steps) == len(hourly) + len(four_hour_candles(hourly))
+    assert [now for now, _ in steps] == sorted(now for now, _ in steps)
+    # Both close at 04:00: the 03:00 1h candle, then the 00:00 4h candle
+    assert [key for _, key in steps[:5]] == [("BTC/USDT", "1h")] * 4 + [("ETH/USDT", "4h")]
+    # The 4h market only sees its own candles
+    assert exchange.markets[("ETH/USDT", "4h")].cursor == len(four_hour_candles(hourly))
+
+
+@pytest.mark.asyncio
+async def test_one_strategy_gives_the_same_signals_as_a_single_market_replay():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")[OHLCV]
+    expected = await replay_signals(candles, MovingAverageCrossoverStrategy(indicator_mode="incremental"))
+
+    exchange = PortfolioExchange({("BTC/USDT", "1h"): HistoricalExchange(candles)})
+    result = await PortfolioBacktester(exchange, capital=1000.0).run(
+        [MovingAverageCrossoverStrategy(indicator_mode="incremental")]
+    )
+
+    assert [(t.order.side, float(t.order.price)) for t in result.trades] == \
+           [(o.side, float(o.price)) for o in expected]
+
+
+@pytest.mark.asyncio
+async def test_streamed_markets_give_the_same_backtest_in_bounded_memory():
+    hourly = load_candles("BTCUSDT-1h-2025-10.csv")[OHLCV]
+    four_hours = four_hour_candles(hourly)
+
+    def strategies():
+        return [
+            MovingAverageCrossoverStrategy(symbol="BTC/USDT", timeframe="1h", short_window=9, long_window=21,
+                                           risk_per_trade=0.5),
+            MovingAverageCrossoverStrategy(symbol="ETH/USDT", timeframe="4h", short_window=5, long_window=10,
+                                           risk_per_trade=0.5),
+        ]
+
+    in_memory = await PortfolioBacktester(PortfolioExchange({
+        ("BTC/USDT", "1h"): HistoricalExchange(hourly),
+        ("ETH/USDT", "4h"): HistoricalExchange(four_hours),
+    }), capital=1000.0).run(strategies())
+
+    tail = max(strategy.history_limit() for strategy in strategies())
+    exchange = PortfolioExchange({
+        ("BTC/USDT", "1h"): StreamingHistoricalExchange(chunks_of(hourly, 100), tail=tail),
+        ("ETH/USDT", "4h"): StreamingHistoricalExchange(chunks_of(four_hours, 30), tail=tail),
+    })
+    streamed = await PortfolioBacktester(exchange, capital=1000.0).run(strategies())
+
+    assert len(in_memory.trades) > 2
+    assert [(t.time, t.strategy, t.order.side, float(t.order.price)) for t in streamed.trades] == \
+           [(t.time, t.strategy, t.order.side, float(t.order.price)) for t in in_memory.trades]
+    assert streamed.equity == pytest.approx(in_memory.equity)
+    assert exchange.markets[("BTC/USDT", "1h")].length <= 100 + tail
+
+
+@pytest.mark.asyncio
+async def test_intrabar_exits_are_recorded_at_their_level_like_a_single_market_replay():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")[OHLCV]
+    params = {"short_window": 9, "long_window": 21, "stop_loss_pct": 0.01, "exit_mode": "intrabar",
+              "indicator_mode": "incremental"}
+    expected = await replay_signals(candles, MovingAverageCrossoverStrategy(**params))
+
+    exchange = PortfolioExchange({("BTC/USDT", "1h"): HistoricalExchange(candles)})
+    result = await PortfolioBacktester(exchange, capital=1000.0).run([MovingAverageCrossoverStrategy(**params)])
+
+    orders = [trade.order for trade in result.trades]
+    assert [(o.side, float(o.price)) for o in orders] == [(o.side, float(o.price)) for o in expected]
+    stops = [sell for buy, sell in zip(orders[::2], orders[1::2]) if float(sell.price) == pytest.approx(buy.stop_loss)]
+    assert stops
+    assert all(float(sell.price) not in set(candles["close"]) for sell in stops)
+
+
+@pytest.mark.asyncio
+async def test_strategies_share_the_capital():
+    hourly = load_candles("BTCUSDT-1h-2025-10.csv")[OHLCV]
+    exchange = PortfolioExchange({
+        ("BTC/USDT", "1h"): HistoricalExchange(hourly),
+        ("ETH/USDT", "4h"): HistoricalExchange(four_hour_candles(hourly)),
+    })
+    strategies = [
+        MovingAverageCrossoverStrategy(symbol="BTC/USDT", timeframe="1h", short_window=9, long_window=21,
+                                       risk_per_trade=0.5, indicator_mode="incremental"),
+        MovingAverageCrossoverStrategy(symbol="ETH/USDT", timeframe="4h", short_window=5, long_window=10,
+                                       risk_per_trade=0.5, indicator_mode="incremental"),
+    ]
+    result = await PortfolioBacktester(exchange, capital=1000.0).run(strategies)
+
+    assert {t.strategy for t in result.trades} == {0, 1}
+    cash = 1000.0
+    for trade in result.trades:
+        value = float(trade.order.amount) * float(trade.order.price)
+        # Sized on the cash left by the other strategy, never more than what's available
+        if trade.order.side == "BUY":
+            assert value <= cash
+            cash -= value
+        else:
+            cash += value
+        assert trade.cash_after == pytest.approx(cash)
+
+    assert result.cash == pytest.approx(cash)
+    assert 0 <= result.max_drawdown < 1
@@ -0,0 +1,166 @@
+import ccxt
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.bots.base import BaseBot
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.simulated_exchange import SimulatedExchange
+from app.models.bot import Bot
+from app.models.order import Base
+from app.services.order_journal import OrderJournal
+from app.services.order_service import OrderService
+from tests.factories.candle_factory import load_candles
+
+HOUR = 3_600_000
+
+
+def candles(opens, highs=None, lows=None, volume=10.0):
+    opens = np.asarray(opens, dtype=np.float64)
+    return {
+        "timestamp": np.arange(len(opens)) * HOUR,
+        "open": opens,
+        "high": np.asarray(highs if highs is not None else opens, dtype=np.float64),
+        "low": np.asarray(lows if lows is not None else opens, dtype=np.float64),
+        "close": opens,
+        "volume": np.full(len(opens), volume),
+    }
+
+
+@pytest.mark.asyncio
+async def test_market_order_fills_at_the_next_open_with_the_taker_fee():
+    exchange = SimulatedExchange(candles([100.0, 102.0, 103.0]), balances={"USDT": 1000.0}, participation=None)
+    exchange.tick()
+
+    sent = await exchange.place_market_buy("BTC/USDT", 1.0)
+    assert (sent["status"], sent["filled"]) == ("open", 0.0)
+
+    exchange.tick()
+    order = await exchange.fetch_order(sent["id"])
+    assert (order["status"], order["filled"], order["average"]) == ("closed", 1.0, 102.0)
+    assert order["fee"] == {"cost": pytest.approx(0.102), "currency": "USDT"}
+    assert await exchange.fetch_balance() == {"USDT": pytest.approx(1000 - 102 - 0.102), "BTC": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_latency_delays_the_fill_to_the_candle_of_arrival():
+    exchange = SimulatedExchange(candles([100.0, 102.0, 103.0, 104.0]), latency_ms=HOUR + 1, participation=None)
+    exchange.tick()
+    sent = await exchange.place_market_buy("BTC/USDT", 0.5)
+
+    exchange.tick()
+    assert (await exchange.fetch_order(sent["id"]))["status"] == "open"
+    exchange.tick()
+    order = await exchange.fetch_order(sent["id"])
+    assert (order["status"], order["average"]) == ("closed", 103.0)
+    assert order["trades"][0]["timestamp"] == 2 * HOUR + 1
+
+
+@pytest.mark.asyncio
+async def test_market_order_larger_than_the_liquidity_is_worked_over_several_candles():
+    exchange = SimulatedExchange(candles([100.0, 101.0, 102.0, 103.0], volume=10.0), participation=0.1)
+    exchange.tick()
+    sent = await exchange.place_market_buy("BTC/USDT", 2.5)
+
+    exchange.tick()
+    assert (await exchange.fetch_order(sent["id"]))["filled"] == pytest.approx(1.0)
+    exchange.tick()
+    exchange.tick()
+    order = await exchange.fetch_order(sent["id"])
+    assert order["status"] == "closed"
+    assert [(trade["price"], trade["amount"]) for trade in order["trades"]] == \
+           [(101.0, pytest.approx(1.0)), (102.0, pytest.approx(1.0)), (103.0, pytest.approx(0.5))]
+    assert order["average"] == pytest.approx((101 + 102 + 51.5) / 2.5)
+
+
+@pytest.mark.asyncio
+async def test_limit_orders_rest_in_the_book_and_fill_at_their_price_as_maker():
+    exchange = SimulatedExchange(candles([100.0, 100.0, 100.0, 100.0], lows=[100.0, 97.0, 99.0, 96.0]),
+                                 maker_fee=0.0002, participation=None)
+    exchange.tick()
+    low = await exchange.place_limit_buy("BTC/USDT", 1.0, 96.5)
+    high = await exchange.place_limit_buy("BTC/USDT", 1.0, 98.0)
+
+    # Arrival candle: the 97 low may have been before the orders arrived, they rest from the next candle
+    exchange.tick()
+    assert (await exchange.fetch_order(high["id"]))["status"] == "open"
+    exchange.tick()
+    assert (await exchange.fetch_order(high["id"]))["status"] == "open"
+    exchange.tick()
+
+    for sent, price in ((high, 98.0), (low, 96.5)):
+        order = await exchange.fetch_order(sent["id"])
+        assert (order["status"], order["average"]) == ("closed", price)
+        assert order["trades"][0]["takerOrMaker"] == "maker"
+        assert order["fee"]["cost"] == pytest.approx(price * 0.0002)
+
+
+@pytest.mark.asyncio
+async def test_crossing_limit_order_fills_as_taker_at_the_open():
+    exchange = SimulatedExchange(candles([100.0, 99.0]), participation=None)
+    exchange.tick()
+    sent = await exchange.place_limit_buy("BTC/USDT", 1.0, 101.0)
+    exchange.tick()
+
+    order = await exchange.fetch_order(sent["id"])
+    assert (order["status"], order["average"], order["trades"][0]["takerOrMaker"]) == ("closed", 99.0, "taker")
+
+
+@pytest.mark.asyncio
+async def test_orders_are_checked_like_binance():
+    exchange = SimulatedExchange(candles([100.0, 100.0]), balances={"USDT": 50.0})
+    exchange.tick()
+
+    with pytest.raises(ccxt.InvalidOrder):
+        await exchange.place_market_buy("BTC/USDT", 0.04)  # 4 USDT: below the minimum notional
+    with pytest.raises(ccxt.InsufficientFunds):
+        await exchange.place_market_buy("BTC/USDT", 1.0)
+    with pytest.raises(ccxt.InsufficientFunds):
+        await exchange.place_market_sell("BTC/USDT", 0.1)
+
+    sent = await exchange.place_market_buy("BTC/USDT", 0.1234567)
+    assert sent["amount"] == 0.12345
+    await exchange.cancel_order(sent["id"])
+    exchange.tick()
+    assert (await exchange.fetch_order(sent["id"]))["filled"] == 0.0
+    with pytest.raises(ccxt.OrderNotFound):
+        await exchange.cancel_order(sent["id"])
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'orders.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(Bot(id="sim-bot", strategy="MovingAverageCrossoverStrategy", params={}, status="R"))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_bot_ticks_end_to_end_against_the_simulator(session_factory, tmp_path):
+    exchange = SimulatedExchange(load_candles("BTCUSDT-1h-2024-03.csv"), balances={"USDT": 10_000.0},
+                                 latency_ms=150, participation=None)
+    journal = OrderJournal(session_factory=session_factory, path=tmp_path / "journal.jsonl")
+    await journal.start()
+    service = OrderService(exchange=exchange, journal=journal)
+    bot = BaseBot("sim-bot", MovingAverageCrossoverStrategy(), capital=10_000.0)
+
+    executed = []
+    while exchange.tick():
+        order = await bot.tick(exchange, service)
+        if order is not None:
+            executed.append(order)
+    await journal.close()
+
+    assert len(executed) > 2
+    assert all(order.status == "EXECUTED" for order in executed)
+    fills = list(exchange.orders.values())
+    assert [order.side.upper() for order in fills] == [order.side for order in executed]
+    assert all(order.status == "closed" and order.fee > 0 for order in fills)
+    # The fills are at the next candle's open, not at the signal's close
+    assert [order.average for order in fills] != [float(order.price) for order in executed]
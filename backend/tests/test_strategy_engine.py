@@ -0,0 +1,137 @@
+from typing import Dict, List
+
+import numpy as np
+import pytest
+
+from app.bots.bot_factory import STRATEGY_REGISTRY
+from app.bots.indicator_cache import IndicatorCache
+from app.bots.indicators import RollingStd, WilderRSI, rolling_std, wilder_rsi
+from app.bots.strategies.base import BUY, HOLD, SELL, BaseStrategy, Indicator
+from app.bots.strategies.bollinger_strategy import BollingerBandsStrategy
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.bots.strategies.rsi_strategy import RSIStrategy
+from app.bots.strategy_engine import StrategyEngine
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from tests.factories.candle_factory import as_tuples, load_candles, replay_signals
+
+
+class CrossoverStrategy(BaseStrategy):
+    """The MA crossover written as a signal function"""
+    name: str = "CrossoverStrategy"
+    short_window: int = 20
+    long_window: int = 50
+
+    def indicators(self) -> List[Indicator]:
+        return [("sma", self.short_window), ("sma", self.long_window)]
+
+    def signals(self, candles, indicators: Dict[Indicator, np.ndarray]) -> np.ndarray:
+        short_ma, long_ma = indicators[("sma", self.short_window)], indicators[("sma", self.long_window)]
+        trend = np.sign(short_ma - long_ma)
+        trend[np.isnan(trend)] = 0
+        signals = np.full(len(trend), HOLD, dtype=np.int8)
+        signals[1:][np.diff(trend) == 2] = BUY
+        signals[1:][np.diff(trend) == -2] = SELL
+        return signals
+
+
+@pytest.mark.parametrize("window", [14, 20])
+def test_streaming_indicators_match_the_series(window):
+    close = load_candles("BTCUSDT-1h-2024-03.csv")["close"]
+    expected_std = close.rolling(window=window).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(close.to_numpy(), window), expected_std, rtol=1e-9, equal_nan=True)
+
+    for state, expected in ((RollingStd(window), expected_std), (WilderRSI(window), wilder_rsi(close.to_numpy(), window))):
+        peeked, pushed = [], []
+        for value in close.tolist():
+            peeked.append(state.peek(value))
+            pushed.append(state.push(value))
+        np.testing.assert_allclose(pushed, expected, rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(peeked, expected, rtol=1e-9, equal_nan=True)
+
+
+def test_rsi_is_bounded_and_neutral_on_a_flat_market():
+    rsi = wilder_rsi(load_candles("BTCUSDT-1h-2025-10.csv")["close"].to_numpy(), 14)
+    assert np.isnan(rsi[:14]).all()
+    assert ((rsi[14:] > 0) & (rsi[14:] < 100)).all()
+    np.testing.assert_array_equal(wilder_rsi(np.full(30, 100.0), 14)[14:], 50.0)
+
+
+def test_signal_function_strategy_gives_the_ma_crossover_orders():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+
+    expected = MovingAverageCrossoverStrategy().backtest(candles)
+
+    assert len(expected) > 0
+    assert as_tuples(CrossoverStrategy().backtest(candles)) == as_tuples(expected)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy_class, filename, params", [
+    (RSIStrategy, "BTCUSDT-1h-2024-03.csv", {}),
+    (RSIStrategy, "BTCUSDT-1h-2025-10.csv", {"rsi_window": 7, "oversold": 25, "overbought": 75}),
+    (BollingerBandsStrategy, "BTCUSDT-1h-2024-03.csv", {}),
+    (BollingerBandsStrategy, "BTCUSDT-4h-2025-09.csv", {"timeframe": "4h", "window": 10, "num_std": 1.5}),
+])
+async def test_backtest_shared_and_incremental_modes_give_the_same_orders(strategy_class, filename, params):
+    candles = load_candles(filename)
+
+    backtest_orders = strategy_class(**params).backtest(candles)
+    shared_orders = await replay_signals(candles, strategy_class(**params))
+    incremental_orders = await replay_signals(candles, strategy_class(indicator_mode="incremental", **params))
+
+    assert len(backtest_orders) > 0
+    assert as_tuples(shared_orders) == as_tuples(backtest_orders)
+    assert as_tuples(incremental_orders) == as_tuples(backtest_orders)
+
+
+def test_batch_backtest_computes_each_indicator_once():
+    candles = load_candles("BTCUSDT-1h-2025-10.csv")
+    cache = IndicatorCache()
+    strategies = [RSIStrategy(oversold=oversold) for oversold in (20, 25, 30)] + \
+                 [BollingerBandsStrategy(num_std=num_std) for num_std in (1.5, 2.0)] + [CrossoverStrategy()]
+
+    results = StrategyEngine(cache).backtest(candles, strategies)
+
+    # rsi 14, sma 20, std 20, sma 50
+    assert cache.computations == 4
+    for params, orders in zip(strategies, results):
+        assert as_tuples(orders) == as_tuples(type(params)(**params.model_dump()).backtest(candles))
+
+
+@pytest.mark.asyncio
+async def test_live_batch_fetches_each_market_once():
+    exchange = HistoricalExchange(load_candles("BTCUSDT-1h-2024-03.csv"))
+    while exchange.cursor < 300:
+        exchange.tick()
+    calls = []
+    get_arrays = exchange.get_arrays
+
+    async def counting_get_arrays(symbol, timeframe, limit=None):
+        calls.append((symbol, timeframe))
+        return await get_arrays(symbol, timeframe, limit)
+
+    exchange.get_arrays = counting_get_arrays
+    strategies = [RSIStrategy(), BollingerBandsStrategy(), RSIStrategy(timeframe="4h")]
+
+    orders = await StrategyEngine(IndicatorCache()).evaluate(exchange, strategies)
+
+    assert len(orders) == 3
+    assert sorted(calls) == [("BTC/USDT", "1h"), ("BTC/USDT", "4h")]
+
+
+def test_strategies_are_registered_and_reject_unknown_indicators():
+    assert STRATEGY_REGISTRY["RSIStrategy"] is RSIStrategy
+    assert STRATEGY_REGISTRY["BollingerBandsStrategy"] is BollingerBandsStrategy
+
+    strategy = STRATEGY_REGISTRY["RSIStrategy"](**RSIStrategy(rsi_window=9).model_dump())
+    assert strategy.rsi_window == 9 and strategy.warmup() == 9
+
+    class MacdStrategy(BaseStrategy):
+        def indicators(self):
+            return [("macd", 12)]
+
+        def signals(self, candles, indicators):
+            return np.zeros(len(candles["close"]), dtype=np.int8)
+
+    with pytest.raises(ValueError):
+        MacdStrategy()
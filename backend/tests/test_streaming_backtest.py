@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.backtesting.datasets import iter_month_frames, load_year
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange, StreamingHistoricalExchange
+from tests.factories.candle_factory import as_tuples, chunks_of, load_candles, replay_signals
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.mark.asyncio
+async def test_history_windows_match_the_in_memory_replay():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    in_memory = HistoricalExchange(candles)
+    streaming = StreamingHistoricalExchange(chunks_of(candles, 100), tail=250)
+
+    largest_block = 0
+    while in_memory.tick():
+        assert streaming.tick()
+        largest_block = max(largest_block, streaming.length)
+        expected = await in_memory.get_history("BTC/USDT", "1h", limit=250)
+        window = await streaming.get_history("BTC/USDT", "1h", limit=250)
+        assert window.index.equals(expected.index)
+        np.testing.assert_array_equal(window.to_numpy(), expected.to_numpy())
+        assert streaming.get_price("BTC/USDT") == in_memory.get_price("BTC/USDT")
+
+    assert not streaming.tick()
+    # Never more than the tail + one chunk in memory
+    assert largest_block <= 250 + 100
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {},
+    {"short_window": 9, "long_window": 21, "indicator_mode": "incremental"},
+])
+async def test_streaming_replay_gives_the_same_orders(params):
+    candles = load_candles("BTCUSDT-1h-2025-10.csv")
+    expected = await replay_signals(candles, MovingAverageCrossoverStrategy(**params))
+
+    strategy = MovingAverageCrossoverStrategy(**params)
+    exchange = StreamingHistoricalExchange(chunks_of(candles, 64), tail=strategy.history_limit())
+    orders = []
+    while exchange.tick():
+        order = await strategy.generate_signals(exchange)
+        if order:
+            orders.append(order)
+
+    assert len(expected) > 0
+    assert as_tuples(orders) == as_tuples(expected)
+
+
+def test_month_frames_are_the_months_of_load_year():
+    frames = list(iter_month_frames(DATA_DIR, "BTCUSDT", "4h", [2025]))
+    concatenated, months = load_year(DATA_DIR, "BTCUSDT", "4h", 2025)
+
+    assert len(frames) == len(months) == 2
+    assert sum(len(frame) for frame in frames) == len(concatenated)
@@ -0,0 +1,215 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bots.strategies.base import BUY
+from app.bots.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.infrastructure.adapters.historical_exchange import HistoricalExchange
+from app.infrastructure.adapters.tick_replay_exchange import TickReplayExchange
+from app.infrastructure.adapters.trade_store import TradeStore
+from benchmarks.synthetic import synthetic_trades
+from tests.factories.candle_factory import as_tuples, load_candles, replay_signals
+
+
+def trades_of(candles: pd.DataFrame) -> dict:
+    """Four trades per candle giving back the candle: open, low and high (in the candle's direction), close"""
+    timestamps = candles["timestamp"].to_numpy(dtype=np.int64)
+    opens, highs, lows, closes = (candles[name].to_numpy() for name in ("open", "high", "low", "close"))
+    rising = closes >= opens
+    return {
+        "timestamp": (timestamps[:, None] + np.array([0, 1000, 2000, 3000])).ravel(),
+        "price": np.column_stack([opens, np.where(rising, lows, highs), np.where(rising, highs, lows), closes]).ravel(),
+        "quantity": np.column_stack([np.zeros((len(candles), 3)), candles["volume"].to_numpy()]).ravel(),
+    }
+
+
+async def tick_replay(exchange: TickReplayExchange, strategy):
+    orders = []
+    while exchange.tick():
+        order = await strategy.generate_signals(exchange)
+        if order:
+            orders.append(order)
+    return orders
+
+
+def write_agg_trades(path, trades: dict, header: bool, microseconds: bool = False):
+    timestamps = trades["timestamp"] * (1000 if microseconds else 1)
+    frame = pd.DataFrame({
+        "agg_trade_id": np.arange(len(timestamps)), "price": trades["price"], "quantity": trades["quantity"],
+        "first_trade_id": 0, "last_trade_id": 0, "transact_time": timestamps,
+        "is_buyer_maker": True, "is_best_match": True,
+    })
+    frame.to_csv(path, index=False, header=header)
+
+
+@pytest.mark.parametrize("timeframe", ["1m", "15m", "1h"])
+def test_candles_aggregated_like_pandas(timeframe):
+    trades = synthetic_trades(30_000)
+    exchange = TickReplayExchange.from_trades(trades, timeframe=timeframe)
+
+    frame = pd.DataFrame({"price": trades["price"], "quantity": trades["quantity"]},
+                         index=pd.to_datetime(trades["timestamp"], unit="ms"))
+    expected = frame.resample(timeframe.replace("m", "min")).agg(
+        {"price": ["first", "max", "min", "last"], "quantity": "sum"}).dropna()
+
+    np.testing.assert_array_equal(exchange.candles["timestamp"], expected.index.asi8 // 1_000_000)
+    np.testing.assert_array_equal(exchange.candles["open"], expected[("price", "first")])
+    np.testing.assert_array_equal(exchange.candles["high"], expected[("price", "max")])
+    np.testing.assert_array_equal(exchange.candles["low"], expected[("price", "min")])
+    np.testing.assert_array_equal(exchange.candles["close"], expected[("price", "last")])
+    np.testing.assert_allclose(exchange.candles["volume"], expected[("quantity", "sum")], rtol=1e-12)
+
+
+@pytest.mark.asyncio
+async def test_forming_candle_is_built_from_the_events_replayed_so_far():
+    trades = synthetic_trades(5_000)
+    exchange = TickReplayExchange.from_trades(trades, timeframe="1m", step="1s")
+
+    for _ in range(700):
+        exchange.tick()
+    arrays = await exchange.get_arrays("BTC/USDT", "1m", limit=5)
+    candle = int(np.searchsorted(exchange.starts, exchange.cursor - 1, side="right")) - 1
+    replayed = slice(int(exchange.starts[candle]), exchange.cursor)
+
+    assert len(arrays["close"]) == 5
+    np.testing.assert_array_equal(arrays["close"][:-1], exchange.candles["close"][candle - 4:candle])
+    assert arrays["open"][-1] == trades["price"][replayed][0]
+    assert arrays["high"][-1] == trades["price"][replayed].max()
+    assert arrays["low"][-1] == trades["price"][replayed].min()
+    assert arrays["close"][-1] == exchange.get_price("BTC/USDT") == trades["price"][exchange.cursor - 1]
+    assert exchange.timestamps[exchange.cursor] // 1000 > exchange.now_ms // 1000
+
+    history = await exchange.get_history("BTC/USDT", "1m", limit=5)
+    assert list(history.index) == list(range(candle - 4, candle + 1))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("indicator_mode", ["pandas", "incremental", "shared"])
+async def test_replay_stepped_by_candle_matches_the_candle_replay(indicator_mode):
+    candles = load_candles("BTCUSDT-1h-2024-03.csv")
+    params = {"short_window": 9, "long_window": 21, "stop_loss_pct": 0.01}
+
+    candle_orders = await replay_signals(candles, MovingAverageCrossoverStrategy(indicator_mode=indicator_mode, **params))
+    exchange = TickReplayExchange.from_trades(trades_of(candles), timeframe="1h", step="1h")
+    tick_orders = await tick_replay(exchange, MovingAverageCrossoverStrategy(indicator_mode=indicator_mode, **params))
+
+    assert len(candle_orders) > 0
+    assert as_tuples(tick_orders) == as_tuples(candle_orders)
+    assert as_tuples(tick_orders) == as_tuples(MovingAverageCrossoverStrategy(**params).backtest(candles))
+
+
+@pytest.mark.asyncio
+async def test_ticks_tell_which_level_was_reached_first():
+    # Opened at 100 (SL 98, TP 105): the third candle goes up to 106 first, then down to 97
+    hour = 3_600_000
+    trades = {
+        "timestamp": np.array([0, 1000, hour, hour + 1000, 2 * hour, 2 * hour + 1000, 2 * hour + 2000, 2 * hour + 3000]),
+        "price": np.array([100.0, 100.0, 100.0, 100.0, 100.0, 106.0, 97.0, 100.0]),
+        "quantity": np.ones(8),
+    }
+    params = {"short_window": 1, "long_window": 2, "stop_loss_pct": 0.02, "take_profit_pct": 0.05,
+              "indicator_mode": "incremental", "exit_mode": "intrabar"}
+
+    async def exit_order(exchange):
+        strategy = MovingAverageCrossoverStrategy(**params)
+        exchange.tick()
+        exchange.tick()
+        await strategy.generate_signals(exchange)
+        buy = strategy._evaluate_candle(100.0, BUY, capital=1000)
+        strategy._mark_entry(buy, await exchange.get_arrays("BTC/USDT", "1h"))
+        return [order for order in [await strategy.generate_signals(exchange) for _ in iter(exchange.tick, False)]
+                if order][0]
+
+    # The candle alone can't tell: the worst case (stop-loss) is assumed
+    candles = HistoricalExchange.from_arrays({name: values for name, values in TickReplayExchange.from_trades(
+        trades, timeframe="1h", step="1h").candles.items()})
+    order = await exit_order(candles)
+    assert (order.side, float(order.price)) == ("SELL", 98.0)
+
+    # Second by second, the take-profit came first
+    order = await exit_order(TickReplayExchange.from_trades(trades, timeframe="1h", step="1s"))
+    assert (order.side, float(order.price)) == ("SELL", 105.0)
+
+
+def test_one_second_klines_replayed_as_hours():
+    candles = load_candles("BTCUSDT-1h-2024-03.csv").iloc[:48]
+    # Each 1h candle as four 1s candles
+    seconds = trades_of(candles)
+    klines = {"timestamp": seconds["timestamp"], "open": seconds["price"], "high": seconds["price"],
+              "low": seconds["price"], "close": seconds["price"], "volume": seconds["quantity"]}
+
+    exchange = TickReplayExchange.from_candles(klines, timeframe="1h", step=None)
+    assert exchange.tick()
+    assert exchange.cursor == 1
+
+    for name in ("timestamp", "open", "high", "low", "close", "volume"):
+        np.testing.assert_array_equal(exchange.candles[name], candles[name].to_numpy(dtype=np.float64))
+
+
+def test_iter_batches_are_views_on_the_events():
+    trades = synthetic_trades(2_500)
+    exchange = TickReplayExchange.from_trades(trades)
+
+    batches = list(exchange.iter_batches(1000))
+    assert [len(batch["close"]) for batch in batches] == [1000, 1000, 500]
+    assert np.shares_memory(batches[1]["close"], exchange.close)
+    np.testing.assert_array_equal(np.concatenate([batch["timestamp"] for batch in batches]), trades["timestamp"])
+
+
+@pytest.mark.parametrize("header, microseconds", [(True, False), (False, False), (True, True)])
+def test_trade_store_ingests_agg_trades_archives(tmp_path, header, microseconds):
+    trades = synthetic_trades(10_000)
+    trades["price"], trades["quantity"] = trades["price"].round(2), trades["quantity"].round(5)  # as in the archives
+    write_agg_trades(tmp_path / "BTCUSDT-aggTrades-2024-01.csv", trades, header, microseconds)
+
+    store = TradeStore(tmp_path / "store")
+    store.ingest_directory(tmp_path)
+    columns = store.load_period("BTCUSDT", "2024-01")
+
+    assert store.periods("BTCUSDT") == ["2024-01"]
+    assert isinstance(columns["price"], np.memmap)
+    np.testing.assert_array_equal(columns["timestamp"], trades["timestamp"])
+    np.testing.assert_array_equal(columns["price"], trades["price"])
+    np.testing.assert_array_equal(columns["quantity"], trades["quantity"])
+
+
+def test_trade_store_loads_a_range_across_periods(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.infrastructure.adapters.trade_store.CSV_CHUNK_ROWS", 700)
+    trades = synthetic_trades(5_000, mean_interval_ms=60_000)  # ~3.5 days
+    trades["price"] = trades["price"].round(2)
+    days = (trades["timestamp"] - trades["timestamp"][0]) // 86_400_000
+    for day in np.unique(days):
+        rows = days == day
+        write_agg_trades(tmp_path / f"BTCUSDT-aggTrades-2024-01-0{day + 1}.csv",
+                         {name: values[rows] for name, values in trades.items()}, header=True)
+
+    store = TradeStore(tmp_path / "store")
+    store.ingest_directory(tmp_path)
+    columns = store.load("BTCUSDT", start="2024-01-01 12:00", end="2024-01-03 06:00")
+
+    expected = (trades["timestamp"] >= pd.Timestamp("2024-01-01 12:00").value // 1_000_000) & \
+               (trades["timestamp"] < pd.Timestamp("2024-01-03 06:00").value // 1_000_000)
+    assert store.periods("BTCUSDT")[:3] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    np.testing.assert_array_equal(columns["timestamp"], trades["timestamp"][expected])
+    np.testing.assert_array_equal(columns["price"], trades["price"][expected])
+
+
+def test_trade_store_reads_a_period_being_re_ingested(tmp_path):
+    trades = synthetic_trades(2_000)
+    write_agg_trades(tmp_path / "BTCUSDT-aggTrades-2024-01.csv", trades, header=True)
+    store = TradeStore(tmp_path / "store")
+    store.ingest_directory(tmp_path)
+
+    # Between the two renames of the swap: only the previous version is there
+    period_dir = store._period_dir("BTCUSDT", "2024-01")
+    period_dir.rename(period_dir.with_name("2024-01.old"))
+    assert store.periods("BTCUSDT") == ["2024-01"]
+    swap = threading.Timer(0.05, store.ingest_csv, args=(tmp_path / "BTCUSDT-aggTrades-2024-01.csv",),
+                           kwargs={"force": True})
+    swap.start()
+    columns = store.load_period("BTCUSDT", "2024-01")
+    swap.join()
+
+    np.testing.assert_array_equal(columns["timestamp"], trades["timestamp"])